@@ -1,11 +1,17 @@
+import io
+
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import PermissionDenied, ValidationError
 from django.urls import reverse, path  # path import qilindi
+from django.template.defaultfilters import floatformat
 from django.utils.html import format_html
 from django.shortcuts import render, redirect  # render va redirect import qilindi
 from django.contrib import messages  # Xabar chiqarish uchun
-import re  # Matn tahlili uchun
 from django.db import models
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
 from tinymce.widgets import TinyMCE
 
@@ -14,10 +20,24 @@ from tinymce.widgets import TinyMCE
 from .models import (
     CustomUser, Sinf, StudentProfile,
     Test, Savol, Variant,
-    TestResult, StudentAnswer
+    TestResult, StudentAnswer, TestAttempt
 )
 # Yangi yaratilgan forma
-from .forms import QuestionImportForm
+from .forms import QuestionImportForm, StudentRosterForm
+from .export import stream_export
+from .gradebook import Gradebook
+from .grading import regrade_results
+from .item_analysis import analyze_test
+from .provisioning import RosterError, format_roster_error, parse_roster, provision_students
+from .importer import (
+    CHANGED, NEW, UNCHANGED, QuestionImporter, QuestionImportError,
+    apply_plan, diff_questions, format_import_error, iter_uploaded_lines, load_preview, parse_lines,
+    store_preview,
+)
+
+
+# Admin orqali bir martada yaratiladigan o'quvchilar soni chegarasi (parollar so'rov ichida xeshlanadi)
+ADMIN_ROSTER_MAX_ROWS = getattr(settings, 'ADMIN_ROSTER_MAX_ROWS', 30)
 
 
 # ---------------- 1. Custom User & Profiles ----------------
@@ -28,93 +48,113 @@ class CustomUserAdmin(UserAdmin):
     )
     list_display = ('username', 'email', 'is_active', 'is_staff', 'is_student', 'is_admin')
 
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                'import-students/',
+                self.admin_site.admin_view(self.import_students_view),
+                name='core_customuser_import_students'
+            ),
+        ]
+        return custom_urls + urls
 
-admin.site.register(CustomUser, CustomUserAdmin)
-
-
-@admin.register(Sinf)
-class SinfAdmin(admin.ModelAdmin):
-    list_display = ('nom',)
-    search_fields = ('nom',)
-
-
-@admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'sinf', 'total_points')
-    list_filter = ('sinf',)
-    search_fields = ('user__username', 'sinf__nom')
-    ordering = ('sinf__nom', '-total_points')
-
-
-# ---------------- 2. IMPORT LOGIKASI (Yangi Klass) ----------------
-
-class QuestionImporter:
-    """
-    Matnni tahlil qilib, Savol va Variantlarni yaratish uchun yordamchi klass.
-    Docx shablonidagi (#1., #ball:, +A) formatini tahlil qiladi.
-    """
-
-    def __init__(self, test_instance):
-        self.test = test_instance
+    def import_students_view(self, request):
+        """CSV ro'yxatdan o'quvchilarni yaratadi va bosma login/parollar varag'ini ko'rsatadi."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
 
-    def process_text(self, raw_text):
-        # Faylning to'liq matnini savollarga ajratamiz. # raqami bilan boshlangan har bir satr.
-        questions_blocks = re.split(r'#\d+\.', raw_text)
+        context = self.admin_site.each_context(request)
+        context.update({
+            'opts': self.model._meta,
+            'has_permission': True,
+        })
 
-        # Birinchi element bo'sh bo'lishi mumkin
-        if questions_blocks and not questions_blocks[0].strip():
-            questions_blocks.pop(0)
+        if request.method == 'POST':
+            form = StudentRosterForm(request.POST, request.FILES)
+            if form.is_valid():
+                lines = io.TextIOWrapper(form.cleaned_data['roster_file'].file, encoding='utf-8-sig', newline='')
+                try:
+                    # Parollar shu jarayonda xeshlanadi (veb-ishchi ichida jarayonlar puli ochilmaydi),
+                    # shuning uchun so'rov ishchi vaqt chegarasiga sig'adigan hajm bilan cheklangan
+                    entries = provision_students(parse_roster(lines, max_rows=ADMIN_ROSTER_MAX_ROWS), workers=1)
+                except RosterError as e:
+                    for line, message in e.errors[:20]:
+                        messages.error(request, format_roster_error(line, message))
+                except UnicodeDecodeError:
+                    messages.error(request, "Fayl UTF-8 kodlashda bo'lishi kerak.")
+                else:
+                    # Parollar faqat shu sahifada bir marta ko'rsatiladi - bazada ochiq saqlanmaydi
+                    context.update({
+                        'title': f"Yaratilgan o'quvchilar: {len(entries)} ta",
+                        'entries': sorted(entries, key=lambda e: (e.sinf, e.familiya, e.ism)),
+                    })
+                    return render(request, 'admin/student_credentials.html', context)
+        else:
+            form = StudentRosterForm()
 
-        imported_count = 0
+        context.update({
+            'title': "O'quvchilarni ro'yxatdan import qilish",
+            'form': form,
+            'max_rows': ADMIN_ROSTER_MAX_ROWS,
+        })
+        return render(request, 'admin/student_roster_form.html', context)
 
-        for block in questions_blocks:
-            if not block.strip():
-                continue
 
-            # 1. Ballni topish
-            score_match = re.search(r'#ball:\s*([\d\.]+)', block)
-            score = float(score_match.group(1)) if score_match else 1.0
+admin.site.register(CustomUser, CustomUserAdmin)
 
-            # 2. Savol matnini topish (Ball va variantlardan oldin)
-            # Ball tagidan oldingi qismni ajratib olamiz
-            question_text_part = re.split(r'#ball:', block, 1)
-            question_text = question_text_part[0].strip()
 
-            if not question_text:
-                continue
+@admin.register(Sinf)
+class SinfAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'gradebook_link')
+    search_fields = ('nom',)
 
-            # Savol yaratish
-            try:
-                question_instance = Savol.objects.create(
-                    test=self.test,
-                    matn=question_text,
-                    ball=score
-                )
-            except Exception as e:
-                # Agar saqlashda xato bo'lsa (masalan, matn juda uzun)
-                raise Exception(f"Savol yaratishda xatolik: {e}. Savol: {question_text[:50]}...")
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                '<int:sinf_id>/gradebook/',
+                self.admin_site.admin_view(self.gradebook_view),
+                name='core_sinf_gradebook'
+            ),
+        ]
+        return custom_urls + urls
 
-            # 3. Variantlarni ajratish (Ball tagidan keyingi qism)
-            if len(question_text_part) > 1:
-                variants_part = question_text_part[1]
+    def gradebook_link(self, obj):
+        url = reverse('admin:core_sinf_gradebook', args=[obj.id])
+        return format_html("<a class='button' href='{}'>Jurnal</a>", url)
 
-                # Regex: (\+?[A-D])\)\s*(.*?) - formatidagi variantlarni ajratish
-                variants = re.findall(r'(\+?[A-D])\)\s*(.*?)(?=\+?[A-D]\)|\Z)', variants_part, re.DOTALL)
+    gradebook_link.short_description = "Jurnal"
 
-                for prefix, text in variants:
-                    is_correct = '+' in prefix
-                    # Variant matnining boshidagi harf va qavslarni tozalash shart emas, chunki regex ularni ajratib oladi
-                    clean_text = text.strip()
+    def gradebook_view(self, request, sinf_id):
+        """Sinf o'quvchilari × testlar ballari jadvali (ballar bitta so'rov bilan o'qiladi)."""
+        try:
+            sinf = Sinf.objects.get(pk=sinf_id)
+        except Sinf.DoesNotExist:
+            messages.error(request, "Tanlangan sinf topilmadi.")
+            return redirect('admin:core_sinf_changelist')
 
-                    Variant.objects.create(
-                        savol=question_instance,
-                        matn=clean_text,
-                        is_correct=is_correct
-                    )
+        gradebook = Gradebook.for_sinf(sinf)
+        context = self.admin_site.each_context(request)
+        context.update({
+            'title': f"{sinf.nom} sinfi jurnali",
+            'sinf': sinf,
+            'gradebook': gradebook,
+            'rows': list(gradebook.rows()),
+            'column_stats': gradebook.column_stats(),
+            'class_average': gradebook.class_average(),
+            'opts': self.model._meta,
+            'has_permission': self.has_view_or_change_permission(request),
+        })
+        return render(request, 'admin/sinf_gradebook.html', context)
 
-            imported_count += 1
 
-        return imported_count
+@admin.register(StudentProfile)
+class StudentProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'sinf', 'total_points')
+    list_filter = ('sinf',)
+    search_fields = ('user__username', 'sinf__nom')
+    ordering = ('sinf__nom', '-total_points')
 
 
 # ---------------- 4. Test va Savollar Admini ----------------
@@ -148,7 +188,10 @@ class SavolAdmin(admin.ModelAdmin):
 
 @admin.register(Test)
 class TestAdmin(admin.ModelAdmin):
-    list_display = ('nom', 'sinf', 'yaratilgan_sana', 'manage_savollar')
+    list_display = ('nom', 'sinf', 'yaratilgan_sana', 'boshlanish_vaqti', 'tugash_vaqti', 'davomiylik_daqiqa',
+                    'savollar_soni', 'natijalar_soni', 'ortacha_ball', 'manage_savollar', 'item_analysis_link')
+    # Ko'rsatkichlar TestStats qatoridan (JOIN), har bir test uchun agregat so'rovisiz
+    list_select_related = ('sinf', 'stats')
     list_filter = ('sinf', 'yaratilgan_sana')
     search_fields = ('nom',)
     # Import action'ini qo'shish
@@ -165,6 +208,16 @@ class TestAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.import_questions_view),
                 name='core_test_import_questions'
             ),
+            path(
+                '<int:test_id>/import-questions/confirm/',
+                self.admin_site.admin_view(self.import_confirm_view),
+                name='core_test_import_questions_confirm'
+            ),
+            path(
+                '<int:test_id>/item-analysis/',
+                self.admin_site.admin_view(self.item_analysis_view),
+                name='core_test_item_analysis'
+            ),
         ]
         return custom_urls + urls
 
@@ -193,17 +246,23 @@ class TestAdmin(admin.ModelAdmin):
             return redirect('admin:core_test_changelist')
 
         if request.method == 'POST':
-            form = QuestionImportForm(request.POST)
+            form = QuestionImportForm(request.POST, request.FILES)
             if form.is_valid():
                 raw_text = form.cleaned_data['import_data']
+                import_file = form.cleaned_data['import_file']
+                # Fayl blokma-blok o'qiladi, butun hujjat xotiraga yuklanmaydi
+                lines = iter_uploaded_lines(import_file) if import_file else raw_text.splitlines()
+
+                if '_preview' in request.POST:
+                    return self._import_preview(request, test_instance, lines)
 
                 importer = QuestionImporter(test_instance)
                 try:
-                    imported_count = importer.process_text(raw_text)
+                    imported_count = importer.process_lines(lines)
                     messages.success(request,
                                      f"Muvaffaqiyatli! {imported_count} ta savol va ularning variantlari '{test_instance.nom}' testiga qo'shildi.")
-                except Exception as e:
-                    messages.error(request, f"Import jarayonida xatolik yuz berdi: {e}")
+                except (QuestionImportError, ValidationError) as e:
+                    self._report_import_error(request, e)
 
                 return redirect('admin:core_test_changelist')
         else:
@@ -220,6 +279,70 @@ class TestAdmin(admin.ModelAdmin):
         # Shablonni render qilish. (core/templates/admin/test_import_form.html)
         return render(request, 'admin/test_import_form.html', context)
 
+    def _import_preview(self, request, test_instance, lines):
+        """Matnni tahlil qilib, mavjud savollar bilan farqini ko'rsatadi (bazaga yozmaydi)."""
+        try:
+            questions, errors = parse_lines(lines)
+            if errors:
+                raise QuestionImportError(errors)
+        except (QuestionImportError, ValidationError) as e:
+            self._report_import_error(request, e)
+            return redirect('admin:core_test_import_questions', test_id=test_instance.pk)
+
+        plan = diff_questions(test_instance, questions)
+        # Tahlil natijasi serverda qoladi, sessiyaga faqat uning tokeni yoziladi
+        request.session[self.import_session_key(test_instance.pk)] = store_preview(questions)
+
+        counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+        for item in plan:
+            counts[item.status] += 1
+
+        context = self.admin_site.each_context(request)
+        context.update({
+            'title': f"'{test_instance.nom}' testiga import: oldindan ko'rish",
+            'test_instance': test_instance,
+            'plan': plan,
+            'counts': counts,
+            'opts': self.model._meta,
+            'has_permission': self.has_view_or_change_permission(request),
+        })
+        return render(request, 'admin/test_import_preview.html', context)
+
+    def import_confirm_view(self, request, test_id):
+        """Oldindan ko'rilgan importni tasdiqlaydi: faqat yangi va o'zgargan savollar yoziladi."""
+        if request.method != 'POST':
+            return redirect('admin:core_test_import_questions', test_id=test_id)
+
+        questions = load_preview(request.session.pop(self.import_session_key(test_id), None))
+        test_instance = Test.objects.filter(pk=test_id).first()
+        if questions is None or test_instance is None:
+            messages.error(request, "Import ma'lumotlari topilmadi, iltimos qaytadan oldindan ko'ring.")
+            return redirect('admin:core_test_import_questions', test_id=test_id)
+
+        # Reja joriy holat bo'yicha qayta hisoblanadi (ko'rib chiqish vaqtida savollar o'zgargan bo'lishi mumkin)
+        counts = apply_plan(test_instance, diff_questions(test_instance, questions))
+        messages.success(request,
+                         f"'{test_instance.nom}': {counts[NEW]} ta yangi savol qo'shildi, {counts[CHANGED]} ta yangilandi, "
+                         f"{counts[UNCHANGED]} ta o'zgarmagan savol o'tkazib yuborildi.")
+        if counts['regraded']:
+            messages.info(request, f"{counts['regraded']} ta natija yangi javoblar kaliti bo'yicha qayta baholandi.")
+        return redirect('admin:core_test_changelist')
+
+    @staticmethod
+    def import_session_key(test_id):
+        return f'question_import_{test_id}'
+
+    @staticmethod
+    def _report_import_error(request, error):
+        if isinstance(error, QuestionImportError):
+            # Hech narsa yozilmagan: har bir xato blokni satr raqami bilan ko'rsatamiz
+            for line, message in error.errors:
+                messages.error(request, format_import_error(line, message))
+            messages.error(request, "Import bekor qilindi, hech qanday savol qo'shilmadi.")
+        else:
+            for message in error.messages:
+                messages.error(request, f"Import jarayonida xatolik yuz berdi: {message}")
+
     # --- Mavjud metodlar ---
 
     def manage_savollar(self, obj):
@@ -228,6 +351,49 @@ class TestAdmin(admin.ModelAdmin):
 
     manage_savollar.short_description = "Savollar"
 
+    def savollar_soni(self, obj):
+        stats = getattr(obj, 'stats', None)
+        return f"{stats.savollar_soni} ({floatformat(stats.max_ball, -2)} ball)" if stats else '—'
+
+    savollar_soni.short_description = "Savollar soni"
+
+    def natijalar_soni(self, obj):
+        stats = getattr(obj, 'stats', None)
+        return stats.natijalar_soni if stats else '—'
+
+    natijalar_soni.short_description = "Topshirganlar"
+
+    def ortacha_ball(self, obj):
+        stats = getattr(obj, 'stats', None)
+        average = stats.ortacha_ball if stats else None
+        return floatformat(average, 2) if average is not None else '—'
+
+    ortacha_ball.short_description = "O'rtacha ball"
+
+    def item_analysis_link(self, obj):
+        url = reverse('admin:core_test_item_analysis', args=[obj.id])
+        return format_html("<a class='button' href='{}'>Tahlil</a>", url)
+
+    item_analysis_link.short_description = "Savollar tahlili"
+
+    def item_analysis_view(self, request, test_id):
+        """Savollar tahlili hisobotini ko'rsatadi (statistika keshlanadi, yangi natijalar qo'shib boriladi)."""
+        try:
+            test_instance = Test.objects.get(pk=test_id)
+        except Test.DoesNotExist:
+            messages.error(request, "Tanlangan test topilmadi.")
+            return redirect('admin:core_test_changelist')
+
+        context = self.admin_site.each_context(request)
+        context.update({
+            'title': f"'{test_instance.nom}' testi savollari tahlili",
+            'report': analyze_test(test_instance),
+            'test_instance': test_instance,
+            'opts': self.model._meta,
+            'has_permission': self.has_view_or_change_permission(request),
+        })
+        return render(request, 'admin/test_item_analysis.html', context)
+
 
 # ---------------- 5. Natijalar ----------------
 
@@ -244,6 +410,41 @@ class TestResultAdmin(admin.ModelAdmin):
     list_filter = ('test__sinf__nom', 'test__nom', 'sinov_sanasi')
     search_fields = ('student__user__username', 'test__nom')
     inlines = [StudentAnswerInline]
+    actions = [
+        'regrade_action',
+        'export_results_csv', 'export_results_xlsx',
+        'export_answers_csv', 'export_answers_xlsx',
+    ]
+
+    @admin.action(description='Tanlangan natijalarni joriy javoblar kaliti bo\'yicha qayta baholash')
+    def regrade_action(self, request, queryset):
+        """Savol yoki variant tuzatilgandan keyin natijalarni ommaviy qayta hisoblaydi."""
+        updated = regrade_results(queryset.only('id', 'test_id', 'student_id'))
+        messages.success(request, f"{updated} ta natija qayta baholandi.")
+
+    def _export_response(self, queryset, kind, fmt):
+        """Eksportni oqim bilan qaytaradi: qatorlar bazadan bo'laklab o'qiladi va darhol jo'natiladi."""
+        chunks, content_type = stream_export(kind, fmt, queryset)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        filename = f"{kind}_{timezone.localtime():%Y%m%d_%H%M}.{fmt}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @admin.action(description='Natijalarni CSV ga eksport qilish')
+    def export_results_csv(self, request, queryset):
+        return self._export_response(queryset, 'results', 'csv')
+
+    @admin.action(description='Natijalarni XLSX ga eksport qilish')
+    def export_results_xlsx(self, request, queryset):
+        return self._export_response(queryset, 'results', 'xlsx')
+
+    @admin.action(description='Javoblarni CSV ga eksport qilish')
+    def export_answers_csv(self, request, queryset):
+        return self._export_response(queryset, 'answers', 'csv')
+
+    @admin.action(description='Javoblarni XLSX ga eksport qilish')
+    def export_answers_xlsx(self, request, queryset):
+        return self._export_response(queryset, 'answers', 'xlsx')
 
     def student_username(self, obj):
         return obj.student.user.username
@@ -252,4 +453,13 @@ class TestResultAdmin(admin.ModelAdmin):
         return obj.test.nom
 
     def sinf_name(self, obj):
-        return obj.student.sinf.nom if obj.student.sinf else "—"
\ No newline at end of file
+        return obj.student.sinf.nom if obj.student.sinf else "—"
+
+
+@admin.register(TestAttempt)
+class TestAttemptAdmin(admin.ModelAdmin):
+    list_display = ('student', 'test', 'boshlangan_vaqt', 'yangilangan_vaqt', 'deadline', 'result')
+    list_filter = ('test__sinf__nom', 'test__nom')
+    search_fields = ('student__user__username', 'test__nom')
+    list_select_related = ('student__user', 'test__sinf', 'result')
+    readonly_fields = ('answers', 'boshlangan_vaqt', 'yangilangan_vaqt', 'deadline', 'result')
@@ -0,0 +1,116 @@
+# core/answer_cache.py
+"""
+Javoblar kaliti va test mazmuni (savollar + variantlar) uchun kesh.
+
+Kalit ``(tur, test_id, test.content_version)`` dan tuziladi. ``content_version``
+Savol/Variant/Test o'zgarganda signallar orqali yangi qiymat oladi (core.signals),
+shuning uchun eski kalit hech qachon javobni baholay olmaydi: yangi versiya bilan
+kelgan so'rov eski yozuvni umuman ko'rmaydi.
+
+1-daraja - jarayon ichidagi cheklangan LRU. 2-daraja (ixtiyoriy) - Django kesh
+backendi, ``ANSWER_KEY_CACHE_ALIAS`` sozlamasi orqali yoqiladi.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch
+
+from .grading import AnswerKey
+from .models import Savol, Test, Variant, new_content_version
+
+
+class LRUCache:
+    """Oddiy, oqimlar uchun xavfsiz, hajmi cheklangan LRU kesh."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard_test(self, test_id):
+        """Berilgan testning barcha versiyalarini lokal keshdan olib tashlaydi."""
+        with self._lock:
+            for key in [key for key in self._data if key[1] == test_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_cache = LRUCache(getattr(settings, 'ANSWER_KEY_CACHE_SIZE', 256))
+
+
+def _shared_cache():
+    alias = getattr(settings, 'ANSWER_KEY_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def _cached(kind, test, loader):
+    key = (kind, test.pk, test.content_version)
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+
+    shared = _shared_cache()
+    shared_key = f"core:{kind}:{test.pk}:{test.content_version}"
+    if shared is not None:
+        value = shared.get(shared_key)
+
+    if value is None:
+        value = loader(test)
+        if shared is not None:
+            shared.set(shared_key, value, getattr(settings, 'ANSWER_KEY_CACHE_TIMEOUT', 24 * 60 * 60))
+
+    local_cache.set(key, value)
+    return value
+
+
+def load_test_content(test):
+    """Savollarni variantlari bilan (tartiblangan holda) ikki so'rovda yuklaydi."""
+    return list(
+        Savol.objects.filter(test_id=test.pk)
+        .order_by('id')
+        .prefetch_related(Prefetch('variantlar', queryset=Variant.objects.order_by('id')))
+    )
+
+
+def get_answer_key(test):
+    """Test uchun javoblar kalitini keshdan (yoki bazadan) qaytaradi."""
+    return _cached('key', test, AnswerKey.load)
+
+
+def get_test_content(test):
+    """
+    Test savollari ro'yxatini (variantlari prefetch qilingan) qaytaradi.
+    Ro'yxat jarayonlar orasida umumiy - uni joyida o'zgartirmang.
+    """
+    return _cached('content', test, load_test_content)
+
+
+def invalidate_test(test_id):
+    """Testga yangi mazmun versiyasini beradi va lokal yozuvlarni o'chiradi."""
+    version = new_content_version()
+    Test.objects.filter(pk=test_id).update(content_version=version)
+    local_cache.discard_test(test_id)
+    return version
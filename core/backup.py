@@ -0,0 +1,279 @@
+# core/backup.py
+"""
+Bo'laklab, oqim bilan zaxira nusxa olish va tiklash (``dumpdata``/``loaddata`` o'rniga).
+
+Zaxira - katalog::
+
+    manifest.json                 # modellar, qatorlar soni, migratsiya holati
+    core.customuser.jsonl.gz      # 1-satr: {"model": ..., "fields": [...]}, keyingilari: [qiymatlar]
+    core.sinf.jsonl.gz
+    ...
+
+Har bir model birlamchi kalit bo'yicha ``BACKUP_CHUNK_SIZE`` lik bo'laklarda
+(``pk > oxirgi``) o'qiladi - xotira jadval hajmiga bog'liq emas. Barcha o'qishlar bitta
+tranzaksiyada (PostgreSQL da REPEATABLE READ) bajariladi, shuning uchun ish vaqtida
+olingan zaxira ham bir lahzadagi holatni ko'rsatadi. Qo'shimcha himoya: zaxira boshida
+har bir jadvalning eng katta pk si qayd qilinadi, undan keyingi qatorlar olinmaydi va
+chegaradan keyingi ota yozuvga ishora qiluvchi FK bo'sh bo'lsa NULL yoziladi, bo'lmasa
+qator tashlab ketiladi - tiklashda FK xatosi bo'lmaydi. SQLite da o'qish tranzaksiyasi
+(WAL rejimisiz) zaxira tugaguncha yozuvlarni kutishga majbur qiladi. ``manifest.json``
+oxirida yoziladi - usiz zaxira tugallanmagan hisoblanadi.
+
+Tiklash FK bog'liqligi tartibida (``BACKUP_MODELS``), har bir bo'lak alohida
+tranzaksiyada, ``insert_rows`` bilan yoziladi. Qiymatlar (vaqt belgilari, content_version,
+total_points) zaxiradagidek saqlanadi, signallar ishlamaydi. Bo'lak tranzaksiyasi
+tugagach u bazada bor, shuning uchun to'xtab qolgan tiklashni ``resume=True`` bilan
+davom ettirish mumkin: har bir jadvaldagi eng katta pk dan keyingi qatorlardan boshlanadi.
+
+Zaxiraga faqat ``core`` ilovasi jadvallari kiradi (avvalgi backup_data.json kabi);
+foydalanuvchi guruhlari va ruxsatlari (auth) kirmaydi. TestStats hosilaviy jadval -
+zaxiralanmaydi, tiklash oxirida qayta hisoblanadi.
+"""
+import datetime
+import decimal
+import gzip
+import json
+import os
+import time
+import uuid
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+
+from .bulk import insert_rows
+from .test_stats import rebuild_test_stats
+from .models import CustomUser, Savol, Sinf, StudentAnswer, StudentProfile, Test, TestAttempt, TestResult, Variant
+
+BACKUP_FORMAT = 1
+BACKUP_CHUNK_SIZE = 5000
+MANIFEST_NAME = 'manifest.json'
+
+# Tiklash tartibi: har bir model o'zidan oldingilarga bog'liq
+BACKUP_MODELS = (CustomUser, Sinf, StudentProfile, Test, Savol, Variant, TestResult, StudentAnswer, TestAttempt)
+
+# Tiklashda baza ko'rinishiga o'girilishi kerak bo'lgan turlar: JSON da matn bo'lib qoladiganlar
+# va JSONField; qolganlari (son, satr, mantiqiy) drayverga o'zgarishsiz beriladi
+_PREPARED_TYPES = frozenset(('DecimalField', 'DateTimeField', 'DateField', 'TimeField', 'UUIDField', 'JSONField'))
+
+
+class BackupError(Exception):
+    pass
+
+
+def _json_default(value):
+    # DjangoJSONEncoder vaqtni millisekundgacha qisqartiradi; zaxira aniq bo'lishi kerak
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} JSON ga o'girilmaydi")
+
+
+def _file_name(model):
+    return f"{model._meta.label_lower}.jsonl.gz"
+
+
+def _migration_state(connection):
+    return sorted(MigrationRecorder(connection).migration_qs.filter(app='core').values_list('name', flat=True))
+
+
+def _has_outer_transaction(connection):
+    # SET TRANSACTION faqat tranzaksiyaning birinchi so'rovi bo'la oladi
+    return len(connection.atomic_blocks) > 1
+
+
+def _backup_model(model, directory, chunk_size, limits, skipped, using, progress):
+    fields = model._meta.concrete_fields
+    names = [field.attname for field in fields]
+    pk_index = names.index(model._meta.pk.attname)
+    # Zaxiradagi ota modellarga FK lar (StudentProfile.user kabi pk ham):
+    # (ustun, chegara, olinmagan ota pk lari, NULL mumkinmi)
+    references = [(index, limits[field.related_model], skipped[field.related_model], field.null)
+                  for index, field in enumerate(fields) if field.is_relation and field.related_model in limits]
+    rows = model._base_manager.using(using).filter(pk__lte=limits[model]).order_by('pk').values_list(*names)
+    count, last = 0, None
+    with gzip.open(os.path.join(directory, _file_name(model)), 'wt', encoding='utf-8', compresslevel=6) as output:
+        output.write(json.dumps({'model': model._meta.label_lower, 'fields': names}) + '\n')
+        while True:
+            chunk = list(rows.filter(pk__gt=last)[:chunk_size] if last is not None else rows[:chunk_size])
+            if not chunk:
+                break
+            last = chunk[-1][pk_index]
+            if references:
+                kept = []
+                for row in chunk:
+                    checked = _within_limits(row, references)
+                    if checked is None:
+                        skipped[model].add(row[pk_index])  # bolalari ham olinmaydi
+                    else:
+                        kept.append(checked)
+                chunk = kept
+            output.write(''.join(
+                json.dumps(row, default=_json_default, ensure_ascii=False, separators=(',', ':')) + '\n'
+                for row in chunk
+            ))
+            count += len(chunk)
+            if progress:
+                progress(model, count)
+    return {'model': model._meta.label_lower, 'file': _file_name(model), 'rows': count, 'max_pk': last}
+
+
+def _within_limits(row, references):
+    """
+    Chegaradan keyingi (yoki zaxiraga olinmagan) ota yozuvga ishora: NULL mumkin bo'lsa
+    NULL yoziladi, aks holda qator olinmaydi (None).
+    """
+    row = list(row)
+    for index, limit, skipped, nullable in references:
+        value = row[index]
+        if value is not None and (value > limit or value in skipped):
+            if not nullable:
+                return None
+            row[index] = None
+    return row
+
+
+def backup(directory, chunk_size=BACKUP_CHUNK_SIZE, using=DEFAULT_DB_ALIAS, progress=None):
+    """``directory`` ga zaxira yozadi va manifestni qaytaradi."""
+    connection = connections[using]
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    started = time.perf_counter()
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql' and not _has_outer_transaction(connection):
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        # Chegaralar bir vaqtda olinadi: keyin qo'shilgan qatorlar (va ularning bolalari) zaxiraga kirmaydi
+        limits = {model: model._base_manager.using(using).order_by('-pk').values_list('pk', flat=True).first() or 0
+                  for model in BACKUP_MODELS}
+        skipped = {model: set() for model in BACKUP_MODELS}
+        entries = [_backup_model(model, directory, chunk_size, limits, skipped, using, progress)
+                   for model in BACKUP_MODELS]
+
+    manifest = {
+        'format': BACKUP_FORMAT,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'vendor': connection.vendor,
+        'migrations': _migration_state(connection),
+        'seconds': round(time.perf_counter() - started, 2),
+        'models': entries,
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2)
+    return manifest
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding='utf-8') as source:
+            manifest = json.load(source)
+    except FileNotFoundError:
+        raise BackupError(f"{directory}: {MANIFEST_NAME} yo'q - zaxira tugallanmagan yoki katalog noto'g'ri.")
+    except ValueError as e:
+        raise BackupError(f"{MANIFEST_NAME} o'qilmadi: {e}")
+    if manifest.get('format') != BACKUP_FORMAT:
+        raise BackupError(f"Zaxira formati qo'llab-quvvatlanmaydi: {manifest.get('format')}")
+    return manifest
+
+
+def _header_fields(model, names):
+    """Fayl sarlavhasidagi ustun nomlariga mos Field obyektlari."""
+    by_attname = {field.attname: field for field in model._meta.concrete_fields}
+    unknown = [name for name in names if name not in by_attname]
+    if unknown:
+        raise BackupError(f"{model._meta.label_lower}: modelda yo'q ustun(lar): {', '.join(unknown)}")
+    return [by_attname[name] for name in names]
+
+
+def _restore_model(model, path, chunk_size, resume_after, using, progress):
+    connection = connections[using]
+    with gzip.open(path, 'rt', encoding='utf-8') as source:
+        header = json.loads(source.readline())
+        if header.get('model') != model._meta.label_lower:
+            raise BackupError(f"{path}: kutilgan model {model._meta.label_lower}, faylda {header.get('model')}")
+        fields = _header_fields(model, header['fields'])
+        pk_index = header['fields'].index(model._meta.pk.attname)
+        # Matnga aylangan qiymatlar Python turiga, so'ng baza ko'rinishiga o'giriladi
+        # (get_db_prep_save - bulk_create dagi kabi, lekin auto_now_add almashtirilmaydi)
+        prepared = [(index, field) for index, field in enumerate(fields)
+                    if field.get_internal_type() in _PREPARED_TYPES]
+
+        def write(chunk):
+            for row in chunk:
+                for index, field in prepared:
+                    row[index] = field.get_db_prep_save(field.to_python(row[index]), connection)
+            with transaction.atomic(using=using):
+                insert_rows(model, fields, chunk, using=using)
+
+        count, chunk = 0, []
+        for line in source:
+            row = json.loads(line)
+            if resume_after is not None and row[pk_index] <= resume_after:
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                write(chunk)
+                count += len(chunk)
+                chunk = []
+                if progress:
+                    progress(model, count)
+        if chunk:
+            write(chunk)
+            count += len(chunk)
+    return count
+
+
+def restore(directory, chunk_size=BACKUP_CHUNK_SIZE, resume=False, using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Zaxirani bo'sh bazaga tiklaydi. ``resume=True`` - to'xtab qolgan tiklashni davom ettirish.
+    ``{model_label: yozilgan_qatorlar}`` qaytaradi.
+    """
+    connection = connections[using]
+    manifest = read_manifest(directory)
+    entries = {entry['model']: entry for entry in manifest['models']}
+    missing = [model._meta.label_lower for model in BACKUP_MODELS if model._meta.label_lower not in entries]
+    if missing:
+        raise BackupError(f"Zaxirada model(lar) yo'q: {', '.join(missing)}")
+    current = _migration_state(connection)
+    if manifest['migrations'] != current:
+        raise BackupError(
+            f"Migratsiyalar mos emas: zaxirada {manifest['migrations'][-1:]}, bazada {current[-1:]}. "
+            "Avval bazani zaxira olingan holatga migratsiya qiling."
+        )
+
+    # Tiklash faqat shu buyruq yozgan qatorlar ustida davom etadi, shuning uchun jadval
+    # bo'sh bo'lishi (yoki resume) shart; davom etish nuqtasi - jadvaldagi eng katta pk
+    resume_points = {}
+    for model in BACKUP_MODELS:
+        last = model._base_manager.using(using).order_by('-pk').values_list('pk', flat=True).first()
+        if last is not None and not resume:
+            raise BackupError(
+                f"{model._meta.label_lower} jadvali bo'sh emas. Bo'sh bazaga tiklang "
+                "yoki to'xtab qolgan tiklashni --resume bilan davom ettiring."
+            )
+        resume_points[model] = last
+
+    written = {}
+    for model in BACKUP_MODELS:
+        entry = entries[model._meta.label_lower]
+        last = resume_points[model]
+        if last is not None and entry['max_pk'] is not None and last >= entry['max_pk']:
+            written[entry['model']] = 0
+            continue
+        written[entry['model']] = _restore_model(
+            model, os.path.join(directory, entry['file']), chunk_size, last, using, progress
+        )
+
+    rebuild_test_stats()
+
+    # Aniq pk lar bilan yozilgani uchun PostgreSQL ketma-ketliklari surilishi kerak
+    statements = connection.ops.sequence_reset_sql(no_style(), BACKUP_MODELS)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return written
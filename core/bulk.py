@@ -0,0 +1,35 @@
+# core/bulk.py
+"""
+Model obyektlarisiz ommaviy INSERT (sun'iy ma'lumotlar generatori va zaxiradan tiklash uchun).
+
+``bulk_create`` har bir bo'lak uchun SQL ni qayta yig'adi, har bir qiymatni
+``get_db_prep_save`` dan o'tkazadi va ``auto_now_add`` maydonlarini joriy vaqt bilan
+almashtiradi. Bu yerda qatorlar tayyor kortejlar ko'rinishida keladi va bitta
+``INSERT ... VALUES (...), (...)`` bilan yoziladi. ``executemany`` ishlatilmaydi:
+psycopg2 da u har bir qator uchun alohida so'rov yuboradi.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def insert_rows(model, fields, rows, using=DEFAULT_DB_ALIAS):
+    """
+    ``rows`` dagi kortejlarni ``fields`` (Field obyektlari) ustunlariga yozadi.
+    Qiymatlar baza drayveri qabul qiladigan ko'rinishda bo'lishi kerak. Yozilgan qatorlar sonini qaytaradi.
+    """
+    if not rows:
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    head = (f"INSERT INTO {quote(model._meta.db_table)} "
+            f"({', '.join(quote(field.column) for field in fields)}) VALUES ")
+    placeholder = f"({', '.join(['%s'] * len(fields))})"
+    # SQLite da so'rov parametrlari soni cheklangan; PostgreSQL da bo'lak butunligicha yoziladi
+    per_statement = max(1, connection.ops.bulk_batch_size(fields, rows))
+    full_sql = head + ', '.join([placeholder] * per_statement)
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), per_statement):
+            batch = rows[start:start + per_statement]
+            sql = full_sql if len(batch) == per_statement else head + ', '.join([placeholder] * len(batch))
+            cursor.execute(sql, [value for row in batch for value in row])
+    return len(rows)
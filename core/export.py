@@ -0,0 +1,231 @@
+# core/export.py
+"""
+Natijalar va javoblarni CSV / XLSX ko'rinishida oqim (streaming) bilan eksport qilish.
+
+Qatorlar ``values_list(...).iterator(chunk_size=...)`` bilan bazadan bo'lib-bo'lib
+o'qiladi va darhol yoziladi: butun o'quv yili javoblari ham o'zgarmas xotirada
+eksport qilinadi, birinchi baytlar esa so'rov boshidayoq jo'natiladi.
+XLSX fayl standart kutubxona (zipfile) bilan yoziladi - qo'shimcha paket kerak emas.
+"""
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import StudentAnswer, TestResult
+
+EXPORT_CHUNK_SIZE = 2000
+
+RESULT_HEADER = (
+    'natija_id', 'login', 'ism', 'familiya', 'sinf', 'test', 'ball',
+    "to'g'ri_javoblar", 'savollar_soni', 'sana',
+)
+ANSWER_HEADER = (
+    'natija_id', 'login', 'sinf', 'test', 'savol_id', 'tanlangan_variant', "to'g'ri", 'ball',
+)
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, bool):
+        return int(value)
+    if value is None:
+        return ''
+    return value
+
+
+def iter_result_rows(results):
+    """``results`` (TestResult queryset) bo'yicha bir natija - bir qator."""
+    rows = results.order_by('id').values_list(
+        'id', 'student__user__username', 'student__user__first_name', 'student__user__last_name',
+        'student__sinf__nom', 'test__nom', 'jami_ball', 'togri_javoblar_soni', 'umumiy_savollar_soni',
+        'sinov_sanasi',
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [_format_value(value) for value in row]
+
+
+def iter_answer_rows(results):
+    """``results`` dagi natijalarning barcha javoblari: bir javob - bir qator."""
+    rows = StudentAnswer.objects.filter(result__in=results.values('pk')).order_by('result_id', 'savol_id').values_list(
+        'result_id', 'result__student__user__username', 'result__student__sinf__nom', 'result__test__nom',
+        'savol_id', 'tanlangan_variant__matn', 'is_correct', 'ball',
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [_format_value(value) for value in row]
+
+
+EXPORTS = {
+    'results': (RESULT_HEADER, iter_result_rows),
+    'answers': (ANSWER_HEADER, iter_answer_rows),
+}
+
+
+def export_rows(kind, results=None):
+    """``(sarlavha, qatorlar_iteratori)`` qaytaradi; ``results`` berilmasa - barcha natijalar."""
+    header, iter_rows = EXPORTS[kind]
+    if results is None:
+        results = TestResult.objects.all()
+    return header, iter_rows(results)
+
+
+# ---------------- CSV ----------------
+
+class _Echo:
+    """csv.writer uchun bufer: yozilgan qatorni to'g'ridan-to'g'ri qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+# Excel/LibreOffice bu belgilar bilan boshlangan katakni formula deb hisoblaydi (CSV injection)
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_safe(value):
+    """Formula bo'lib ochiladigan matnli katak oldiga ``'`` qo'yiladi; sonlar o'zgarmaydi."""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(header, rows):
+    """CSV qatorlarini birma-bir qaytaruvchi generator (Excel uchun BOM bilan)."""
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_csv_safe(value) for value in row])
+
+
+# ---------------- XLSX ----------------
+
+# XML 1.0 da ruxsat etilmagan boshqaruv belgilari
+_ILLEGAL_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_STATIC_PARTS = (
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '</Relationships>'),
+)
+
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Har necha qatordan keyin siqilgan baytlar javobga uzatiladi
+XLSX_FLUSH_ROWS = 500
+
+
+class _StreamSink:
+    """ZipFile uchun qidirib bo'lmaydigan (non-seekable) chiqish: yozilganlar bo'lib-bo'lib olinadi."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _xlsx_row(number, row, columns):
+    cells = []
+    for column, value in zip(columns, row):
+        ref = f'{column}{number}'
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        elif value != '':
+            text = escape(_ILLEGAL_XML_RE.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(header, rows, sheet_name='Natijalar'):
+    """
+    Bitta varaqli XLSX faylni bo'laklab qaytaruvchi generator.
+
+    ZipFile qidirib bo'lmaydigan oqimga data descriptor bilan yozadi, shuning uchun
+    varaq XML i to'liq xotiraga yig'ilmaydi.
+    """
+    sink = _StreamSink()
+    columns = [_column_letter(index) for index in range(len(header))]
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS:
+            archive.writestr(name, content)
+        archive.writestr(
+            'xl/workbook.xml',
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((_XLSX_SHEET_HEAD + _xlsx_row(1, header, columns)).encode())
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row, columns).encode())
+                if number % XLSX_FLUSH_ROWS == 0:
+                    yield sink.drain()
+            sheet.write(_XLSX_SHEET_TAIL.encode())
+    yield sink.drain()
+
+
+FORMATS = {
+    'csv': (stream_csv, CSV_CONTENT_TYPE),
+    'xlsx': (stream_xlsx, XLSX_CONTENT_TYPE),
+}
+
+
+def stream_export(kind, fmt, results=None):
+    """``(bo'laklar_generatori, content_type)`` qaytaradi."""
+    header, rows = export_rows(kind, results)
+    writer, content_type = FORMATS[fmt]
+    return writer(header, rows), content_type
@@ -17,8 +17,45 @@ class QuestionImportForm(forms.Form):
     """
     Test savollarini matn formatida import qilish uchun ishlatiladigan forma.
     """
+    ALLOWED_EXTENSIONS = ('.txt', '.docx')
+
     # Testga tegishli savollarni joylashtirish uchun katta matn maydoni
     import_data = forms.CharField(
+        required=False,
         widget=forms.Textarea(attrs={'rows': 20, 'cols': 120, 'placeholder': 'Savollarni matn formatida shu yerga nusxalash va joylashtirish.\nHar bir savol # raqami bilan, ball #ball: bilan va to\'g\'ri javob + belgisidan boshlanishi kerak (Masalan, +A) 8)'}),
         label="Savol va Variantlar Matni"
-    )
\ No newline at end of file
+    )
+    # Yoki tayyor faylni yuklash (.txt yoki .docx) - katta savollar bazasi uchun
+    import_file = forms.FileField(
+        required=False,
+        label="Yoki fayl (.txt, .docx)",
+        help_text="Fayl satrma-satr o'qiladi, shuning uchun hajmi katta bo'lishi mumkin.",
+    )
+
+    def clean_import_file(self):
+        import_file = self.cleaned_data.get('import_file')
+        if import_file and not import_file.name.lower().endswith(self.ALLOWED_EXTENSIONS):
+            raise forms.ValidationError("Faqat .txt yoki .docx fayllarni yuklash mumkin.")
+        return import_file
+
+    def clean(self):
+        cleaned_data = super().clean()
+        has_text = bool((cleaned_data.get('import_data') or '').strip())
+        has_file = bool(cleaned_data.get('import_file'))
+        if has_text == has_file and not self.errors:
+            raise forms.ValidationError("Matnni joylashtiring yoki fayl yuklang (faqat bittasini).")
+        return cleaned_data
+
+
+class StudentRosterForm(forms.Form):
+    """O'quvchilar ro'yxatini (CSV) yuklab, akkauntlarni ommaviy yaratish formasi."""
+    roster_file = forms.FileField(
+        label="Ro'yxat fayli (.csv)",
+        help_text="Ustunlar: familiya, ism, sinf, login (ixtiyoriy), parol (ixtiyoriy). Kodlash: UTF-8.",
+    )
+
+    def clean_roster_file(self):
+        roster_file = self.cleaned_data['roster_file']
+        if not roster_file.name.lower().endswith('.csv'):
+            raise forms.ValidationError("Faqat .csv fayllarni yuklash mumkin.")
+        return roster_file
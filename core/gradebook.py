@@ -0,0 +1,96 @@
+# core/gradebook.py
+"""
+Sinf jurnali: o'quvchi × test ballari matritsasi.
+
+Ballar bitta ``values_list('student_id', 'test_id', 'jami_ball')`` so'rovi bilan
+o'qiladi va ``array('d')`` ga (qator bo'yicha tekis massiv) joylanadi; topshirilmagan
+kataklar NaN. Qator/ustun yig'indilari va o'rtachalari shu massivdan hisoblanadi -
+katak boshiga so'rov yoki obyekt yaratilmaydi.
+"""
+import math
+from array import array
+
+from .models import StudentProfile, Test, TestResult
+
+MISSING = math.nan
+
+
+class GradebookRow:
+    __slots__ = ('student_id', 'name', 'scores', 'total', 'taken', 'average')
+
+    def __init__(self, student_id, name, scores, total, taken):
+        self.student_id = student_id
+        self.name = name
+        self.scores = scores  # har bir test uchun ball yoki None
+        self.total = total
+        self.taken = taken
+        self.average = total / taken if taken else None
+
+
+class Gradebook:
+    """``students`` × ``tests`` ballar matritsasi (qatorlar o'quvchilar, ustunlar testlar)."""
+
+    __slots__ = ('students', 'tests', 'cells', '_student_index', '_test_index')
+
+    def __init__(self, students, tests):
+        self.students = students  # [(student_id, ko'rsatiladigan ism), ...]
+        self.tests = tests  # [(test_id, nom), ...]
+        self._student_index = {student_id: row for row, (student_id, _) in enumerate(students)}
+        self._test_index = {test_id: column for column, (test_id, _) in enumerate(tests)}
+        self.cells = array('d', [MISSING]) * (len(students) * len(tests))
+
+    @classmethod
+    def for_sinf(cls, sinf):
+        students = [
+            (student_id, f"{last_name} {first_name}".strip() or username)
+            for student_id, username, first_name, last_name in StudentProfile.objects.filter(sinf=sinf)
+            .order_by('user__last_name', 'user__first_name', 'user__username')
+            .values_list('pk', 'user__username', 'user__first_name', 'user__last_name')
+        ]
+        tests = list(Test.objects.filter(sinf=sinf).order_by('yaratilgan_sana', 'id').values_list('id', 'nom'))
+        gradebook = cls(students, tests)
+        gradebook.fill(
+            TestResult.objects.filter(test__sinf=sinf, student__sinf=sinf)
+            .values_list('student_id', 'test_id', 'jami_ball')
+        )
+        return gradebook
+
+    def fill(self, rows):
+        """``(student_id, test_id, ball)`` qatorlarini matritsaga joylaydi; ro'yxatda yo'qlari tashlanadi."""
+        width = len(self.tests)
+        student_index, test_index, cells = self._student_index, self._test_index, self.cells
+        for student_id, test_id, score in rows:
+            row = student_index.get(student_id)
+            column = test_index.get(test_id)
+            if row is not None and column is not None:
+                cells[row * width + column] = float(score)
+
+    def score(self, student_id, test_id):
+        value = self.cells[self._student_index[student_id] * len(self.tests) + self._test_index[test_id]]
+        return None if math.isnan(value) else value
+
+    def rows(self):
+        width = len(self.tests)
+        for row, (student_id, name) in enumerate(self.students):
+            scores = self.cells[row * width:(row + 1) * width]
+            taken = [value for value in scores if not math.isnan(value)]
+            yield GradebookRow(
+                student_id, name,
+                [None if math.isnan(value) else value for value in scores],
+                math.fsum(taken), len(taken),
+            )
+
+    def column_stats(self):
+        """Har bir test uchun ``(topshirganlar, yig'indi, o'rtacha)``."""
+        width = len(self.tests)
+        stats = []
+        for column in range(width):
+            taken = [value for value in self.cells[column::width] if not math.isnan(value)]
+            total = math.fsum(taken)
+            stats.append((len(taken), total, total / len(taken) if taken else None))
+        return stats
+
+    def class_average(self):
+        """Barcha topshirilgan kataklar bo'yicha o'rtacha ball."""
+        taken = [value for value in self.cells if not math.isnan(value)]
+        return math.fsum(taken) / len(taken) if taken else None
@@ -0,0 +1,216 @@
+# core/grading.py
+"""
+Test javoblarini baholash xizmati.
+
+Testning javoblar kaliti (savol IDlari, ballari va to'g'ri variantlar) bitta
+so'rov bilan yuklanadi, keyin butun topshiriq xotirada baholanadi. Shu sababli
+so'rovlar soni testdagi savollar soniga bog'liq emas. Modul view, admin va
+ommaviy qayta baholash uchun umumiy.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Savol, StudentAnswer, StudentProfile, TestResult
+from .test_stats import refresh_result_stats
+
+
+class AnswerKey:
+    """Bitta testning javoblar kaliti (faqat ID va ballar, matnlarsiz)."""
+
+    __slots__ = ('test_id', 'question_points', 'variant_owner', 'correct_variants')
+
+    def __init__(self, test_id, question_points, variant_owner, correct_variants):
+        self.test_id = test_id
+        self.question_points = question_points  # {savol_id: ball}, savollar tartibida
+        self.variant_owner = variant_owner  # {variant_id: savol_id}
+        self.correct_variants = correct_variants  # {variant_id, ...}
+
+    @property
+    def total_questions(self):
+        return len(self.question_points)
+
+    @staticmethod
+    def rows(test_id):
+        """(savol_id, ball, variant_id, is_correct) qatorlari - bitta LEFT JOIN so'rovi."""
+        return (
+            Savol.objects.filter(test_id=test_id)
+            .order_by('id', 'variantlar__id')
+            .values_list('id', 'ball', 'variantlar__id', 'variantlar__is_correct')
+        )
+
+    @classmethod
+    def load(cls, test):
+        """Kalitni bitta (LEFT JOIN) so'rov bilan yuklaydi."""
+        test_id = getattr(test, 'pk', test)
+        rows = cls.rows(test_id)
+
+        question_points = {}
+        variant_owner = {}
+        correct_variants = set()
+        for savol_id, ball, variant_id, is_correct in rows:
+            question_points[savol_id] = ball
+            if variant_id is None:
+                continue
+            variant_owner[variant_id] = savol_id
+            if is_correct:
+                correct_variants.add(variant_id)
+
+        return cls(test_id, question_points, variant_owner, frozenset(correct_variants))
+
+
+class GradedAnswer:
+    """Bitta savolga berilgan javobning baholangan holati."""
+
+    __slots__ = ('savol_id', 'variant_id', 'is_correct', 'ball')
+
+    def __init__(self, savol_id, variant_id, is_correct, ball):
+        self.savol_id = savol_id
+        self.variant_id = variant_id
+        self.is_correct = is_correct
+        self.ball = ball
+
+
+class GradingResult:
+    """Butun topshiriq bo'yicha umumiy natija."""
+
+    __slots__ = ('total_score', 'correct_count', 'total_questions', 'answers')
+
+    def __init__(self, total_score, correct_count, total_questions, answers):
+        self.total_score = total_score
+        self.correct_count = correct_count
+        self.total_questions = total_questions
+        self.answers = answers  # [GradedAnswer, ...]
+
+
+def selected_from_post(data, answer_key):
+    """
+    POST ma'lumotlaridan ``{savol_id: variant_id}`` lug'atini yig'adi.
+    Maydon nomlari ``savol_<id>`` ko'rinishida; noto'g'ri qiymatlar tashlab yuboriladi.
+    """
+    selected = {}
+    for savol_id in answer_key.question_points:
+        raw_value = data.get(f'savol_{savol_id}')
+        if not raw_value:
+            continue
+        try:
+            selected[savol_id] = int(raw_value)
+        except (TypeError, ValueError):
+            continue
+    return selected
+
+
+def grade(answer_key, selected):
+    """
+    Topshiriqni xotirada baholaydi. ``selected`` - ``{savol_id: variant_id}``.
+    Savolga tegishli bo'lmagan variantlar e'tiborga olinmaydi.
+    """
+    total_score = 0
+    correct_count = 0
+    answers = []
+
+    for savol_id, ball in answer_key.question_points.items():
+        variant_id = selected.get(savol_id)
+        if variant_id is None or answer_key.variant_owner.get(variant_id) != savol_id:
+            continue
+
+        is_correct = variant_id in answer_key.correct_variants
+        if is_correct:
+            total_score += ball
+            correct_count += 1
+        answers.append(GradedAnswer(savol_id, variant_id, is_correct, ball))
+
+    return GradingResult(total_score, correct_count, answer_key.total_questions, answers)
+
+
+def build_student_answers(result, grading):
+    """Baholangan javoblardan saqlanmagan StudentAnswer obyektlarini yasaydi."""
+    return [
+        StudentAnswer(
+            result=result,
+            savol_id=answer.savol_id,
+            tanlangan_variant_id=answer.variant_id,
+            is_correct=answer.is_correct,
+            ball=answer.ball,
+        )
+        for answer in grading.answers
+    ]
+
+
+def regrade_results(results):
+    """
+    Berilgan natijalarni joriy javoblar kaliti bo'yicha qayta baholaydi.
+
+    Har bir test uchun kalit bir marta yuklanadi; javoblar, natijalar va
+    o'quvchi umumiy ballari ommaviy yangilanadi. Yangilangan natijalar sonini qaytaradi.
+    """
+    results = list(results)
+    if not results:
+        return 0
+
+    results_by_id = {result.id: result for result in results}
+    keys = {}
+    for result in results:
+        if result.test_id not in keys:
+            keys[result.test_id] = AnswerKey.load(result.test_id)
+
+    answers = list(
+        StudentAnswer.objects.filter(result_id__in=results_by_id)
+        .only('id', 'result_id', 'savol_id', 'tanlangan_variant_id', 'is_correct', 'ball')
+    )
+
+    for result in results:
+        result.jami_ball = 0
+        result.togri_javoblar_soni = 0
+        result.umumiy_savollar_soni = keys[result.test_id].total_questions
+
+    for answer in answers:
+        result = results_by_id[answer.result_id]
+        key = keys[result.test_id]
+        variant_id = answer.tanlangan_variant_id
+        answer.ball = key.question_points.get(answer.savol_id, answer.ball)
+        answer.is_correct = (
+            variant_id is not None
+            and key.variant_owner.get(variant_id) == answer.savol_id
+            and variant_id in key.correct_variants
+        )
+        if answer.is_correct:
+            result.jami_ball += answer.ball
+            result.togri_javoblar_soni += 1
+
+    with transaction.atomic():
+        StudentAnswer.objects.bulk_update(answers, ['is_correct', 'ball'], batch_size=500)
+        TestResult.objects.bulk_update(
+            results, ['jami_ball', 'togri_javoblar_soni', 'umumiy_savollar_soni'], batch_size=500
+        )
+        rebuild_total_points(StudentProfile.objects.filter(pk__in={result.student_id for result in results}))
+        refresh_result_stats(keys)
+
+    return len(results)
+
+
+def expected_total_points():
+    """Har bir o'quvchi uchun TestResult ballari yig'indisi: ``{student_id: total}`` (bitta GROUP BY so'rov)."""
+    return dict(
+        TestResult.objects.order_by()
+        .values('student_id')
+        .annotate(total=Sum('jami_ball'))
+        .values_list('student_id', 'total')
+    )
+
+
+def rebuild_total_points(profiles=None):
+    """
+    ``total_points`` ni natijalardan bitta UPDATE ... (SELECT SUM) so'rovi bilan qayta yozadi.
+    ``profiles`` berilmasa barcha o'quvchilar yangilanadi.
+    """
+    if profiles is None:
+        profiles = StudentProfile.objects.all()
+    student_totals = (
+        TestResult.objects.filter(student_id=OuterRef('pk'))
+        .order_by()
+        .values('student_id')
+        .annotate(total=Sum('jami_ball'))
+        .values('total')
+    )
+    return profiles.update(total_points=Coalesce(Subquery(student_totals), Value(0)))
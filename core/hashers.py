@@ -0,0 +1,32 @@
+# core/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.utils.module_loading import import_string
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Iteratsiyalar soni ``PASSWORD_PBKDF2_ITERATIONS`` sozlamasidan olinadigan PBKDF2.
+
+    Algoritm nomi standart (pbkdf2_sha256) bilan bir xil: mavjud xeshlar tekshiriladi,
+    iteratsiyalar soni farq qilsa, muvaffaqiyatli kirishda parol yangi qiymat bilan
+    qayta xeshlanadi (Django ``must_update``). Sozlama berilmasa Django standarti ishlatiladi.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+
+def encode_batch(hasher_path, iterations, items):
+    """
+    ``[(parol, tuz), ...]`` ni ``hasher_path`` xesherida xeshlaydi (jarayonlar puli ishchisi).
+
+    Ishchi jarayonda Django sozlamalari o'qilmaydi: iteratsiyalar soni chaqiruvchi
+    jarayondan aniq beriladi (``None`` - iteratsiyasiz xesher, masalan testlarda MD5).
+    Modul modellarni import qilmaydi, shuning uchun ishchida ``django.setup()`` shart emas.
+    """
+    hasher = import_string(hasher_path)()
+    if iterations is None:
+        return [hasher.encode(password, salt) for password, salt in items]
+    return [hasher.encode(password, salt, iterations) for password, salt in items]
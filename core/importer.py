@@ -0,0 +1,510 @@
+# core/importer.py
+"""
+Savollarni matndan yoki fayldan (.txt, .docx) import qilish.
+
+Manba satrma-satr o'qiladi va savol bloklariga (``#1.`` bilan boshlanadigan)
+ajratiladi; har bir blok darhol tahlil qilinadi va tekshiriladi. Tayyor savollar
+kichik bo'laklarda ``bulk_create`` bilan bitta tranzaksiya ichida yoziladi -
+biror blokda xato bo'lsa butun import bekor qilinadi. Shu sababli katta fayl
+ham xotiraga to'liq yuklanmaydi.
+"""
+import codecs
+import gzip
+import hashlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import time
+import zipfile
+from decimal import Decimal, InvalidOperation
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import transaction
+
+from .answer_cache import invalidate_test
+from .grading import regrade_results
+from .models import Savol, TestResult, Variant
+from .test_stats import refresh_content_stats
+
+# Tokenizator uchun oldindan kompilyatsiya qilingan naqshlar (satr boshidan, lstrip dan keyin)
+QUESTION_RE = re.compile(r'#\d+\.\s*(.*)')
+SCORE_RE = re.compile(r'#ball:\s*(\S*)\s*$', re.IGNORECASE)
+VARIANT_RE = re.compile(r'(\+?)([A-Z])\)\s*(.*)')
+
+DEFAULT_BALL = Decimal('1')
+BALL_QUANT = Decimal('0.01')
+MAX_BALL = Decimal('10000')
+
+BULK_BATCH_SIZE = 500
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_DOCUMENT = 'word/document.xml'
+NOT_DOCX_MESSAGE = "Fayl o'qilmadi: haqiqiy .docx hujjat emas."
+
+# Oldindan ko'rilgan import tasdiqlanmasa, fayli shuncha soniyadan keyin o'chiriladi
+IMPORT_PREVIEW_TTL = 60 * 60
+PREVIEW_TOKEN_RE = re.compile(r'[0-9a-f]{32}')
+
+
+class QuestionImportError(ValueError):
+    """
+    Matnda xatolar topilganda ko'tariladi; ``errors`` - ``[(satr_raqami, xabar), ...]``.
+    Butun faylga tegishli xatoda (masalan, .docx o'qilmadi) satr raqami None.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(format_import_error(line, message) for line, message in errors))
+
+
+def format_import_error(line, message):
+    return f"{line}-satr: {message}" if line is not None else message
+
+
+class ParsedQuestion:
+    """Tahlil qilingan bitta savol bloki."""
+
+    __slots__ = ('line', 'matn', 'ball', 'variants')
+
+    def __init__(self, line, matn, ball, variants):
+        self.line = line  # blok boshlangan satr raqami (1 dan)
+        self.matn = matn
+        self.ball = ball
+        self.variants = variants  # [(matn, is_correct), ...]
+
+
+# ---------------- Manbalar (satrlar oqimi) ----------------
+
+def iter_text_lines(uploaded_file, encoding='utf-8-sig'):
+    """Yuklangan matn faylini bo'laklab o'qib, satrlarni ketma-ket qaytaradi."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    tail = ''
+    for chunk in uploaded_file.chunks():
+        tail += decoder.decode(chunk)
+        lines = tail.splitlines(keepends=True)
+        # Oxirgi satr to'liq bo'lmasligi mumkin - keyingi bo'lakka qoldiramiz
+        tail = lines.pop() if lines and not lines[-1].endswith(('\n', '\r')) else ''
+        for line in lines:
+            yield line.rstrip('\r\n')
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def iter_docx_paragraphs(uploaded_file):
+    """
+    .docx faylidagi har bir paragrafni satr sifatida qaytaradi.
+    ``document.xml`` iterparse bilan o'qiladi, o'qilgan elementlar darhol tozalanadi.
+    Fayl .docx bo'lmasa yoki buzilgan bo'lsa QuestionImportError ko'tariladi.
+    """
+    try:
+        archive = zipfile.ZipFile(uploaded_file)
+    except zipfile.BadZipFile:
+        raise QuestionImportError([(None, NOT_DOCX_MESSAGE)])
+    with archive:
+        try:
+            document = archive.open(DOCX_DOCUMENT)
+        except KeyError:
+            raise QuestionImportError([(None, NOT_DOCX_MESSAGE)])
+        with document:
+            body = None
+            parts = []
+            try:
+                for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+                    tag = element.tag
+                    if event == 'start':
+                        if tag == WORD_NS + 'body':
+                            body = element
+                    elif tag == WORD_NS + 't':
+                        parts.append(element.text or '')
+                    elif tag in (WORD_NS + 'tab', WORD_NS + 'br'):
+                        parts.append(' ')
+                    elif tag == WORD_NS + 'p':
+                        yield ''.join(parts)
+                        parts = []
+                        # O'qilgan paragraflar daraxtda to'planib qolmasligi uchun
+                        element.clear()
+                        if body is not None:
+                            body.clear()
+            except ElementTree.ParseError as e:
+                raise QuestionImportError([(None, f"Hujjat matni o'qilmadi (buzilgan .docx): {e}")])
+
+
+def iter_uploaded_lines(uploaded_file):
+    """Fayl kengaytmasiga qarab mos o'quvchini tanlaydi."""
+    if uploaded_file.name.lower().endswith('.docx'):
+        return iter_docx_paragraphs(uploaded_file)
+    return iter_text_lines(uploaded_file)
+
+
+# ---------------- Tahlil ----------------
+
+class _QuestionBuilder:
+    """Tokenizator holati: hozir yig'ilayotgan savol bloki."""
+
+    __slots__ = ('line', 'text', 'ball', 'variants', 'error')
+
+    def __init__(self, line, first_text):
+        self.line = line
+        self.text = [first_text] if first_text else []
+        self.ball = None
+        self.variants = []  # [[matn_satrlari, is_correct], ...]
+        self.error = None
+
+    def fail(self, line, message):
+        if self.error is None:
+            self.error = (line, message)
+
+    def set_score(self, raw_value, line):
+        try:
+            score = Decimal(raw_value.replace(',', '.'))
+        except InvalidOperation:
+            return self.fail(line, f"Ball noto'g'ri: '{raw_value}'")
+        if not score.is_finite() or score < 0 or score != score.quantize(BALL_QUANT):
+            return self.fail(line, f"Ball musbat va ko'pi bilan 2 xonali kasr bo'lishi kerak: '{raw_value}'")
+        if score >= MAX_BALL:
+            return self.fail(line, f"Ball juda katta: '{raw_value}'")
+        self.ball = score
+
+    def add_variant(self, letter, is_correct, text, line):
+        expected = chr(ord('A') + len(self.variants))
+        if letter != expected:
+            return self.fail(line, f"'{expected})' varianti kutilgan edi, '{letter})' topildi.")
+        self.variants.append([[text] if text else [], is_correct])
+
+    def add_line(self, line_text):
+        if self.variants:
+            self.variants[-1][0].append(line_text)
+        else:
+            self.text.append(line_text)
+
+    def finish(self):
+        """``(ParsedQuestion yoki None, xato yoki None)`` qaytaradi."""
+        question_text = '\n'.join(self.text).strip()
+        if self.error:
+            return None, self.error
+        if not question_text and not self.variants and self.ball is None:
+            return None, None  # bo'sh blok
+        if not question_text:
+            return None, (self.line, "Savol matni bo'sh.")
+        if not self.variants:
+            return None, (self.line, "Savolda variantlar topilmadi.")
+        if not any(is_correct for _, is_correct in self.variants):
+            return None, (self.line, "To'g'ri javob (+) belgilanmagan.")
+
+        variants = [('\n'.join(lines).strip(), is_correct) for lines, is_correct in self.variants]
+        ball = self.ball if self.ball is not None else DEFAULT_BALL
+        return ParsedQuestion(self.line, question_text, ball, variants), None
+
+
+def iter_parsed(lines):
+    """
+    Satrlar oqimini bir marta o'tib, har bir savol uchun
+    ``(ParsedQuestion yoki None, xato yoki None)`` qaytaradi.
+
+    Grammatika (satr boshida):
+      ``#N. matn``   - yangi savol (keyingi satrlar savol matniga qo'shiladi);
+      ``#ball: 2.5`` - savol bali (kasr bo'lishi mumkin, vergul ham qabul qilinadi);
+      ``[+]X) matn`` - variant (A dan boshlab ketma-ket, ``+`` - to'g'ri javob);
+      boshqa satrlar  - oxirgi variant yoki savol matnining davomi.
+    Variant matni ichidagi ``A)`` kabi belgilar satr boshida bo'lmasa e'tiborga olinmaydi.
+    """
+    current = None
+    for number, line in enumerate(lines, start=1):
+        stripped = line.lstrip()
+        first = stripped[:1]
+
+        if first == '#':
+            match = QUESTION_RE.match(stripped)
+            if match:
+                if current is not None:
+                    yield current.finish()
+                current = _QuestionBuilder(number, match.group(1))
+                continue
+            if current is not None:
+                match = SCORE_RE.match(stripped)
+                if match:
+                    current.set_score(match.group(1), number)
+                    continue
+
+        if current is None:
+            continue  # birinchi savoldan oldingi matn
+
+        if first == '+' or (stripped[1:2] == ')' and 'A' <= first <= 'Z'):
+            match = VARIANT_RE.match(stripped)
+            # Variantlar boshlanmaguncha (ball yoki A) yo'q) satr savol matni hisoblanadi
+            if match and (current.variants or current.ball is not None or match.group(2) == 'A'):
+                current.add_variant(match.group(2), bool(match.group(1)), match.group(3).strip(), number)
+                continue
+
+        current.add_line(line.rstrip())
+
+    if current is not None:
+        yield current.finish()
+
+
+def parse_questions(raw_text):
+    """
+    Matnni savollarga ajratadi va tekshiradi.
+    ``(savollar, xatolar)`` juftligini qaytaradi, bazaga murojaat qilmaydi.
+    """
+    return parse_lines(raw_text.splitlines())
+
+
+def parse_lines(lines):
+    """Satrlar oqimini to'liq tahlil qiladi: ``(savollar, xatolar)``."""
+    questions = []
+    errors = []
+    for question, error in iter_parsed(lines):
+        if error:
+            errors.append(error)
+        elif question:
+            questions.append(question)
+    return questions, errors
+
+
+# ---------------- Yozish ----------------
+
+class QuestionImporter:
+    """
+    Matnni tahlil qilib, Savol va Variantlarni yaratish uchun yordamchi klass.
+    Docx shablonidagi (#1., #ball:, +A) formatini tahlil qiladi.
+    """
+
+    def __init__(self, test_instance):
+        self.test = test_instance
+
+    def process_text(self, raw_text):
+        """Matnni import qiladi va yaratilgan savollar sonini qaytaradi."""
+        return self.process_lines(raw_text.splitlines())
+
+    def process_file(self, uploaded_file):
+        """Yuklangan .txt yoki .docx faylni oqim sifatida import qiladi."""
+        return self.process_lines(iter_uploaded_lines(uploaded_file))
+
+    def process_lines(self, lines):
+        """
+        Satrlar oqimini blokma-blok tahlil qilib, bo'laklab yozadi.
+        Biror blokda xato bo'lsa QuestionImportError ko'tariladi va tranzaksiya bekor qilinadi.
+        """
+        errors = []
+        pending = []
+        imported_count = 0
+
+        with transaction.atomic():
+            for question, error in iter_parsed(lines):
+                if error:
+                    errors.append(error)
+                elif question and not errors:
+                    pending.append(question)
+                    if len(pending) >= BULK_BATCH_SIZE:
+                        imported_count += self.save(pending)
+                        pending = []
+
+            if errors:
+                raise QuestionImportError(errors)
+            if pending:
+                imported_count += self.save(pending)
+
+        return imported_count
+
+    @transaction.atomic
+    def save(self, questions):
+        """Tahlil qilingan savollarni bitta tranzaksiyada ommaviy yozadi."""
+        savollar = Savol.objects.bulk_create(
+            [Savol(test=self.test, matn=q.matn, ball=q.ball) for q in questions],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        Variant.objects.bulk_create(
+            [
+                Variant(savol=savol, matn=matn, is_correct=is_correct)
+                for savol, question in zip(savollar, questions)
+                for matn, is_correct in question.variants
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        # bulk_create signal yubormaydi, shuning uchun kesh va statistikani o'zimiz yangilaymiz
+        invalidate_test(self.test.pk)
+        refresh_content_stats(self.test.pk, create=True)
+        return len(savollar)
+
+
+# ---------------- Oldindan ko'rish va farq (delta) ----------------
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _normalize(text):
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def stem_hash(matn):
+    """Savolni aniqlash uchun faqat savol matnining xeshi."""
+    return hashlib.sha1(_normalize(matn).encode('utf-8')).hexdigest()
+
+
+def content_hash(matn, ball, variants):
+    """Savol, ball va variantlarning (tartibi bilan) to'liq xeshi."""
+    digest = hashlib.sha1(_normalize(matn).encode('utf-8'))
+    digest.update(f"|{Decimal(ball).quantize(BALL_QUANT)}".encode())
+    for variant_text, is_correct in variants:
+        digest.update(f"|{'+' if is_correct else '-'}{_normalize(variant_text)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PlannedQuestion:
+    """Import rejasidagi bitta savol: holati va (bo'lsa) mos mavjud savol."""
+
+    __slots__ = ('status', 'question', 'savol_id')
+
+    def __init__(self, status, question, savol_id=None):
+        self.status = status
+        self.question = question
+        self.savol_id = savol_id
+
+
+def diff_questions(test, questions):
+    """
+    Tahlil qilingan savollarni testdagi mavjud savollar bilan solishtiradi.
+
+    Savollar matni bo'yicha juftlanadi; matn bir xil, lekin ball yoki variantlar
+    farq qilsa - ``changed``, hammasi bir xil bo'lsa - ``unchanged``, aks holda ``new``.
+    Ikki so'rov bajariladi (savollar va variantlar).
+    """
+    existing_variants = {}
+    for savol_id, matn, is_correct in (
+        Variant.objects.filter(savol__test=test).order_by('savol_id', 'id')
+        .values_list('savol_id', 'matn', 'is_correct')
+    ):
+        existing_variants.setdefault(savol_id, []).append((matn, is_correct))
+
+    by_stem = {}
+    for savol_id, matn, ball in Savol.objects.filter(test=test).order_by('id').values_list('id', 'matn', 'ball'):
+        fingerprint = content_hash(matn, ball, existing_variants.get(savol_id, []))
+        by_stem.setdefault(stem_hash(matn), []).append((savol_id, fingerprint))
+
+    plan = []
+    for question in questions:
+        candidates = by_stem.get(stem_hash(question.matn))
+        if not candidates:
+            plan.append(PlannedQuestion(NEW, question))
+            continue
+        savol_id, fingerprint = candidates.pop(0)  # har bir mavjud savol faqat bir marta juftlanadi
+        status = UNCHANGED if fingerprint == content_hash(question.matn, question.ball, question.variants) else CHANGED
+        plan.append(PlannedQuestion(status, question, savol_id))
+    return plan
+
+
+@transaction.atomic
+def apply_plan(test, plan):
+    """
+    Rejadagi faqat yangi va o'zgargan savollarni yozadi: ``{holat: soni}`` qaytaradi.
+
+    O'zgargan savollarning variantlari o'rni bo'yicha joyida yangilanadi, shuning
+    uchun avvalgi o'quvchi javoblari bog'langan variant IDlari saqlanib qoladi.
+    To'g'ri variant yoki ball o'zgargani uchun testning saqlangan natijalari shu
+    tranzaksiyada yangi kalit bo'yicha qayta baholanadi (``regrade_results`` o'quvchi
+    umumiy ballari va TestStats ni ham yangilaydi); soni ``'regraded'`` kalitida.
+    """
+    new_questions = [item.question for item in plan if item.status == NEW]
+    changed = {item.savol_id: item.question for item in plan if item.status == CHANGED}
+    regraded = 0
+
+    if new_questions:
+        QuestionImporter(test).save(new_questions)
+
+    if changed:
+        savollar = list(Savol.objects.filter(pk__in=changed).only('id', 'matn', 'ball'))
+        for savol in savollar:
+            savol.matn = changed[savol.pk].matn
+            savol.ball = changed[savol.pk].ball
+        Savol.objects.bulk_update(savollar, ['matn', 'ball'], batch_size=BULK_BATCH_SIZE)
+
+        current = {}
+        for variant in Variant.objects.filter(savol_id__in=changed).order_by('savol_id', 'id'):
+            current.setdefault(variant.savol_id, []).append(variant)
+
+        to_update, to_create, to_delete = [], [], []
+        for savol_id, question in changed.items():
+            old_variants = current.get(savol_id, [])
+            for index, (matn, is_correct) in enumerate(question.variants):
+                if index < len(old_variants):
+                    variant = old_variants[index]
+                    variant.matn, variant.is_correct = matn, is_correct
+                    to_update.append(variant)
+                else:
+                    to_create.append(Variant(savol_id=savol_id, matn=matn, is_correct=is_correct))
+            to_delete.extend(variant.pk for variant in old_variants[len(question.variants):])
+
+        Variant.objects.bulk_update(to_update, ['matn', 'is_correct'], batch_size=BULK_BATCH_SIZE)
+        Variant.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        if to_delete:
+            Variant.objects.filter(pk__in=to_delete).delete()
+        invalidate_test(test.pk)
+        refresh_content_stats(test.pk, create=True)  # ballar o'zgargan bo'lishi mumkin
+        regraded = regrade_results(
+            TestResult.objects.filter(test=test).only('id', 'test_id', 'student_id')
+        )
+
+    return {
+        NEW: len(new_questions),
+        CHANGED: len(changed),
+        UNCHANGED: sum(1 for item in plan if item.status == UNCHANGED),
+        'regraded': regraded,
+    }
+
+
+def preview_dir():
+    return getattr(settings, 'IMPORT_PREVIEW_DIR', None) or os.path.join(tempfile.gettempdir(), 'test_tizimi_import')
+
+
+def store_preview(questions):
+    """
+    Tasdiqlash bosqichi uchun tahlil qilingan savollarni serverdagi vaqtinchalik faylga
+    yozadi va uning tokenini qaytaradi (sessiyada faqat token saqlanadi).
+    Muddati o'tgan eski fayllar shu yerda tozalanadi.
+    """
+    directory = preview_dir()
+    os.makedirs(directory, exist_ok=True)
+    expired = time.time() - IMPORT_PREVIEW_TTL
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < expired:
+                os.remove(entry.path)
+        except OSError:
+            pass  # boshqa jarayon allaqachon o'chirgan
+
+    token = secrets.token_hex(16)
+    data = [[q.line, q.matn, str(q.ball), [[matn, is_correct] for matn, is_correct in q.variants]]
+            for q in questions]
+    with gzip.open(os.path.join(directory, f'{token}.json.gz'), 'wt', encoding='utf-8') as output:
+        json.dump(data, output, ensure_ascii=False)
+    return token
+
+
+def load_preview(token):
+    """Token bo'yicha savollarni o'qiydi va faylni o'chiradi; topilmasa yoki eskirgan bo'lsa None."""
+    if not isinstance(token, str) or not PREVIEW_TOKEN_RE.fullmatch(token):
+        return None
+    path = os.path.join(preview_dir(), f'{token}.json.gz')
+    try:
+        if os.path.getmtime(path) < time.time() - IMPORT_PREVIEW_TTL:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as source:
+            data = json.load(source)
+    except (OSError, ValueError):
+        return None
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return [ParsedQuestion(line, matn, Decimal(ball), [tuple(v) for v in variants])
+            for line, matn, ball, variants in data]
@@ -0,0 +1,282 @@
+# core/instrumentation.py
+"""
+Sahifalar tezligini o'lchash: SQL so'rovlar soni va vaqti, shablon render vaqti, umumiy kechikish.
+
+``PERF_INSTRUMENTATION = True`` bo'lsa PerfMiddleware core ilovasi sahifalarini
+(core.views va core.admin dagi maxsus admin sahifalari) o'lchaydi:
+
+* javobga ``Server-Timing`` sarlavhasi qo'shiladi (brauzer DevTools da ko'rinadi);
+* har bir jarayonda sahifa bo'yicha gistogramma yig'iladi va vaqti-vaqti bilan
+  ``PERF_METRICS_DIR/<pid>.json`` ga yoziladi - gunicorn ishchilari xotirasini
+  ``perf_report`` buyrug'i shu fayllardan birlashtiradi.
+
+SQL vaqti ``connection.execute_wrapper`` bilan, shablon vaqti InstrumentedDjangoTemplates
+dvigateli bilan o'lchanadi. So'rov boshiga bir nechta ``perf_counter`` chaqiruvi va
+qulf ostida lug'atni yangilash - doimiy yoqib qo'yish uchun yetarlicha arzon.
+"""
+import atexit
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.template.backends.django import DjangoTemplates
+
+# Kechikish gistogrammasi chegaralari (ms); oxirgi katak - undan kattalar
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current = contextvars.ContextVar('perf_collector', default=None)
+
+
+def metrics_dir():
+    return getattr(settings, 'PERF_METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'test_tizimi_perf')
+
+
+class RequestCollector:
+    """Bitta so'rov davomidagi o'lchovlar."""
+
+    __slots__ = ('queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper uchun
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class InstrumentedTemplate:
+    """Shablon render vaqtini joriy so'rov o'lchoviga qo'shadi."""
+
+    __slots__ = ('_wrapped',)
+
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    @property
+    def origin(self):
+        return self._wrapped.origin
+
+    @property
+    def template(self):
+        # django.template.Template (backend Template bilan bir xil interfeys)
+        return self._wrapped.template
+
+    def render(self, context=None, request=None):
+        collector = _current.get()
+        if collector is None:
+            return self._wrapped.render(context, request)
+        started = time.perf_counter()
+        try:
+            return self._wrapped.render(context, request)
+        finally:
+            collector.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, render vaqtini o'lchaydigan o'ram bilan (o'lchov yoqilmagan bo'lsa o'tkazib yuboradi)."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(super().get_template(template_name))
+
+
+class ViewStats:
+    """Bitta sahifa (view) bo'yicha yig'ilgan gistogramma."""
+
+    __slots__ = ('count', 'total_ms', 'db_ms', 'template_ms', 'queries', 'max_queries', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, total_ms, db_ms, template_ms, queries):
+        self.count += 1
+        self.total_ms += total_ms
+        self.db_ms += db_ms
+        self.template_ms += template_ms
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and total_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+
+    def merge(self, data):
+        self.count += data['count']
+        self.total_ms += data['total_ms']
+        self.db_ms += data['db_ms']
+        self.template_ms += data['template_ms']
+        self.queries += data['queries']
+        self.max_queries = max(self.max_queries, data['max_queries'])
+        for index, value in enumerate(data['buckets'][:len(self.buckets)]):
+            self.buckets[index] += value
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def percentile(self, fraction):
+        """
+        Gistogramma katagining yuqori chegarasi bo'yicha taxminiy persentil (ms).
+        Persentil oxirgi chegaradan (LATENCY_BUCKETS_MS[-1]) katta bo'lsa yoki o'lchov yo'q bo'lsa - None.
+        """
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        seen = 0
+        for index, value in enumerate(self.buckets[:len(LATENCY_BUCKETS_MS)]):
+            seen += value
+            if seen >= threshold:
+                return LATENCY_BUCKETS_MS[index]
+        return None
+
+
+class MetricsRegistry:
+    """Jarayon ichidagi gistogrammalar; davriy ravishda JSON faylga yoziladi."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, view_name, total_ms, db_ms, template_ms, queries):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = ViewStats()
+            stats.add(total_ms, db_ms, template_ms, queries)
+            due = time.monotonic() - self._last_flush >= getattr(settings, 'PERF_FLUSH_INTERVAL', 30)
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._views.items()}
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def flush(self):
+        """Jarayon holatini ``<pid>.json`` ga atomar yozadi (jarayon yig'indisi, ustiga yoziladi)."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+        data = self.snapshot()
+        if not data:
+            return
+        directory = metrics_dir()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'{os.getpid()}.json')
+            temporary = f'{path}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as output:
+                json.dump({'pid': os.getpid(), 'written_at': time.time(), 'views': data}, output)
+            os.replace(temporary, path)
+        except OSError:
+            # O'lchov hech qachon so'rovni buzmasligi kerak
+            pass
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+def pid_is_running(pid):
+    """Shu mashinada ``pid`` li jarayon bormi (POSIX dan tashqarida doim True)."""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # boshqa foydalanuvchining jarayoni
+    return True
+
+
+def metric_files(directory=None):
+    """``[(fayl_yo'li, pid), ...]`` - papkadagi jarayon fayllari."""
+    directory = directory or metrics_dir()
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return []
+    files = []
+    for name in names:
+        stem, extension = os.path.splitext(name)
+        if extension == '.json' and stem.isdigit():
+            files.append((os.path.join(directory, name), int(stem)))
+    return files
+
+
+def load_metrics(directory=None, live_only=False):
+    """
+    Jarayon fayllarini birlashtiradi: ``{view_name: ViewStats}``. ``live_only`` - faqat hozir
+    ishlayotgan jarayonlar fayllari (to'xtagan yoki qayta ishga tushgan ishchilar tashlab ketiladi).
+    """
+    merged = {}
+    for path, pid in metric_files(directory):
+        if live_only and not pid_is_running(pid):
+            continue
+        try:
+            with open(path, encoding='utf-8') as source:
+                views = json.load(source)['views']
+        except (OSError, ValueError, KeyError):
+            continue
+        for view_name, data in views.items():
+            merged.setdefault(view_name, ViewStats()).merge(data)
+    return merged
+
+
+def _is_instrumented(resolver_match):
+    # core.views sahifalari va core.admin dagi maxsus admin sahifalari (import, tahlil, jurnal)
+    return resolver_match is not None and getattr(resolver_match.func, '__module__', '').startswith('core.')
+
+
+class PerfMiddleware:
+    """PERF_INSTRUMENTATION yoqilganda core sahifalarini o'lchaydi va Server-Timing qo'shadi."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = RequestCollector()
+        token = _current.set(collector)
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(collector):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if _is_instrumented(getattr(request, 'resolver_match', None)):
+            db_ms = collector.db_time * 1000
+            template_ms = collector.template_time * 1000
+            registry.record(request.resolver_match.view_name, total_ms, db_ms, template_ms, collector.queries)
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{collector.queries} queries", '
+                f'tpl;dur={template_ms:.1f}, total;dur={total_ms:.1f}'
+            )
+        return response
@@ -0,0 +1,154 @@
+# core/item_analysis.py
+"""
+Savollar tahlili (item analysis): qiyinlik va ajratish ko'rsatkichlari.
+
+Har bir savol uchun to'g'ri javoblar ulushi, har bir variant necha marta
+tanlangani va umumiy ball bilan nuqta-biserial korrelyatsiya hisoblanadi.
+
+Hisob guruhlangan agregat so'rovlardan olingan yetarli statistikalarga
+asoslanadi (soni, yig'indi, kvadratlar yig'indisi, to'g'ri javob berganlarning
+ball yig'indisi) - StudentAnswer qatorlari Pythonga o'qilmaydi. Statistikalar
+(test, content_version) bo'yicha keshlanadi va keyingi chaqiruvlarda faqat
+oxirgi hisoblangan natijadan keyingi yangi natijalar qo'shiladi.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Max, Q, Sum
+
+from .answer_cache import get_test_content
+from .models import StudentAnswer, TestResult
+
+ITEM_ANALYSIS_CACHE_TIMEOUT = getattr(settings, 'ITEM_ANALYSIS_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def _cache_key(test):
+    return f'item_analysis:{test.pk}:{test.content_version}'
+
+
+def _empty_state():
+    # items: {savol_id: [javob_berganlar, to'g'ri, to'g'ri javob berganlarning ball yig'indisi]}
+    return {'last_result_id': 0, 'n': 0, 'sum_t': 0.0, 'sum_t2': 0.0, 'items': {}, 'variants': {}}
+
+
+def _collect(test, state):
+    """Holatga ``last_result_id`` dan keyingi natijalarni qo'shadi. Yangilangan bo'lsa True."""
+    last = state['last_result_id']
+    new = Q(id__gt=last)
+    totals = TestResult.objects.filter(test=test).aggregate(
+        known=Count('id', filter=Q(id__lte=last)),
+        n=Count('id', filter=new),
+        sum_t=Sum('jami_ball', filter=new, output_field=FloatField()),
+        sum_t2=Sum(F('jami_ball') * F('jami_ball'), filter=new, output_field=FloatField()),
+        max_id=Max('id'),
+    )
+    if totals['known'] != state['n']:
+        # Natija o'chirilgan yoki kechikib yozilgan: qisman yangilash ishonchsiz - boshidan hisoblaymiz
+        state.update(_empty_state())
+        _collect(test, state)
+        return True
+    if not totals['n']:
+        return False
+
+    answers = StudentAnswer.objects.filter(result__test=test, result_id__gt=last, result_id__lte=totals['max_id'])
+    per_item = answers.values('savol_id').annotate(
+        answered=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+        sum_t_correct=Sum('result__jami_ball', filter=Q(is_correct=True), output_field=FloatField()),
+    )
+    for row in per_item:
+        item = state['items'].setdefault(row['savol_id'], [0, 0, 0.0])
+        item[0] += row['answered']
+        item[1] += row['correct']
+        item[2] += row['sum_t_correct'] or 0.0
+
+    per_variant = answers.exclude(tanlangan_variant_id=None).values('tanlangan_variant_id').annotate(chosen=Count('id'))
+    for row in per_variant:
+        variant_id = row['tanlangan_variant_id']
+        state['variants'][variant_id] = state['variants'].get(variant_id, 0) + row['chosen']
+
+    state['n'] += totals['n']
+    state['sum_t'] += totals['sum_t'] or 0.0
+    state['sum_t2'] += totals['sum_t2'] or 0.0
+    state['last_result_id'] = totals['max_id']
+    return True
+
+
+def load_statistics(test):
+    """Keshdagi statistikani yangi natijalar bilan to'ldirib qaytaradi."""
+    key = _cache_key(test)
+    state = cache.get(key) or _empty_state()
+    if _collect(test, state):
+        cache.set(key, state, ITEM_ANALYSIS_CACHE_TIMEOUT)
+    return state
+
+
+class VariantStats:
+    __slots__ = ('variant', 'chosen', 'share')
+
+    def __init__(self, variant, chosen, share):
+        self.variant = variant
+        self.chosen = chosen
+        self.share = share
+
+
+class ItemStats:
+    __slots__ = ('savol', 'answered', 'correct', 'p_value', 'point_biserial', 'variants')
+
+    def __init__(self, savol, answered, correct, p_value, point_biserial, variants):
+        self.savol = savol
+        self.answered = answered
+        self.correct = correct
+        self.p_value = p_value  # to'g'ri javoblar ulushi (0..1), javobsizlar noto'g'ri hisoblanadi
+        self.point_biserial = point_biserial  # aniqlanmasa None
+        self.variants = variants
+
+
+class ItemAnalysis:
+    __slots__ = ('test', 'participants', 'mean', 'std', 'items')
+
+    def __init__(self, test, participants, mean, std, items):
+        self.test = test
+        self.participants = participants
+        self.mean = mean
+        self.std = std
+        self.items = items
+
+
+def point_biserial(n, mean, std, correct, sum_t_correct):
+    """
+    r_pb = (M1 - M0) / s * sqrt(p * q), bu yerda M1/M0 - to'g'ri/noto'g'ri javob
+    berganlarning o'rtacha bali, s - umumiy ballning standart chetlanishi.
+    """
+    if not n or not std or correct in (0, n):
+        return None
+    p = correct / n
+    mean_correct = sum_t_correct / correct
+    mean_wrong = (mean * n - sum_t_correct) / (n - correct)
+    return (mean_correct - mean_wrong) / std * math.sqrt(p * (1 - p))
+
+
+def analyze_test(test):
+    """Test bo'yicha to'liq hisobot (savollar keshdan, statistika agregat so'rovlardan)."""
+    state = load_statistics(test)
+    n = state['n']
+    mean = state['sum_t'] / n if n else 0.0
+    variance = state['sum_t2'] / n - mean * mean if n else 0.0
+    std = math.sqrt(variance) if variance > 1e-12 else 0.0
+
+    items = []
+    for savol in get_test_content(test):
+        answered, correct, sum_t_correct = state['items'].get(savol.id, (0, 0, 0.0))
+        variants = [
+            VariantStats(variant, state['variants'].get(variant.id, 0),
+                         state['variants'].get(variant.id, 0) / n if n else 0.0)
+            for variant in savol.variantlar.all()
+        ]
+        items.append(ItemStats(
+            savol, answered, correct,
+            correct / n if n else None,
+            point_biserial(n, mean, std, correct, sum_t_correct),
+            variants,
+        ))
+    return ItemAnalysis(test, n, mean, std, items)
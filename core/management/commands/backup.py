@@ -0,0 +1,31 @@
+# core/management/commands/backup.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.backup import BACKUP_CHUNK_SIZE, backup
+
+
+class Command(BaseCommand):
+    help = (
+        "core jadvallarini katalogga zaxiralaydi: har bir model - birlamchi kalit bo'yicha bo'laklab "
+        "o'qilgan gzip JSON Lines fayli, oxirida manifest.json. Xotira jadval hajmiga bog'liq emas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Zaxira katalogi (yo'q bo'lsa yaratiladi).")
+        parser.add_argument('--chunk-size', type=int, default=BACKUP_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        def progress(model, count):
+            self.stdout.write(f"  {model._meta.label_lower}: {count:,}")
+
+        started = time.perf_counter()
+        manifest = backup(options['directory'], chunk_size=options['chunk_size'],
+                          progress=progress if options['verbosity'] > 1 else None)
+        for entry in manifest['models']:
+            self.stdout.write(f"{entry['model']:<22} {entry['rows']:>10,} qator")
+        total = sum(entry['rows'] for entry in manifest['models'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['directory']}: {total:,} qator {time.perf_counter() - started:.1f} s da zaxiralandi."
+        ))
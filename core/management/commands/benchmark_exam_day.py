@@ -0,0 +1,210 @@
+# core/management/commands/benchmark_exam_day.py
+import json
+import math
+import os
+import random
+import re
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.answer_cache import local_cache
+from core.instrumentation import RequestCollector
+from core.seeding import seed_school
+
+_TOKEN_RE = re.compile(r'name="submission_token" value="([0-9a-f]{32})"')
+_CHOICE_RE = re.compile(r'name="savol_(\d+)"\s+id="variant_\d+"\s+value="(\d+)"')
+
+ENDPOINTS = ('login', 'student_test_list', 'test_solve GET', 'test_solve POST', 'test_review')
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Imtihon kuni yuklama sinovi: alohida test bazasida sinflar, o'quvchilar va testlarni yaratadi, "
+        "so'ng har bir o'quvchi uchun login → testlar ro'yxati → test_solve GET/POST → test_review "
+        "oqimini iplar puli bilan bajaradi. p50/p95/p99, so'rov boshiga SQL va RPS ni chiqaradi va JSON ga yozadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=4)
+        parser.add_argument('--students', type=int, default=25, help="Har bir sinfdagi o'quvchilar soni.")
+        parser.add_argument('--tests', type=int, default=2, help="Har bir sinfdagi testlar soni.")
+        parser.add_argument('--questions', type=int, default=30, help="Har bir testdagi savollar soni.")
+        parser.add_argument('--threads', type=int, default=4, help="Parallel o'quvchilar (iplar) soni.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='exam_day_benchmark.json', help="Natijalar JSON fayli.")
+        parser.add_argument('--compare', help="Avvalgi JSON natija bilan p95 ni solishtirish.")
+        parser.add_argument('--keepdb', action='store_true', help="Test bazasini o'chirmaslik.")
+
+    def handle(self, *args, **options):
+        creation = connection.creation
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # Xotiradagi SQLite (shared cache) jadval darajasida qulflanadi - iplar uchun fayl kerak;
+            # IMMEDIATE tranzaksiyalar o'qishdan yozishga o'tishdagi "database is locked" ni oldini oladi
+            if not connection.settings_dict['TEST'].get('NAME'):
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    tempfile.gettempdir(), 'exam_day_benchmark.sqlite3'
+                )
+            connection.settings_dict['OPTIONS'].update(transaction_mode='IMMEDIATE', timeout=30)
+        self.stdout.write(f"Test bazasi yaratilmoqda ({connection.vendor})...")
+        creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        local_cache.clear()
+        try:
+            report = self._run(options)
+        finally:
+            connections.close_all()
+            creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        self._print(report)
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(f"Natijalar: {options['output']}")
+        if options['compare']:
+            self._compare(report, options['compare'])
+
+    def _run(self, options):
+        started = time.perf_counter()
+        school = seed_school(options['classes'], options['students'], options['tests'], options['questions'],
+                             seed=options['seed'])
+        seed_seconds = time.perf_counter() - started
+        self.stdout.write(f"{len(school.students)} o'quvchi, {sum(map(len, school.tests.values()))} test "
+                          f"yaratildi ({seed_seconds:.1f} s). Yuklama boshlanmoqda...")
+
+        samples = {name: [] for name in ENDPOINTS}
+        errors = []
+        lock = threading.Lock()
+
+        def student_flow(position, student):
+            _, username, sinf_id = student
+            class_tests = school.tests[sinf_id]
+            test_id = class_tests[position % len(class_tests)]
+            rng = random.Random(position)
+            client = Client()
+            local_samples = []
+
+            def timed(name, method, url, data=None):
+                collector = RequestCollector()
+                with connection.execute_wrapper(collector):
+                    begin = time.perf_counter()
+                    response = getattr(client, method)(url, data or {})
+                    elapsed = time.perf_counter() - begin
+                local_samples.append((name, elapsed * 1000, collector.queries))
+                return response
+
+            try:
+                response = timed('login', 'post', reverse('login'),
+                                 {'username': username, 'password': school.password})
+                if response.status_code != 302:
+                    raise RuntimeError(f"login {response.status_code}")
+                timed('student_test_list', 'get', reverse('student_test_list'))
+                solve_url = reverse('test_solve', args=[test_id])
+                page = timed('test_solve GET', 'get', solve_url).content.decode()
+
+                choices = {}
+                for savol_id, variant_id in _CHOICE_RE.findall(page):
+                    choices.setdefault(savol_id, []).append(variant_id)
+                data = {f'savol_{savol_id}': rng.choice(ids) for savol_id, ids in choices.items()}
+                token = _TOKEN_RE.search(page)
+                if token:
+                    data['submission_token'] = token.group(1)
+                response = timed('test_solve POST', 'post', solve_url, data)
+                if response.status_code != 302:
+                    raise RuntimeError(f"test_solve POST {response.status_code}")
+                timed('test_review', 'get', response['Location'])
+            except Exception as e:  # noqa: BLE001 - benchmark xatolarni yig'adi, to'xtamaydi
+                with lock:
+                    errors.append(f"{username}: {e}")
+            finally:
+                connection.close()
+            with lock:
+                for name, elapsed_ms, queries in local_samples:
+                    samples[name].append((elapsed_ms, queries))
+
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts):
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+                list(executor.map(student_flow, range(len(school.students)), school.students))
+            wall = time.perf_counter() - started
+
+        endpoints = {}
+        for name, values in samples.items():
+            latencies = sorted(elapsed for elapsed, _ in values)
+            if not latencies:
+                continue
+            mean = statistics.fmean(latencies)
+            endpoints[name] = {
+                'requests': len(latencies),
+                'p50_ms': round(percentile(latencies, 0.50), 2),
+                'p95_ms': round(percentile(latencies, 0.95), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2),
+                'mean_ms': round(mean, 2),
+                'queries_per_request': round(statistics.fmean(queries for _, queries in values), 2),
+                # Bitta ip (ishchi) ketma-ket bajara oladigan so'rovlar soni
+                'rps_per_worker': round(1000 / mean, 1) if mean else None,
+            }
+        total_requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+        return {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'session_engine': settings.SESSION_ENGINE,
+            'parameters': {name: options[name] for name in ('classes', 'students', 'tests', 'questions',
+                                                            'threads', 'seed')},
+            'seed_seconds': round(seed_seconds, 2),
+            'wall_seconds': round(wall, 2),
+            'total_requests': total_requests,
+            'throughput_rps': round(total_requests / wall, 1) if wall else None,
+            'errors': errors[:50],
+            'error_count': len(errors),
+            'endpoints': endpoints,
+        }
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{'endpoint':<18} {'soni':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'SQL':>6} {'rps/ip':>8}"
+        )
+        for name, row in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<18} {row['requests']:>6} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                f"{row['p99_ms']:>8.1f} {row['queries_per_request']:>6.1f} {row['rps_per_worker']:>8.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Jami: {report['total_requests']} so'rov {report['wall_seconds']} s da "
+            f"({report['throughput_rps']} so'rov/s, {report['parameters']['threads']} ip)"
+        ))
+        if report['error_count']:
+            self.stderr.write(f"{report['error_count']} ta xato, masalan: {report['errors'][:3]}")
+
+    def _compare(self, report, path):
+        try:
+            with open(path, encoding='utf-8') as source:
+                previous = json.load(source)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Solishtirish faylini o'qib bo'lmadi: {e}")
+        self.stdout.write(f"p95 solishtirish ({path}):")
+        for name, row in report['endpoints'].items():
+            before = previous.get('endpoints', {}).get(name)
+            if not before:
+                continue
+            change = (row['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+            queries = row['queries_per_request'] - before['queries_per_request']
+            self.stdout.write(f"  {name:<18} {before['p95_ms']:>8.1f} → {row['p95_ms']:>8.1f} ms "
+                              f"({change:+.0f}%), SQL {queries:+.1f}")
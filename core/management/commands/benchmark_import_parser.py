@@ -0,0 +1,52 @@
+# core/management/commands/benchmark_import_parser.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.importer import parse_questions
+
+
+def build_corpus(questions, variants, seed=0):
+    """Import formatidagi sun'iy savollar matnini yasaydi (bazaga murojaat qilmaydi)."""
+    rng = random.Random(seed)
+    lines = []
+    for number in range(1, questions + 1):
+        correct = rng.randrange(variants)
+        lines.append(f"#{number}. Savol {number}: x = {rng.randint(1, 99)} bo'lsa, A) va B) dan qaysi biri to'g'ri?")
+        lines.append("Qo'shimcha izoh satri.")
+        lines.append(f"#ball: {rng.choice(('1', '2', '2.5', '3'))}")
+        for index in range(variants):
+            prefix = '+' if index == correct else ''
+            lines.append(f"{prefix}{chr(ord('A') + index)}) Variant {index} matni {rng.random():.4f}")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = "Savol import tahlilchisining tezligini o'lchaydi (bazaga yozmaydi)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=10000, help="Korpusdagi savollar soni.")
+        parser.add_argument('--variants', type=int, default=5, help="Har bir savoldagi variantlar soni.")
+        parser.add_argument('--repeat', type=int, default=5, help="O'lchovlar soni (eng yaxshisi olinadi).")
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options['questions'], options['variants'])
+        self.stdout.write(
+            f"Korpus: {options['questions']} savol, {len(corpus.splitlines())} satr, {len(corpus) / 1e6:.1f} MB"
+        )
+
+        timings = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            questions, errors = parse_questions(corpus)
+            timings.append(time.perf_counter() - started)
+
+        if errors:
+            self.stderr.write(f"Kutilmagan xatolar: {errors[:5]}")
+        best = min(timings)
+        self.stdout.write(self.style.SUCCESS(
+            f"Eng yaxshi: {best * 1000:.1f} ms ({len(questions) / best:,.0f} savol/s), "
+            f"o'rtacha: {sum(timings) / len(timings) * 1000:.1f} ms"
+        ))
@@ -0,0 +1,95 @@
+# core/management/commands/benchmark_login.py
+import math
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from core.models import CustomUser, Sinf, StudentProfile
+
+BENCHMARK_USERNAME = '__benchmark_login__'
+BENCHMARK_SINF = '__bench__'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Bitta ishchi jarayon uchun kirish (login) tezligini o'lchaydi: parol tekshiruvi, "
+        "to'liq login POST va undan keyingi o'quvchi sahifalari. Bazadagi o'zgarishlar bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20, help="Login so'rovlari soni.")
+
+    def handle(self, *args, **options):
+        count = options['logins']
+        hasher = get_hasher('default')
+        self.stdout.write(
+            f"Sessiya: {settings.SESSION_ENGINE}, xesher: {hasher.algorithm} "
+            f"({getattr(hasher, 'iterations', '—')} iteratsiya)"
+        )
+
+        password = 'benchmark-parol'
+        encoded = make_password(password)
+        started = time.perf_counter()
+        for _ in range(count):
+            check_password(password, encoded)
+        verify = (time.perf_counter() - started) / count
+        self.stdout.write(f"Parol tekshiruvi: {verify * 1000:.1f} ms ({1 / verify:.1f} /s)")
+
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                self._bench_requests(count, password, encoded)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        finally:
+            teardown_test_environment()
+
+    def _bench_requests(self, count, password, encoded):
+        sinf, _ = Sinf.objects.get_or_create(nom=BENCHMARK_SINF)
+        user = CustomUser.objects.create(username=BENCHMARK_USERNAME, password=encoded, is_student=True)
+        StudentProfile.objects.create(user=user, sinf=sinf)
+
+        timings, queries = [], []
+        client = None
+        for _ in range(count):
+            client = Client()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = client.post(reverse('login'), {'username': BENCHMARK_USERNAME, 'password': password})
+                timings.append(time.perf_counter() - started)
+            if response.status_code != 302:
+                self.stderr.write(f"Kutilmagan javob: {response.status_code}")
+                return
+            queries.append(len(ctx.captured_queries))
+
+        self._report('Login POST', timings, queries)
+
+        for name in ('student_dashboard', 'student_test_list'):
+            timings, queries = [], []
+            for _ in range(count):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    client.get(reverse(name))
+                    timings.append(time.perf_counter() - started)
+                queries.append(len(ctx.captured_queries))
+            self._report(name, timings, queries)
+
+    def _report(self, name, timings, queries):
+        mean = statistics.fmean(timings)
+        p95 = sorted(timings)[max(0, math.ceil(len(timings) * 0.95) - 1)]
+        self.stdout.write(self.style.SUCCESS(
+            f"{name}: o'rtacha {mean * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+            f"{1 / mean:.1f} so'rov/s bitta ishchida, {statistics.fmean(queries):.1f} SQL so'rov"
+        ))
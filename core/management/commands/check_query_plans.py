@@ -0,0 +1,27 @@
+# core/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import check_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy sahifalar so'rovlarining EXPLAIN rejasini tekshiradi: har biri kutilgan indeksdan "
+        "foydalanishi kerak (SQLite va PostgreSQL). Indeks ishlatilmasa xato bilan tugaydi - CI uchun."
+    )
+
+    def handle(self, *args, **options):
+        results = check_plans()
+        for result in results:
+            if result.ok:
+                self.stdout.write(f"OK    {result.check.name}")
+            else:
+                missing = ', '.join(f"{table}({', '.join(columns)})" for table, columns in result.missing)
+                self.stdout.write(self.style.ERROR(f"XATO  {result.check.name}: indeks ishlatilmadi - {missing}"))
+            if not result.ok or options['verbosity'] > 1:
+                for line in result.plan.splitlines():
+                    self.stdout.write(f"      {line}")
+        failed = [result for result in results if not result.ok]
+        if failed:
+            raise CommandError(f"{len(failed)} ta so'rov kutilgan indeksdan foydalanmadi.")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} ta so'rov rejasi to'g'ri."))
@@ -0,0 +1,48 @@
+# core/management/commands/export_results.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import EXPORTS, FORMATS, stream_export
+from core.models import TestResult
+
+
+class Command(BaseCommand):
+    help = "Natijalar yoki javoblarni CSV/XLSX faylga oqim bilan eksport qiladi (o'zgarmas xotirada)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(EXPORTS), default='results',
+                            help="results - natija boshiga qator, answers - javob boshiga qator.")
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv', dest='fmt')
+        parser.add_argument('--test', type=int, action='append', help="Faqat shu test(lar) id si.")
+        parser.add_argument('--sinf', help="Faqat shu sinf nomi (masalan, 5-A).")
+        parser.add_argument('-o', '--output', default='-', help="Fayl yo'li; '-' - standart chiqish.")
+
+    def handle(self, *args, **options):
+        results = TestResult.objects.all()
+        if options['test']:
+            results = results.filter(test_id__in=options['test'])
+        if options['sinf']:
+            results = results.filter(student__sinf__nom=options['sinf'])
+
+        if options['fmt'] == 'xlsx' and options['output'] == '-' and sys.stdout.isatty():
+            raise CommandError("XLSX uchun --output fayl yo'lini ko'rsating.")
+
+        chunks, _ = stream_export(options['kind'], options['fmt'], results)
+        if options['output'] == '-':
+            self._write(sys.stdout.buffer, chunks)
+            sys.stdout.buffer.flush()
+            return
+        with open(options['output'], 'wb') as output:
+            written = self._write(output, chunks)
+        self.stderr.write(self.style.SUCCESS(f"{options['output']}: {written / 1024:.1f} KB yozildi."))
+
+    @staticmethod
+    def _write(output, chunks):
+        written = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            output.write(chunk)
+            written += len(chunk)
+        return written
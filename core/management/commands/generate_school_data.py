@@ -0,0 +1,63 @@
+# core/management/commands/generate_school_data.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.seeding import SeedingError, generate_school
+
+
+class Command(BaseCommand):
+    help = (
+        "Real maktab hajmidagi sun'iy ma'lumotlarni (sinflar, o'quvchilar, testlar, savollar, natijalar, "
+        "javoblar) seed bo'yicha takrorlanadigan qilib yaratadi. Masalan, ~1M javob: "
+        "--classes 40 --students 30 --tests 40 --questions 25"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=40, help="Sinflar soni.")
+        parser.add_argument('--students', type=int, default=30, help="Sinfdagi o'quvchilar soni (o'rtacha).")
+        parser.add_argument('--tests', type=int, default=20, help="Har bir sinfdagi testlar soni.")
+        parser.add_argument('--questions', type=int, default=25, help="Testdagi savollar soni (o'rtacha).")
+        parser.add_argument('--variants', type=int, default=4, help="Savoldagi variantlar soni.")
+        parser.add_argument('--participation', type=float, default=0.9,
+                            help="O'quvchining testni topshirish ehtimoli (0..1).")
+        parser.add_argument('--prefix', default='gen', help="Login va sinf nomlari prefiksi.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help="Tasdiq so'ramaslik.")
+
+    def handle(self, *args, **options):
+        expected = (options['classes'] * options['students'] * options['tests'] * options['participation']
+                    * options['questions'])
+        if options['interactive']:
+            answer = input(
+                f"'{connection.settings_dict['NAME']}' bazasiga taxminan {expected:,.0f} ta javob yoziladi. "
+                "Davom etilsinmi? [y/N] "
+            )
+            if answer.strip().lower() not in ('y', 'yes', 'ha'):
+                raise CommandError("Bekor qilindi.")
+
+        started = time.perf_counter()
+
+        def progress(counts):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"  {counts['results']:,} natija, {counts['answers']:,} javob ({elapsed:.1f} s)")
+
+        try:
+            school, counts = generate_school(
+                options['classes'], options['students'], options['tests'], options['questions'],
+                variants=options['variants'], participation=options['participation'], prefix=options['prefix'],
+                seed=options['seed'], batch_size=options['batch_size'],
+                progress=progress if options['verbosity'] > 1 else None,
+            )
+        except SeedingError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(school.sinf_ids)} sinf, {len(school.students):,} o'quvchi, "
+            f"{sum(map(len, school.tests.values())):,} test, {counts['results']:,} natija, "
+            f"{counts['answers']:,} javob - {elapsed:.1f} s ({counts['answers'] / elapsed:,.0f} javob/s). "
+            f"Parol: {school.password}"
+        ))
@@ -0,0 +1,33 @@
+# core/management/commands/item_analysis.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.html import strip_tags
+
+from core.item_analysis import analyze_test
+from core.models import Test
+
+
+class Command(BaseCommand):
+    help = "Test savollari tahlili: to'g'ri javoblar ulushi, variantlar tanlanishi va nuqta-biserial korrelyatsiya."
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_id', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            test = Test.objects.get(pk=options['test_id'])
+        except Test.DoesNotExist:
+            raise CommandError(f"#{options['test_id']} test topilmadi.")
+
+        report = analyze_test(test)
+        self.stdout.write(
+            f"{test.nom}: {report.participants} ishtirokchi, o'rtacha ball {report.mean:.2f}, "
+            f"standart chetlanish {report.std:.2f}"
+        )
+        for number, item in enumerate(report.items, start=1):
+            p_value = '—' if item.p_value is None else f"{item.p_value:.0%}"
+            r_pb = '—' if item.point_biserial is None else f"{item.point_biserial:+.2f}"
+            self.stdout.write(f"#{number} [{item.savol.id}] {strip_tags(item.savol.matn)[:60]}")
+            self.stdout.write(f"    to'g'ri: {p_value}, javob berganlar: {item.answered}, r_pb: {r_pb}")
+            for stats in item.variants:
+                marker = '+' if stats.variant.is_correct else ' '
+                self.stdout.write(f"    {marker} {stats.chosen:>5} ({stats.share:.0%}) {strip_tags(stats.variant.matn)[:50]}")
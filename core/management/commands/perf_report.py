@@ -0,0 +1,70 @@
+# core/management/commands/perf_report.py
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from core.instrumentation import LATENCY_BUCKETS_MS, load_metrics, metric_files, metrics_dir, pid_is_running
+
+
+class Command(BaseCommand):
+    help = (
+        "PerfMiddleware yig'gan sahifalar statistikasini (ishlayotgan ishchi jarayonlar bo'yicha) chiqaradi: "
+        "so'rovlar soni, kechikish persentillari, SQL va shablon vaqti."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help="Metrikalar papkasi (standart: PERF_METRICS_DIR).")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqarish.")
+        parser.add_argument('--all', action='store_true',
+                            help="To'xtagan jarayonlar fayllarini ham qo'shish (standart: faqat ishlayotganlar).")
+        parser.add_argument('--prune', action='store_true', help="To'xtagan jarayonlar fayllarini o'chirish.")
+        parser.add_argument('--reset', action='store_true', help="Chiqargandan keyin barcha fayllarni o'chirish.")
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or metrics_dir()
+        if options['prune']:
+            for path, pid in metric_files(directory):
+                if not pid_is_running(pid):
+                    os.remove(path)
+        metrics = load_metrics(directory, live_only=not options['all'])
+
+        rows = []
+        for view_name, stats in sorted(metrics.items(), key=lambda item: -item[1].total_ms):
+            count = stats.count or 1
+            rows.append({
+                'view': view_name,
+                'requests': stats.count,
+                # None - oxirgi gistogramma chegarasidan katta
+                'p50_ms': stats.percentile(0.50),
+                'p95_ms': stats.percentile(0.95),
+                'p99_ms': stats.percentile(0.99),
+                'mean_ms': round(stats.total_ms / count, 2),
+                'db_ms': round(stats.db_ms / count, 2),
+                'template_ms': round(stats.template_ms / count, 2),
+                'queries': round(stats.queries / count, 2),
+                'max_queries': stats.max_queries,
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2, allow_nan=False))
+        elif not rows:
+            self.stdout.write(f"{directory} da metrikalar yo'q (PERF_INSTRUMENTATION yoqilganmi?).")
+        else:
+            overflow = f">{LATENCY_BUCKETS_MS[-1]}"
+            self.stdout.write(
+                f"{'sahifa':<40} {'soni':>7} {'p50':>6} {'p95':>6} {'p99':>6} {'o`rt.':>8} "
+                f"{'SQL ms':>8} {'shablon':>8} {'SQL':>6} {'maks':>5}"
+            )
+            for row in rows:
+                p50, p95, p99 = (overflow if row[key] is None else row[key] for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+                self.stdout.write(
+                    f"{row['view'][:40]:<40} {row['requests']:>7} {p50:>6} {p95:>6} "
+                    f"{p99:>6} {row['mean_ms']:>8.1f} {row['db_ms']:>8.1f} {row['template_ms']:>8.1f} "
+                    f"{row['queries']:>6.1f} {row['max_queries']:>5}"
+                )
+            self.stdout.write("p50/p95/p99 - gistogramma katagining yuqori chegarasi (ms).")
+
+        if options['reset']:
+            for path, _ in metric_files(directory):
+                os.remove(path)
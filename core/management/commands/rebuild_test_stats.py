@@ -0,0 +1,39 @@
+# core/management/commands/rebuild_test_stats.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import TestStats
+from core.test_stats import STATS_FIELDS, expected_test_stats, rebuild_test_stats
+
+
+class Command(BaseCommand):
+    help = "TestStats (savollar soni, maksimal ball, topshirganlar, ballar yig'indisi) ni qayta hisoblaydi yoki tekshiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Faqat tekshirish: nomuvofiqliklarni chiqaradi va xato kodi bilan tugaydi.",
+        )
+
+    def handle(self, *args, **options):
+        expected = expected_test_stats()
+        stored = {test_id: tuple(values) for test_id, *values in TestStats.objects.values_list('test_id', *STATS_FIELDS)}
+        mismatches = [(test_id, stored.get(test_id), values) for test_id, values in expected.items()
+                      if stored.get(test_id) != values]
+
+        for test_id, current, values in mismatches[:50]:
+            self.stdout.write(f"  test #{test_id}: saqlangan={current}, kutilgan={values}")
+        if len(mismatches) > 50:
+            self.stdout.write(f"  ... va yana {len(mismatches) - 50} ta")
+
+        if options['check']:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} ta testning statistikasi noto'g'ri.")
+            self.stdout.write(self.style.SUCCESS("Barcha test statistikalari to'g'ri."))
+            return
+
+        with transaction.atomic():
+            updated = rebuild_test_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} ta test qayta hisoblandi ({len(mismatches)} tasida farq bor edi)."
+        ))
@@ -0,0 +1,41 @@
+# core/management/commands/rebuild_total_points.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.grading import expected_total_points, rebuild_total_points
+from core.models import StudentProfile
+
+
+class Command(BaseCommand):
+    help = "O'quvchilarning total_points qiymatini TestResult ballaridan qayta hisoblaydi yoki tekshiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Faqat tekshirish: nomuvofiqliklarni chiqaradi va xato kodi bilan tugaydi.",
+        )
+
+    def handle(self, *args, **options):
+        expected = expected_total_points()
+        mismatches = [
+            (student_id, stored, expected.get(student_id) or 0)
+            for student_id, stored in StudentProfile.objects.values_list('pk', 'total_points').iterator()
+            if stored != (expected.get(student_id) or 0)
+        ]
+
+        for student_id, stored, total in mismatches[:50]:
+            self.stdout.write(f"  o'quvchi #{student_id}: saqlangan={stored}, kutilgan={total}")
+        if len(mismatches) > 50:
+            self.stdout.write(f"  ... va yana {len(mismatches) - 50} ta")
+
+        if options['check']:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} ta o'quvchining umumiy bali noto'g'ri.")
+            self.stdout.write(self.style.SUCCESS("Barcha umumiy ballar to'g'ri."))
+            return
+
+        with transaction.atomic():
+            updated = rebuild_total_points()
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} ta profil qayta hisoblandi ({len(mismatches)} tasida farq bor edi)."
+        ))
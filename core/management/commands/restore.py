@@ -0,0 +1,35 @@
+# core/management/commands/restore.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backup import BACKUP_CHUNK_SIZE, BackupError, restore
+
+
+class Command(BaseCommand):
+    help = (
+        "backup buyrug'i yozgan zaxirani bo'sh (migratsiya qilingan) bazaga tiklaydi. Har bir bo'lak "
+        "alohida tranzaksiyada yoziladi; to'xtab qolgan tiklash --resume bilan davom ettiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Zaxira katalogi.")
+        parser.add_argument('--chunk-size', type=int, default=BACKUP_CHUNK_SIZE)
+        parser.add_argument('--resume', action='store_true',
+                            help="To'xtab qolgan tiklashni davom ettirish (yozilgan qatorlar o'tkazib yuboriladi).")
+
+    def handle(self, *args, **options):
+        def progress(model, count):
+            self.stdout.write(f"  {model._meta.label_lower}: {count:,}")
+
+        started = time.perf_counter()
+        try:
+            written = restore(options['directory'], chunk_size=options['chunk_size'], resume=options['resume'],
+                              progress=progress if options['verbosity'] > 1 else None)
+        except BackupError as e:
+            raise CommandError(str(e))
+        for label, count in written.items():
+            self.stdout.write(f"{label:<22} {count:>10,} qator")
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(written.values()):,} qator {time.perf_counter() - started:.1f} s da tiklandi."
+        ))
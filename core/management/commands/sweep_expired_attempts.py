@@ -0,0 +1,59 @@
+# core/management/commands/sweep_expired_attempts.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.answer_cache import get_answer_key
+from core.models import TestAttempt
+from core.submission import DEADLINE_GRACE, finalize_attempt
+
+
+class Command(BaseCommand):
+    help = (
+        "Muddati o'tgan, lekin topshirilmagan urinishlarni saqlangan qoralamadan baholab yakunlaydi. "
+        "Cron orqali har daqiqada ishga tushirish mumkin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Bir partiyadagi urinishlar soni.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = timezone.now() - DEADLINE_GRACE
+        finalized = 0
+        last_deadline, last_id = None, 0
+
+        while True:
+            # Qisman indeks (deadline, faqat result IS NULL) bo'yicha: barcha urinishlar skanerlanmaydi
+            batch = TestAttempt.objects.filter(result__isnull=True, deadline__lt=cutoff)
+            if last_deadline is not None:
+                batch = batch.filter(deadline__gte=last_deadline).exclude(deadline=last_deadline, id__lte=last_id)
+            attempts = list(
+                batch.select_related('student', 'test').order_by('deadline', 'id')[:batch_size]
+            )
+            if not attempts:
+                break
+            finalized += self.finalize(attempts)
+            last_deadline, last_id = attempts[-1].deadline, attempts[-1].id
+
+        # Urinish ochilgandan keyin testga tugash vaqti qo'yilgan (yoki u oldinga surilgan) bo'lsa,
+        # urinishning o'z muddati yo'q yoki eskirgan - bunday urinishlar test tugash vaqti bo'yicha
+        # yakunlanadi (test_solve dagi has_ended tekshiruvi kabi)
+        last_id = 0
+        while True:
+            attempts = list(
+                TestAttempt.objects.filter(result__isnull=True, test__tugash_vaqti__lt=cutoff, id__gt=last_id)
+                .select_related('student', 'test').order_by('id')[:batch_size]
+            )
+            if not attempts:
+                break
+            finalized += self.finalize(attempts)
+            last_id = attempts[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"{finalized} ta muddati o'tgan urinish yakunlandi."))
+
+    @staticmethod
+    def finalize(attempts):
+        for attempt in attempts:
+            # Javoblar kaliti test bo'yicha keshdan olinadi - partiya ichida qayta o'qilmaydi
+            finalize_attempt(attempt, get_answer_key(attempt.test))
+        return len(attempts)
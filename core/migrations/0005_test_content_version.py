@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:33
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_studentanswer_ball'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='content_version',
+            field=models.CharField(default=core.models.new_content_version, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_test_content_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['sinf', '-total_points'], name='profile_sinf_points_idx'),
+        ),
+    ]
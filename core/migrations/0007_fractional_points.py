@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_profile_sinf_points_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='savol',
+            name='ball',
+            field=models.DecimalField(decimal_places=2, default=1, help_text="Bu savol uchun beriladigan ball (kasr bo'lishi mumkin, masalan 2.5).", max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='studentanswer',
+            name='ball',
+            field=models.DecimalField(decimal_places=2, default=1, max_digits=6, verbose_name='Savol Bali'),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='total_points',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='testresult',
+            name='jami_ball',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Jami Ball'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:41
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_results(apps, schema_editor):
+    """
+    Unique cheklovdan oldin takroriy natijalarni o'chiradi: har bir (student, test)
+    uchun eng birinchi (rasmiy) natija qoladi, umumiy ballar qayta hisoblanadi.
+    """
+    TestResult = apps.get_model('core', 'TestResult')
+    StudentProfile = apps.get_model('core', 'StudentProfile')
+
+    keep_ids = (
+        TestResult.objects.order_by().values('student_id', 'test_id')
+        .annotate(first_id=Min('id')).values('first_id')
+    )
+    duplicates = TestResult.objects.exclude(id__in=keep_ids)
+    affected_students = set(duplicates.values_list('student_id', flat=True))
+    if not affected_students:
+        return
+    duplicates.delete()
+
+    student_totals = (
+        TestResult.objects.filter(student_id=OuterRef('pk')).order_by()
+        .values('student_id').annotate(total=Sum('jami_ball')).values('total')
+    )
+    StudentProfile.objects.filter(pk__in=affected_students).update(
+        total_points=Coalesce(Subquery(student_totals), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_fractional_points'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='submission_token',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True),
+        ),
+        migrations.RunPython(remove_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='testresult',
+            constraint=models.UniqueConstraint(fields=('student', 'test'), name='unique_result_per_student_test'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_testresult_idempotent_submission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answers', models.JSONField(blank=True, default=dict, verbose_name='Qoralama javoblar')),
+                ('boshlangan_vaqt', models.DateTimeField(auto_now_add=True, verbose_name='Boshlangan vaqt')),
+                ('yangilangan_vaqt', models.DateTimeField(auto_now=True, verbose_name='Oxirgi saqlash')),
+                ('result', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempt', to='core.testresult', verbose_name='Yakuniy natija')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.studentprofile', verbose_name="O'quvchi")),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.test', verbose_name='Test')),
+            ],
+            options={
+                'verbose_name': 'Test Urinishi',
+                'verbose_name_plural': 'Test Urinishlari',
+                'constraints': [models.UniqueConstraint(fields=('student', 'test'), name='unique_attempt_per_student_test')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_testattempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='boshlanish_vaqti',
+            field=models.DateTimeField(blank=True, help_text="Bo'sh bo'lsa test darhol ochiq.", null=True, verbose_name='Boshlanish vaqti'),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='davomiylik_daqiqa',
+            field=models.PositiveIntegerField(blank=True, help_text="Har bir o'quvchi uchun vaqt limiti. Bo'sh - cheklanmagan.", null=True, verbose_name='Davomiylik (daqiqa)'),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='tugash_vaqti',
+            field=models.DateTimeField(blank=True, help_text='Bu vaqtdan keyin javoblar qabul qilinmaydi.', null=True, verbose_name='Tugash vaqti'),
+        ),
+        migrations.AddField(
+            model_name='testattempt',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Oxirgi muddat'),
+        ),
+        migrations.AddIndex(
+            model_name='testattempt',
+            index=models.Index(condition=models.Q(('deadline__isnull', False), ('result__isnull', True)), fields=['deadline'], name='attempt_open_deadline_idx'),
+        ),
+    ]
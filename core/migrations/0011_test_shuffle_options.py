@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_timed_exams'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='savollarni_aralashtirish',
+            field=models.BooleanField(default=False, verbose_name='Savollarni aralashtirish'),
+        ),
+        migrations.AddField(
+            model_name='test',
+            name='variantlarni_aralashtirish',
+            field=models.BooleanField(default=False, verbose_name='Variantlarni aralashtirish'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_test_shuffle_options'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='variant',
+            options={'ordering': ['id'], 'verbose_name': 'Variant', 'verbose_name_plural': 'Variantlar'},
+        ),
+        # Avval yangi kompozit indekslar, so'ng ular qamrab oladigan FK indekslari olib tashlanadi
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(fields=['sinf', '-yaratilgan_sana'], name='test_sinf_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='variant',
+            index=models.Index(fields=['savol', 'is_correct'], name='variant_savol_correct_idx'),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='sinf',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.sinf'),
+        ),
+        migrations.AlterField(
+            model_name='test',
+            name='sinf',
+            field=models.ForeignKey(db_index=False, help_text="Bu test qaysi sinf o'quvchilari uchun mo'ljallangan.", on_delete=django.db.models.deletion.CASCADE, to='core.sinf'),
+        ),
+        migrations.AlterField(
+            model_name='testresult',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.studentprofile', verbose_name="O'quvchi"),
+        ),
+        migrations.AlterField(
+            model_name='variant',
+            name='savol',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='variantlar', to='core.savol'),
+        ),
+    ]
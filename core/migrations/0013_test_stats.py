@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_test_stats(apps, schema_editor):
+    """Mavjud testlar uchun ko'rsatkichlarni savollar va natijalardan hisoblaydi (ikkita GROUP BY)."""
+    Test = apps.get_model('core', 'Test')
+    Savol = apps.get_model('core', 'Savol')
+    TestResult = apps.get_model('core', 'TestResult')
+    TestStats = apps.get_model('core', 'TestStats')
+
+    content = {
+        row['test_id']: row for row in
+        Savol.objects.order_by().values('test_id').annotate(count=Count('id'), total=Sum('ball'))
+    }
+    results = {
+        row['test_id']: row for row in
+        TestResult.objects.order_by().values('test_id').annotate(count=Count('id'), total=Sum('jami_ball'))
+    }
+    empty = {'count': 0, 'total': 0}
+    TestStats.objects.bulk_create([
+        TestStats(
+            test_id=test_id,
+            savollar_soni=content.get(test_id, empty)['count'],
+            max_ball=content.get(test_id, empty)['total'] or 0,
+            natijalar_soni=results.get(test_id, empty)['count'],
+            ballar_yigindisi=results.get(test_id, empty)['total'] or 0,
+        )
+        for test_id in Test.objects.values_list('pk', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestStats',
+            fields=[
+                ('test', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.test')),
+                ('savollar_soni', models.PositiveIntegerField(default=0, verbose_name='Savollar soni')),
+                ('max_ball', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Maksimal ball')),
+                ('natijalar_soni', models.PositiveIntegerField(default=0, verbose_name='Topshirganlar soni')),
+                ('ballar_yigindisi', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name="Natijalar ballari yig'indisi")),
+            ],
+            options={
+                'verbose_name': 'Test Statistikasi',
+                'verbose_name_plural': 'Testlar Statistikasi',
+            },
+        ),
+        migrations.RunPython(populate_test_stats, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 # core/models.py
+import uuid
+from datetime import timedelta
 from typing import Any
 
 from django.db import models
@@ -33,12 +35,17 @@ class Sinf(models.Model):
 class StudentProfile(models.Model):
     """O'quvchi profili va umumiy ballarini saqlash."""
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True)
-    sinf = models.ForeignKey(Sinf, on_delete=models.SET_NULL, null=True, blank=True)
-    total_points = models.IntegerField(default=0)  # Rating uchun ishlatiladigan umumiy ball
+    # Alohida FK indeksi yo'q: (sinf, -total_points) indeksi sinf bo'yicha qidiruvga ham xizmat qiladi
+    sinf = models.ForeignKey(Sinf, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
+    total_points = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # Rating uchun ishlatiladigan umumiy ball
 
     class Meta:
         verbose_name = "O'quvchi Profili"
         verbose_name_plural = "O'quvchilar Profillari"
+        indexes = [
+            # Sinf ichidagi reyting va o'rinni hisoblash uchun
+            models.Index(fields=['sinf', '-total_points'], name='profile_sinf_points_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.sinf.nom if self.sinf else 'Sinf tanlanmagan'}"
@@ -46,29 +53,64 @@ class StudentProfile(models.Model):
 
 # ----------------- 2. Test Modellar -----------------
 
+def new_content_version():
+    """Test mazmuni versiyasi uchun yangi, takrorlanmaydigan belgi."""
+    return uuid.uuid4().hex
+
+
 # core/models.py - Qayta tuzatilgan Test modeli
 class Test(models.Model):
     """Asosiy test ma'lumotlari."""
     nom = models.CharField(max_length=255)
-    sinf = models.ForeignKey(Sinf, on_delete=models.CASCADE,
+    sinf = models.ForeignKey(Sinf, on_delete=models.CASCADE, db_index=False,
                              help_text="Bu test qaysi sinf o'quvchilari uchun mo'ljallangan.")
     yaratilgan_sana = models.DateTimeField(auto_now_add=True)
+    # Savol/Variant o'zgarganda yangilanadi (core.signals); javoblar kaliti keshining kaliti qismi
+    content_version = models.CharField(max_length=32, default=new_content_version, editable=False)
+    # Vaqt chegaralari (ixtiyoriy): test oynasi va har bir urinish uchun vaqt limiti
+    boshlanish_vaqti = models.DateTimeField(null=True, blank=True, verbose_name="Boshlanish vaqti",
+                                            help_text="Bo'sh bo'lsa test darhol ochiq.")
+    tugash_vaqti = models.DateTimeField(null=True, blank=True, verbose_name="Tugash vaqti",
+                                        help_text="Bu vaqtdan keyin javoblar qabul qilinmaydi.")
+    davomiylik_daqiqa = models.PositiveIntegerField(null=True, blank=True, verbose_name="Davomiylik (daqiqa)",
+                                                    help_text="Har bir o'quvchi uchun vaqt limiti. Bo'sh - cheklanmagan.")
+    # Ko'chirishni qiyinlashtirish: tartib har bir o'quvchi uchun (student, test) bo'yicha aniqlanadi
+    savollarni_aralashtirish = models.BooleanField(default=False, verbose_name="Savollarni aralashtirish")
+    variantlarni_aralashtirish = models.BooleanField(default=False, verbose_name="Variantlarni aralashtirish")
 
     class Meta:
         verbose_name = "Test"
         verbose_name_plural = "Testlar"
         ordering = ['-yaratilgan_sana']
+        indexes = [
+            # O'quvchi testlari ro'yxati: sinf bo'yicha filtr va yangi testlar birinchi (sinf FK indeksi o'rniga)
+            models.Index(fields=['sinf', '-yaratilgan_sana'], name='test_sinf_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nom} ({self.sinf.nom})"
 
+    def has_started(self, now):
+        return self.boshlanish_vaqti is None or now >= self.boshlanish_vaqti
+
+    def has_ended(self, now):
+        return self.tugash_vaqti is not None and now > self.tugash_vaqti
+
+    def attempt_deadline(self, started_at):
+        """Urinish uchun oxirgi muddat: vaqt limiti va test tugash vaqtining kichigi (yoki None)."""
+        deadlines = [self.tugash_vaqti] if self.tugash_vaqti else []
+        if self.davomiylik_daqiqa:
+            deadlines.append(started_at + timedelta(minutes=self.davomiylik_daqiqa))
+        return min(deadlines) if deadlines else None
+
 
 class Savol(models.Model):
     """Har bir testdagi savollar."""
     test = models.ForeignKey(Test, on_delete=models.CASCADE, related_name='savollar')
     matn = models.TextField(
         help_text=format_html("Matematik formula, rasm va formatlash (Bold, Code) kiritish mumkin."))
-    ball = models.IntegerField(default=1, help_text="Bu savol uchun beriladigan ball.")
+    ball = models.DecimalField(max_digits=6, decimal_places=2, default=1,
+                               help_text="Bu savol uchun beriladigan ball (kasr bo'lishi mumkin, masalan 2.5).")
 
     class Meta:
         verbose_name = "Savol"
@@ -81,33 +123,74 @@ class Savol(models.Model):
 
 class Variant(models.Model):
     """Savol uchun javob variantlari."""
-    savol = models.ForeignKey(Savol, on_delete=models.CASCADE, related_name='variantlar')
+    savol = models.ForeignKey(Savol, on_delete=models.CASCADE, related_name='variantlar', db_index=False)
     matn = models.TextField(help_text=format_html("Variant matni (Rich Text)."))
     is_correct = models.BooleanField(default=False, verbose_name="To'g'ri javob")
 
     class Meta:
         verbose_name = "Variant"
         verbose_name_plural = "Variantlar"
+        # Kiritilgan tartib; tartibsiz so'rov qaysi indeks tanlanganiga qarab har xil bo'lardi
+        ordering = ['id']
+        indexes = [
+            # Javoblar kaliti: savol variantlari va to'g'ri javob belgisi jadvalga murojaatsiz o'qiladi
+            # (savol FK indeksi o'rniga)
+            models.Index(fields=['savol', 'is_correct'], name='variant_savol_correct_idx'),
+        ]
 
     def __str__(self):
         return f"Variant {self.id}: {self.matn[:30]}"
 
 
+class TestStats(models.Model):
+    """
+    Test bo'yicha yig'ma ko'rsatkichlar (denormallashtirilgan, core.test_stats yangilaydi).
+
+    Ro'yxat sahifalari savollar va natijalar jadvallari ustida agregat o'rniga shu
+    bitta qatorni o'qiydi. O'rtacha ball yig'indi va son sifatida saqlanadi - natija
+    qo'shilganda F() orttirish bilan aniq yangilanadi.
+    """
+    test = models.OneToOneField(Test, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    savollar_soni = models.PositiveIntegerField(default=0, verbose_name="Savollar soni")
+    max_ball = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Maksimal ball")
+    natijalar_soni = models.PositiveIntegerField(default=0, verbose_name="Topshirganlar soni")
+    ballar_yigindisi = models.DecimalField(max_digits=14, decimal_places=2, default=0,
+                                           verbose_name="Natijalar ballari yig'indisi")
+
+    class Meta:
+        verbose_name = "Test Statistikasi"
+        verbose_name_plural = "Testlar Statistikasi"
+
+    def __str__(self):
+        return f"{self.test_id}: {self.savollar_soni} savol, {self.natijalar_soni} natija"
+
+    @property
+    def ortacha_ball(self):
+        return self.ballar_yigindisi / self.natijalar_soni if self.natijalar_soni else None
+
+
 # ----------------- 3. Natijalar Modellar -----------------
 
 class TestResult(models.Model):
     """O'quvchining rasmiy (eng birinchi) test natijasi."""
-    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, verbose_name="O'quvchi")
+    # student bo'yicha qidiruv (student, test) UNIQUE indeksidan foydalanadi
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, verbose_name="O'quvchi", db_index=False)
     test = models.ForeignKey(Test, on_delete=models.CASCADE, verbose_name="Test")
-    jami_ball = models.IntegerField(default=0, verbose_name="Jami Ball")
+    jami_ball = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name="Jami Ball")
     sinov_sanasi = models.DateTimeField(auto_now_add=True, verbose_name="Sinov Sanasi")
     umumiy_savollar_soni = models.IntegerField(default=0)  # Oldingi xatoda qo'shdik
     togri_javoblar_soni = models.IntegerField(default=0)  # Oldingi xatoda qo'shdik
+    # Test yechish formasidagi bir martalik belgi: takroriy POST shu natijaga olib keladi
+    submission_token = models.CharField(max_length=32, null=True, blank=True, unique=True, editable=False)
 
     class Meta:
         verbose_name = "Test Natijasi"
         verbose_name_plural = "Test Natijalari"
         ordering = ['-sinov_sanasi']
+        constraints = [
+            # Har bir o'quvchi uchun testning faqat bitta rasmiy natijasi
+            models.UniqueConstraint(fields=['student', 'test'], name='unique_result_per_student_test'),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.test.nom}: {self.jami_ball} ball"
@@ -119,11 +202,50 @@ class StudentAnswer(models.Model):
     savol = models.ForeignKey(Savol, on_delete=models.CASCADE)
     tanlangan_variant = models.ForeignKey(Variant, on_delete=models.SET_NULL, null=True)
     is_correct = models.BooleanField(default=False)
-    ball = models.IntegerField(default=1, verbose_name="Savol Bali")
+    ball = models.DecimalField(max_digits=6, decimal_places=2, default=1, verbose_name="Savol Bali")
 
     class Meta:
         verbose_name = "O'quvchi Javobi"
         verbose_name_plural = "O'quvchi Javoblari"
 
     def __str__(self):
-        return f"Javob: {self.savol.test.nom} - {self.result.student.user.username}"
\ No newline at end of file
+        return f"Javob: {self.savol.test.nom} - {self.result.student.user.username}"
+
+
+class TestAttempt(models.Model):
+    """
+    O'quvchining davom etayotgan urinishi (qoralama javoblar).
+
+    Javoblar har bir bosish uchun alohida qator emas, bitta JSON ustunida
+    ``{"savol_id": variant_id}`` ko'rinishida saqlanadi va avtosaqlash orqali yangilanadi.
+    """
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, verbose_name="O'quvchi")
+    test = models.ForeignKey(Test, on_delete=models.CASCADE, verbose_name="Test")
+    answers = models.JSONField(default=dict, blank=True, verbose_name="Qoralama javoblar")
+    boshlangan_vaqt = models.DateTimeField(auto_now_add=True, verbose_name="Boshlangan vaqt")
+    yangilangan_vaqt = models.DateTimeField(auto_now=True, verbose_name="Oxirgi saqlash")
+    result = models.OneToOneField(TestResult, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='attempt', verbose_name="Yakuniy natija")
+    deadline = models.DateTimeField(null=True, blank=True, verbose_name="Oxirgi muddat")
+
+    class Meta:
+        verbose_name = "Test Urinishi"
+        verbose_name_plural = "Test Urinishlari"
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'test'], name='unique_attempt_per_student_test'),
+        ]
+        indexes = [
+            # Muddati o'tgan ochiq urinishlarni supurish uchun (faqat yakunlanmaganlar indekslanadi)
+            models.Index(fields=['deadline'], name='attempt_open_deadline_idx',
+                         condition=models.Q(result__isnull=True, deadline__isnull=False)),
+        ]
+
+    def __str__(self):
+        return f"Urinish: {self.student_id} - {self.test_id}"
+
+    def is_expired(self, now):
+        return self.deadline is not None and now > self.deadline
+
+    def selected_answers(self):
+        """Qoralamani ``{savol_id: variant_id}`` (butun sonlar) ko'rinishida qaytaradi."""
+        return {int(savol_id): variant_id for savol_id, variant_id in self.answers.items() if variant_id}
@@ -0,0 +1,43 @@
+# core/ordering.py
+"""
+Savol va variantlarning o'quvchiga xos tartibi.
+
+Tartib (SECRET_KEY, student_id, test_id) dan hosil qilingan urug' (seed) bilan
+aniqlanadi: hech narsa saqlanmaydi, test yechish va natija sahifalari bir xil
+tartibni ko'rsatadi. Keshdagi prefetch qilingan ro'yxatlar o'zgartirilmaydi -
+faqat ularning nusxalari aralashtiriladi.
+"""
+import hashlib
+import random
+
+from django.conf import settings
+
+
+def student_seed(student_id, test_id):
+    """Jarayonlar va qayta ishga tushirishlar orasida barqaror urug'."""
+    digest = hashlib.blake2b(
+        f"{student_id}:{test_id}".encode(), key=settings.SECRET_KEY.encode()[:64], digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def ordered_content(test, student_id, savollar):
+    """
+    ``[(savol, [variant, ...]), ...]`` ro'yxatini o'quvchi uchun tartibda qaytaradi.
+    ``savollar`` - variantlari prefetch qilingan savollar (get_test_content); so'rov bajarilmaydi.
+    """
+    items = [(savol, savol.variantlar.all()) for savol in savollar]
+    if not (test.savollarni_aralashtirish or test.variantlarni_aralashtirish):
+        return items
+
+    rng = random.Random(student_seed(student_id, test.pk))
+    if test.savollarni_aralashtirish:
+        rng.shuffle(items)
+    if test.variantlarni_aralashtirish:
+        shuffled = []
+        for savol, variantlar in items:
+            variantlar = list(variantlar)
+            rng.shuffle(variantlar)
+            shuffled.append((savol, variantlar))
+        items = shuffled
+    return items
@@ -0,0 +1,232 @@
+# core/provisioning.py
+"""
+O'quvchi akkauntlarini CSV ro'yxatdan ommaviy yaratish.
+
+Ro'yxat (UTF-8 CSV, sarlavha satri bilan)::
+
+    familiya,ism,sinf,login,parol
+    Aliyev,Ali,5-A,,
+    Karimova,Dilnoza,5-B,dkarimova,
+
+``login`` va ``parol`` ixtiyoriy: bo'sh bo'lsa login ism-familiyadan yasaladi,
+parol esa tasodifiy yaratiladi. Yo'q sinflar yaratiladi; foydalanuvchilar va
+profillar ``bulk_create`` bilan yoziladi. ``provision_students`` buyrug'ida parollar
+(PBKDF2, 1M iteratsiya) jarayonlar puli (ProcessPoolExecutor) da parallel xeshlanadi -
+ketma-ket xeshlash minglab o'quvchi uchun daqiqalab vaqt oladi. Admin sahifasida
+xeshlash so'rov jarayonining o'zida bajariladi, shuning uchun u yerda ro'yxat hajmi
+``ADMIN_ROSTER_MAX_ROWS`` bilan cheklangan (katta ro'yxatlar uchun - buyruq).
+"""
+import csv
+import re
+import secrets
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+
+from .hashers import encode_batch
+from .models import CustomUser, Sinf, StudentProfile
+
+ROSTER_COLUMNS = ('familiya', 'ism', 'sinf', 'login', 'parol')
+REQUIRED_COLUMNS = ('familiya', 'ism', 'sinf')
+
+# Chalkashtirib yuboriladigan belgilarsiz (0/O, 1/l/I) alifbo
+PASSWORD_ALPHABET = 'abcdefghjkmnpqrstuvwxyz23456789'
+PASSWORD_LENGTH = 8
+
+LOGIN_MAX_LENGTH = CustomUser._meta.get_field('username').max_length
+
+# Bundan kichik ro'yxatda jarayonlar pulini ishga tushirish o'zini oqlamaydi
+PARALLEL_MIN_PASSWORDS = 16
+
+_LOGIN_CLEAN_RE = re.compile(r'[^a-z0-9]+')
+# Kirill harflari uchun oddiy transliteratsiya (lotin diakritikalari NFKD bilan olib tashlanadi)
+_CYRILLIC = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ғ': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'қ': 'q', 'л': 'l', 'м': 'm', 'н': 'n', 'ң': 'n', 'о': 'o', 'ө': 'o',
+    'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ү': 'u', 'ў': 'w', 'ф': 'f', 'х': 'x', 'ҳ': 'h',
+    'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu',
+    'я': 'ya', 'ә': 'a',
+})
+
+
+class RosterError(Exception):
+    """
+    Ro'yxatdagi xatolar: ``errors`` - ``[(satr_raqami, xabar), ...]``.
+    Biror satrga bog'lab bo'lmaydigan xatoda satr raqami None.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(format_roster_error(line, message) for line, message in errors[:10]))
+
+
+def format_roster_error(line, message):
+    return f"{line}-satr: {message}" if line is not None else message
+
+
+class RosterEntry:
+    __slots__ = ('line', 'familiya', 'ism', 'sinf', 'login', 'parol')
+
+    def __init__(self, line, familiya, ism, sinf, login, parol):
+        self.line = line
+        self.familiya = familiya
+        self.ism = ism
+        self.sinf = sinf
+        self.login = login
+        self.parol = parol
+
+
+def parse_roster(lines, max_rows=None):
+    """
+    CSV satrlarini o'qiydi; xato bo'lsa RosterError ko'taradi.
+    ``max_rows`` - o'quvchilar soni chegarasi (admin sahifasi uchun); oshsa o'qish to'xtatiladi.
+    """
+    reader = csv.DictReader(lines)
+    header = [name.strip().lower() for name in (reader.fieldnames or [])]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise RosterError([(1, f"Sarlavhada ustun(lar) yo'q: {', '.join(missing)}")])
+    reader.fieldnames = header
+
+    entries, errors = [], []
+    for row in reader:
+        line = reader.line_num
+        values = {name: (row.get(name) or '').strip() for name in ROSTER_COLUMNS}
+        if not any(values.values()):
+            continue
+        if not values['familiya'] or not values['ism']:
+            errors.append((line, "Familiya va ism majburiy."))
+            continue
+        if not values['sinf'] or len(values['sinf']) > Sinf._meta.get_field('nom').max_length:
+            errors.append((line, "Sinf nomi bo'sh yoki juda uzun."))
+            continue
+        if values['login']:
+            error = _login_error(values['login'])
+            if error:
+                errors.append((line, error))
+                continue
+        entries.append(RosterEntry(line, values['familiya'], values['ism'], values['sinf'],
+                                   values['login'], values['parol']))
+        if max_rows is not None and len(entries) > max_rows:
+            raise RosterError([(None, f"Ro'yxatda {max_rows} tadan ko'p o'quvchi bor. Katta ro'yxatlar "
+                                      "'python manage.py provision_students <fayl.csv>' buyrug'i bilan yaratiladi.")])
+    if errors:
+        raise RosterError(errors)
+    return entries
+
+
+def _login_error(login):
+    """Admin formasidagi kabi login tekshiruvi (uzunlik va ruxsat etilgan belgilar); xato matni yoki None."""
+    if len(login) > LOGIN_MAX_LENGTH:
+        return f"Login {LOGIN_MAX_LENGTH} belgidan uzun bo'lmasligi kerak."
+    try:
+        CustomUser.username_validator(login)
+    except ValidationError:
+        return f"'{login}' logini noto'g'ri: faqat harf, raqam va @ . + - _ belgilari mumkin."
+    return None
+
+
+def _ascii_login(*parts):
+    text = '.'.join(parts).lower().translate(_CYRILLIC)
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return _LOGIN_CLEAN_RE.sub('.', text).strip('.') or 'oquvchi'
+
+
+def generate_password():
+    return ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(PASSWORD_LENGTH))
+
+
+def assign_logins(entries, taken):
+    """Bo'sh loginlarni yasaydi va takrorlanishlarni tekshiradi. ``taken`` - band loginlar to'plami."""
+    errors = []
+    for entry in entries:
+        if entry.login:
+            if entry.login in taken:
+                errors.append((entry.line, f"'{entry.login}' logini band."))
+            taken.add(entry.login)
+            continue
+        base = _ascii_login(entry.ism[:1], entry.familiya)[:140]
+        login, suffix = base, 1
+        while login in taken:
+            suffix += 1
+            login = f"{base}{suffix}"
+        entry.login = login
+        taken.add(login)
+    if errors:
+        raise RosterError(errors)
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    Parollarni standart xesherda xeshlaydi; natija tartibi kirish tartibiga mos.
+    Tuzlar (salt) va iteratsiyalar soni asosiy jarayonda aniqlanadi. ``workers > 1`` da og'ir
+    PBKDF2 hisobi jarayonlar puliga bo'linadi - bu faqat buyruq (provision_students) uchun;
+    veb-so'rov ichida (admin) jarayon ochilmaydi.
+    """
+    hasher = get_hasher('default')
+    hasher_path = f"{type(hasher).__module__}.{type(hasher).__qualname__}"
+    iterations = getattr(hasher, 'iterations', None)
+    items = [(password, hasher.salt()) for password in passwords]
+    if workers <= 1 or len(items) < PARALLEL_MIN_PASSWORDS:
+        return encode_batch(hasher_path, iterations, items)
+
+    size = max(1, len(items) // (workers * 4))
+    batches = [items[start:start + size] for start in range(0, len(items), size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(encode_batch, [hasher_path] * len(batches), [iterations] * len(batches), batches)
+        return [encoded for batch in results for encoded in batch]
+
+
+def provision_students(entries, workers=1):
+    """
+    Ro'yxat bo'yicha sinflar, foydalanuvchilar va profillarni yaratadi (``workers`` - hash_passwords ga).
+    Yaratilgan yozuvlarni (ochiq parollari bilan) qaytaradi - bosma ro'yxat uchun.
+    """
+    # Band loginlar bitta so'rov bilan o'qiladi (maktab miqyosida - bir necha ming qator)
+    assign_logins(entries, set(CustomUser.objects.values_list('username', flat=True)))
+    for entry in entries:
+        if not entry.parol:
+            entry.parol = generate_password()
+    hashes = hash_passwords([entry.parol for entry in entries], workers)
+
+    try:
+        with transaction.atomic():
+            names = {entry.sinf for entry in entries}
+            sinf_ids = dict(Sinf.objects.filter(nom__in=names).values_list('nom', 'id'))
+            missing = names - sinf_ids.keys()
+            if missing:
+                Sinf.objects.bulk_create([Sinf(nom=nom) for nom in sorted(missing)])
+                sinf_ids = dict(Sinf.objects.filter(nom__in=names).values_list('nom', 'id'))
+
+            users = CustomUser.objects.bulk_create([
+                CustomUser(username=entry.login, first_name=entry.ism[:150], last_name=entry.familiya[:150],
+                           password=encoded, is_student=True)
+                for entry, encoded in zip(entries, hashes)
+            ], batch_size=500)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                user_ids = dict(CustomUser.objects.filter(username__in=[e.login for e in entries])
+                                .values_list('username', 'id'))
+                for user in users:
+                    user.pk = user_ids[user.username]
+
+            StudentProfile.objects.bulk_create([
+                StudentProfile(user=user, sinf_id=sinf_ids[entry.sinf]) for entry, user in zip(entries, users)
+            ], batch_size=500)
+    except IntegrityError:
+        # Tekshiruvdan keyin boshqa so'rov (yoki ikkinchi import) shu loginlarni yaratib ulgurgan
+        taken = set(CustomUser.objects.filter(username__in=[entry.login for entry in entries])
+                    .values_list('username', flat=True))
+        errors = [(entry.line, f"'{entry.login}' logini band.") for entry in entries if entry.login in taken]
+        raise RosterError(errors or [(None, "Ma'lumotlar bazasi yozuvni rad etdi - hech narsa yaratilmadi.")])
+    return entries
+
+
+def write_credentials_csv(entries, output):
+    """Login/parol ro'yxatini CSV ko'rinishida yozadi."""
+    writer = csv.writer(output)
+    writer.writerow(('sinf', 'familiya', 'ism', 'login', 'parol'))
+    for entry in sorted(entries, key=lambda e: (e.sinf, e.familiya, e.ism)):
+        writer.writerow((entry.sinf, entry.familiya, entry.ism, entry.login, entry.parol))
@@ -0,0 +1,119 @@
+# core/query_plans.py
+"""
+Asosiy sahifalar so'rovlari kerakli indekslardan foydalanishini EXPLAIN bilan tekshirish.
+
+Har bir tekshiruv - sahifa ishlatadigan queryset va kutilgan indeks (jadval + boshlang'ich
+ustunlar). Indeks nomi bazaning o'zidan olinadi: SQLite da UNIQUE cheklovlar
+``sqlite_autoindex_*`` nomli indeks bo'ladi, PostgreSQL da - cheklov nomi.
+
+PostgreSQL kichik jadvalda indeks o'rniga ketma-ket o'qishni tanlaydi, shuning uchun
+tekshiruv tranzaksiyasida ``enable_seqscan = off`` qilinadi: indeks ishlatilishi *mumkinligi*
+tekshiriladi. SQLite statistikasiz (ANALYZE qilinmagan) bazada ham indeksni tanlaydi.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q, Subquery
+
+from .grading import AnswerKey
+from .models import StudentProfile, TestAttempt, TestResult
+from .views import RATING_TOP_N, student_tests
+
+# EXPLAIN uchun o'zgaruvchilar: reja qiymatlarga emas, so'rov shakliga bog'liq
+_ID = 1
+
+
+def _rating_position():
+    points = Subquery(StudentProfile.objects.filter(pk=_ID).values('total_points')[:1])
+    return StudentProfile.objects.filter(sinf_id=_ID).filter(
+        Q(total_points__gt=points) | Q(total_points=points, pk__lt=_ID)
+    ).values('pk')
+
+
+class PlanCheck:
+    """Bitta so'rov va u ishlatishi kerak bo'lgan indekslar: ``[(jadval, (ustun, ...)), ...]``."""
+
+    __slots__ = ('name', 'build', 'expected')
+
+    def __init__(self, name, build, expected):
+        self.name = name
+        self.build = build
+        self.expected = expected
+
+
+PLAN_CHECKS = (
+    PlanCheck('student_test_list', lambda: student_tests(_ID, _ID), [
+        ('core_test', ('sinf_id', 'yaratilgan_sana')),
+        ('core_testresult', ('student_id', 'test_id')),
+    ]),
+    PlanCheck('class_rating: o\'rin', _rating_position, [
+        ('core_studentprofile', ('sinf_id', 'total_points')),
+    ]),
+    PlanCheck('class_rating: TOP-N', lambda: StudentProfile.objects.filter(sinf_id=_ID)
+              .order_by('-total_points', 'pk')[:RATING_TOP_N], [
+        ('core_studentprofile', ('sinf_id', 'total_points')),
+    ]),
+    PlanCheck('dashboard: yechilgan testlar',
+              lambda: TestResult.objects.filter(student_id=_ID).order_by().values('pk'), [
+        ('core_testresult', ('student_id',)),
+    ]),
+    PlanCheck('test_solve: natija', lambda: TestResult.objects.filter(student_id=_ID, test_id=_ID).only('id'), [
+        ('core_testresult', ('student_id', 'test_id')),
+    ]),
+    PlanCheck('test_solve: qoralama', lambda: TestAttempt.objects.filter(student_id=_ID, test_id=_ID), [
+        ('core_testattempt', ('student_id', 'test_id')),
+    ]),
+    PlanCheck('AnswerKey.load', lambda: AnswerKey.rows(_ID), [
+        ('core_variant', ('savol_id', 'is_correct')),
+    ]),
+)
+
+
+class PlanResult:
+    __slots__ = ('check', 'plan', 'missing')
+
+    def __init__(self, check, plan, missing):
+        self.check = check
+        self.plan = plan
+        self.missing = missing  # [(jadval, ustunlar), ...] - reja ishlatmagan indekslar
+
+    @property
+    def ok(self):
+        return not self.missing
+
+
+def table_indexes(connection, table):
+    """``{indeks_nomi: (ustun, ...)}`` - UNIQUE cheklovlar indekslari bilan birga."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"PRAGMA index_list({connection.ops.quote_name(table)})")
+            names = [row[1] for row in cursor.fetchall()]
+            indexes = {}
+            for name in names:
+                cursor.execute(f"PRAGMA index_info({connection.ops.quote_name(name)})")
+                indexes[name] = tuple(row[2] for row in sorted(cursor.fetchall()))
+            return indexes
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {name: tuple(info['columns']) for name, info in constraints.items()
+            if (info['index'] or info['unique']) and info['columns']}
+
+
+def check_plans(checks=PLAN_CHECKS, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    indexes = {}
+    results = []
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        for check in checks:
+            plan = check.build().using(using).explain()
+            missing = []
+            for table, columns in check.expected:
+                if table not in indexes:
+                    indexes[table] = table_indexes(connection, table)
+                names = [name for name, indexed in indexes[table].items() if indexed[:len(columns)] == columns]
+                if not any(re.search(rf'\b{re.escape(name)}\b', plan) for name in names):
+                    missing.append((table, columns))
+            results.append(PlanResult(check, plan, missing))
+    return results
@@ -0,0 +1,204 @@
+# core/seeding.py
+"""
+Sun'iy maktab ma'lumotlarini ommaviy yaratish (benchmark va yuklama sinovlari uchun).
+
+Barcha yozuvlar ``bulk_create`` bilan bo'laklab yoziladi; signal va ``save()``
+chaqirilmaydi. Parol xeshi bitta marta hisoblanib barcha o'quvchilarga beriladi.
+
+``seed_school`` - bir xil o'lchamli kichik to'plam (benchmark_exam_day),
+``generate_school`` - sinf hajmi, savollar soni va ballar taqsimoti real maktabga
+o'xshash, natija va javoblari bilan katta to'plam (generate_school_data).
+"""
+import math
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .bulk import insert_rows
+from .grading import rebuild_total_points
+from .test_stats import rebuild_test_stats
+from .models import CustomUser, Savol, Sinf, StudentAnswer, StudentProfile, Test, TestResult, Variant
+
+SEED_BATCH_SIZE = 1000
+
+# Savol bali taqsimoti: ko'pchilik 1 ballik, kamroq 2 va 3 ballik
+BALL_WEIGHTS = ((1, 6), (2, 3), (3, 1))
+
+
+class SeedingError(Exception):
+    """Prefiks bilan yaratiladigan nomlar mavjud yozuvlar bilan yoki o'zaro to'qnashadi."""
+
+
+class SeededSchool:
+    """Yaratilgan ma'lumotlar identifikatorlari (keyingi bosqichlar uchun)."""
+
+    __slots__ = ('sinf_ids', 'students', 'tests', 'password')
+
+    def __init__(self, sinf_ids, students, tests, password):
+        self.sinf_ids = sinf_ids
+        self.students = students  # [(student_id, username, sinf_id), ...]
+        self.tests = tests  # {sinf_id: [test_id, ...]}
+        self.password = password
+
+
+def _create_school(class_sizes, question_counts, variants, prefix, password, rng, batch_size):
+    """
+    ``class_sizes[i]`` - i-sinfdagi o'quvchilar soni, ``question_counts[i]`` - shu sinf
+    testlaridagi savollar soni ro'yxati. Savollar ``{test_id: [(savol_id, ball, to'g'ri_id, (noto'g'ri_id, ...))]}``
+    ko'rinishida ham qaytariladi (natijalarni yaratish uchun; noto'g'ri variantlar alohida kortejda).
+    """
+    names = [f"{prefix}{index}" for index in range(len(class_sizes))]
+    max_length = Sinf._meta.get_field('nom').max_length
+    if names and len(names[-1]) > max_length:
+        raise SeedingError(
+            f"'{names[-1]}' sinf nomi {max_length} belgidan uzun - qisqaroq prefiks tanlang."
+        )
+    # Bir prefiks bilan qayta ishga tushirish avvalgi ma'lumotlarga aralashmasligi kerak
+    if (Sinf.objects.filter(nom__in=names).exists()
+            or CustomUser.objects.filter(username__startswith=f"{prefix}_").exists()):
+        raise SeedingError(f"'{prefix}' prefiksli sinf yoki o'quvchilar allaqachon bor - boshqa prefiks tanlang.")
+
+    encoded = make_password(password)
+    balls, weights = zip(*BALL_WEIGHTS)
+
+    sinflar = Sinf.objects.bulk_create([Sinf(nom=name) for name in names], batch_size=batch_size)
+    sinf_ids = [sinf.pk for sinf in sinflar]
+
+    owners = [sinf_id for sinf_id, size in zip(sinf_ids, class_sizes) for _ in range(size)]
+    users = CustomUser.objects.bulk_create([
+        CustomUser(username=f"{prefix}_{position}", password=encoded, is_student=True,
+                   first_name=f"O'quvchi {position}", last_name=prefix)
+        for position in range(len(owners))
+    ], batch_size=batch_size)
+    StudentProfile.objects.bulk_create(
+        [StudentProfile(user=user, sinf_id=sinf_id) for user, sinf_id in zip(users, owners)], batch_size=batch_size
+    )
+    students = [(user.pk, user.username, sinf_id) for user, sinf_id in zip(users, owners)]
+
+    tests = Test.objects.bulk_create([
+        Test(nom=f"{prefix} test {index + 1}", sinf_id=sinf_id)
+        for sinf_id, counts in zip(sinf_ids, question_counts) for index in range(len(counts))
+    ], batch_size=batch_size)
+    tests_by_sinf = {}
+    for test in tests:
+        tests_by_sinf.setdefault(test.sinf_id, []).append(test.pk)
+
+    flat_counts = [count for counts in question_counts for count in counts]
+    savollar = Savol.objects.bulk_create([
+        Savol(test=test, matn=f"<p>Savol {index + 1}: {rng.randint(1, 99)} + {rng.randint(1, 99)} = ?</p>",
+              ball=rng.choices(balls, weights)[0])
+        for test, count in zip(tests, flat_counts) for index in range(count)
+    ], batch_size=batch_size)
+
+    variant_rows = []
+    for savol in savollar:
+        correct = rng.randrange(variants)
+        variant_rows.extend(
+            Variant(savol=savol, matn=f"Variant {chr(ord('A') + index)}", is_correct=index == correct)
+            for index in range(variants)
+        )
+    Variant.objects.bulk_create(variant_rows, batch_size=batch_size)
+    rebuild_test_stats()
+
+    questions = {}
+    for position, savol in enumerate(savollar):
+        options = variant_rows[position * variants:(position + 1) * variants]
+        correct_id = next(v.pk for v in options if v.is_correct)
+        questions.setdefault(savol.test_id, []).append(
+            (savol.pk, Decimal(savol.ball), correct_id, tuple(v.pk for v in options if not v.is_correct))
+        )
+
+    return SeededSchool(sinf_ids, students, tests_by_sinf, password), questions
+
+
+def seed_school(classes, students_per_class, tests_per_class, questions_per_test, variants=4,
+                prefix='bench', password='benchmark-parol', seed=0, batch_size=SEED_BATCH_SIZE):
+    """Sinflar, o'quvchilar (akkaunt + profil), testlar, savollar va variantlarni yaratadi."""
+    school, _ = _create_school(
+        [students_per_class] * classes, [[questions_per_test] * tests_per_class] * classes,
+        variants, prefix, password, random.Random(seed), batch_size,
+    )
+    return school
+
+
+def _clamped_normal(rng, mean, spread, low, high):
+    return max(low, min(high, round(rng.gauss(mean, spread))))
+
+
+def generate_school(classes, mean_class_size, tests_per_class, mean_questions, variants=4, participation=0.9,
+                    skip_rate=0.05, prefix='gen', password='generator-parol', seed=0, batch_size=5000,
+                    progress=None):
+    """
+    Real maktabga o'xshash to'plam: sinf hajmi va savollar soni normal taqsimotdan,
+    natijalar esa Rasch modeli bo'yicha - o'quvchi qobiliyati ~ N(0, 1), savol qiyinligi ~ N(0, 1),
+    to'g'ri javob ehtimoli 1 / (1 + exp(-1.7 * (qobiliyat - qiyinlik))).
+
+    Natija va javoblar sinfma-sinf alohida tranzaksiyada, ``batch_size`` lik bo'laklarda yoziladi;
+    javoblar model obyektlarisiz, ``insert_rows`` bilan (yaratilgan id lar kerak emas).
+    ``(school, {'results': .., 'answers': ..})`` qaytaradi.
+    """
+    rng = random.Random(seed)
+    class_sizes = [
+        _clamped_normal(rng, mean_class_size, mean_class_size * 0.15, 5, mean_class_size * 2) for _ in range(classes)
+    ]
+    question_counts = [
+        [_clamped_normal(rng, mean_questions, mean_questions * 0.25, 5, mean_questions * 3)
+         for _ in range(tests_per_class)]
+        for _ in range(classes)
+    ]
+    with transaction.atomic():
+        school, questions = _create_school(class_sizes, question_counts, variants, prefix, password, rng, batch_size)
+
+    ability = {student_id: rng.gauss(0, 1) for student_id, _, _ in school.students}
+    difficulty = {item[0]: rng.gauss(0, 1) for items in questions.values() for item in items}
+    students_by_sinf = {}
+    for student_id, _, sinf_id in school.students:
+        students_by_sinf.setdefault(sinf_id, []).append(student_id)
+
+    answer_fields = [StudentAnswer._meta.get_field(name)
+                     for name in ('result', 'savol', 'tanlangan_variant', 'is_correct', 'ball')]
+    counts = {'results': 0, 'answers': 0}
+    for sinf_id in school.sinf_ids:
+        with transaction.atomic():
+            pending_results, pending_answers = [], []
+            for test_id in school.tests[sinf_id]:
+                items = questions[test_id]
+                for student_id in students_by_sinf[sinf_id]:
+                    if rng.random() >= participation:
+                        continue
+                    theta = ability[student_id]
+                    answers, score, correct_count = [], 0, 0
+                    for savol_id, ball, correct_id, distractors in items:
+                        if rng.random() < skip_rate:
+                            continue
+                        if rng.random() < 1 / (1 + math.exp(-1.7 * (theta - difficulty[savol_id]))):
+                            answers.append((savol_id, correct_id, True, ball))
+                            score += ball
+                            correct_count += 1
+                        else:
+                            answers.append((savol_id, rng.choice(distractors), False, ball))
+                    pending_results.append(TestResult(
+                        student_id=student_id, test_id=test_id, jami_ball=score,
+                        umumiy_savollar_soni=len(items), togri_javoblar_soni=correct_count,
+                    ))
+                    pending_answers.append(answers)
+
+            results = TestResult.objects.bulk_create(pending_results, batch_size=batch_size)
+            rows = []
+            for result, answers in zip(results, pending_answers):
+                result_id = result.pk
+                rows.extend((result_id, *answer) for answer in answers)
+                if len(rows) >= batch_size:
+                    counts['answers'] += insert_rows(StudentAnswer, answer_fields, rows)
+                    rows = []
+            counts['answers'] += insert_rows(StudentAnswer, answer_fields, rows)
+            counts['results'] += len(results)
+        if progress:
+            progress(counts)
+
+    # O'quvchilar umumiy bali va testlar statistikasi bittadan UPDATE/upsert bilan
+    rebuild_total_points()
+    rebuild_test_stats()
+    return school, counts
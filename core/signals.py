@@ -0,0 +1,67 @@
+# core/signals.py
+"""
+Model signallari: test mazmuni o'zgarganda keshni bekor qilish, TestStats va
+o'quvchi total_points ini (admin va boshqa yozuvlarda) yangilash.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .answer_cache import invalidate_test, local_cache
+from .grading import rebuild_total_points
+from .models import Savol, StudentProfile, Test, TestResult, TestStats, Variant
+from .test_stats import discard_result, record_result, refresh_content_stats, refresh_result_stats
+
+
+@receiver(post_save, sender=Savol)
+@receiver(post_delete, sender=Savol)
+def savol_changed(sender, instance, signal, **kwargs):
+    invalidate_test(instance.test_id)
+    refresh_content_stats(instance.test_id, create=signal is post_save)
+
+
+@receiver(post_save, sender=Variant)
+@receiver(post_delete, sender=Variant)
+def variant_changed(sender, instance, **kwargs):
+    if Variant.savol.is_cached(instance):
+        test_id = instance.savol.test_id
+    else:
+        test_id = Savol.objects.filter(pk=instance.savol_id).values_list('test_id', flat=True).first()
+    if test_id is not None:
+        invalidate_test(test_id)
+
+
+@receiver(post_save, sender=Test)
+def test_saved(sender, instance, created, **kwargs):
+    if created:
+        TestStats.objects.create(test=instance)
+        return
+    # Admin formasi eski content_version qiymatini qayta yozib yuborishi mumkin,
+    # shuning uchun har saqlashdan keyin yangi versiya beramiz.
+    instance.content_version = invalidate_test(instance.pk)
+
+
+@receiver(post_delete, sender=Test)
+def test_deleted(sender, instance, **kwargs):
+    local_cache.discard_test(instance.pk)
+
+
+@receiver(post_save, sender=TestResult)
+def result_saved(sender, instance, created, **kwargs):
+    if getattr(instance, 'stats_deferred', False):
+        return  # submit_answers o'zi yangilaydi
+    if created:
+        record_result(instance.test_id, instance.jami_ball)
+    else:
+        # Ball qo'lda o'zgartirilgan bo'lishi mumkin
+        refresh_result_stats([instance.test_id])
+    rebuild_total_points(StudentProfile.objects.filter(pk=instance.student_id))
+
+
+@receiver(post_delete, sender=TestResult)
+def result_deleted(sender, instance, **kwargs):
+    discard_result(instance.test_id, instance.jami_ball)
+    # Natija (admin yoki test/sinf kaskadi bilan) o'chirilsa, reyting bali ham kamayadi
+    StudentProfile.objects.filter(pk=instance.student_id).update(
+        total_points=F('total_points') - instance.jami_ball
+    )
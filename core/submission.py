@@ -0,0 +1,190 @@
+# core/submission.py
+"""
+Test topshirig'ini saqlash jarayoni (idempotent).
+
+Natija, javoblar, o'quvchi umumiy bali va TestStats bitta tranzaksiyada yoziladi.
+Takroriy POST (ikki marta bosish, tarmoq qayta yuborishi) mavjud natijaga
+olib keladi va hech narsa qayta yozilmaydi:
+
+* forma ichidagi ``submission_token`` bir xil bo'lsa - o'sha natija qaytariladi;
+* o'quvchi profili qatori ``select_for_update`` bilan qulflanadi, shuning uchun
+  bir o'quvchining parallel topshiriqlari navbatma-navbat bajariladi;
+* (student, test) bo'yicha unique cheklov oxirgi himoya chizig'i.
+
+Test davomida javoblar ``TestAttempt`` qoralamasiga avtosaqlanadi; yakuniy
+topshiriq shu qoralama va forma ma'lumotlaridan baholanadi. Muddati o'tgan
+urinishlar faqat qoralamadan baholanadi (sweep_expired_attempts buyrug'i).
+"""
+import re
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .grading import build_student_answers, grade
+from .models import StudentAnswer, StudentProfile, TestAttempt, TestResult
+from .test_stats import record_result
+
+_TOKEN_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Tarmoq kechikishi uchun muddatdan keyingi qisqa imkoniyat
+DEADLINE_GRACE = timedelta(seconds=30)
+
+
+def new_submission_token():
+    """Test yechish formasiga joylanadigan bir martalik belgi."""
+    return uuid.uuid4().hex
+
+
+def clean_submission_token(value):
+    """Formadan kelgan belgini tekshiradi; noto'g'ri bo'lsa None qaytaradi."""
+    if value and _TOKEN_RE.match(value):
+        return value
+    return None
+
+
+def _existing_result(student_profile, test, submission_token):
+    if submission_token:
+        result = TestResult.objects.filter(submission_token=submission_token, student=student_profile).first()
+        if result:
+            return result
+    return TestResult.objects.filter(student=student_profile, test=test).first()
+
+
+def submit_answers(student_profile, test, answer_key, selected, submission_token=None, attempt=None):
+    """
+    Javoblarni baholab saqlaydi. ``(natija, yaratildimi)`` qaytaradi.
+
+    Natija allaqachon mavjud bo'lsa, u o'zgarishsiz qaytariladi (``yaratildimi=False``).
+    ``attempt`` berilsa, urinish shu natija bilan yopiladi.
+    """
+    existing = _existing_result(student_profile, test, submission_token)
+    if existing:
+        _close_attempt(attempt, existing)
+        return existing, False
+
+    grading = grade(answer_key, selected)
+
+    with transaction.atomic():
+        # Shu o'quvchining parallel topshiriqlarini navbatga qo'yish
+        list(StudentProfile.objects.select_for_update().filter(pk=student_profile.pk).values_list('pk', flat=True))
+        existing = _existing_result(student_profile, test, submission_token)
+        if existing:
+            _close_attempt(attempt, existing)
+            return existing, False
+
+        test_result = TestResult(
+            student=student_profile,
+            test=test,
+            jami_ball=grading.total_score,
+            umumiy_savollar_soni=grading.total_questions,
+            togri_javoblar_soni=grading.correct_count,
+            submission_token=submission_token,
+        )
+        # TestStats quyida, tranzaksiya oxirida yangilanadi (result_saved signali o'tkazib yuboradi)
+        test_result.stats_deferred = True
+        try:
+            with transaction.atomic():
+                test_result.save(force_insert=True)
+        except IntegrityError:
+            # Boshqa so'rov bizdan oldin yozib ulgurdi (unique cheklov)
+            existing = _existing_result(student_profile, test, submission_token)
+            if existing is None:
+                raise
+            _close_attempt(attempt, existing)
+            return existing, False
+        test_result.stats_deferred = False  # keyingi save() lar odatdagidek signal orqali
+
+        student_answers = build_student_answers(test_result, grading)
+        if student_answers:
+            StudentAnswer.objects.bulk_create(student_answers)
+
+        # Umumiy ballni qayta yig'ish o'rniga atomar F() orttirish (O(1))
+        if grading.total_score:
+            StudentProfile.objects.filter(pk=student_profile.pk).update(
+                total_points=F('total_points') + grading.total_score
+            )
+
+        _close_attempt(attempt, test_result)
+
+        # Testning umumiy TestStats qatori eng oxirida qulflanadi: bir testni topshirayotgan
+        # o'quvchilar shu qator bo'yicha faqat commit gacha bo'lgan qisqa vaqt navbatda turadi
+        record_result(test.pk, grading.total_score)
+
+    return test_result, True
+
+
+def _close_attempt(attempt, result):
+    if attempt is not None and attempt.result_id is None:
+        TestAttempt.objects.filter(pk=attempt.pk, result__isnull=True).update(result=result)
+        attempt.result = result
+
+
+def open_attempt(student_id, test, now=None):
+    """O'quvchining urinishini qaytaradi yoki muddatini hisoblab yangisini ochadi."""
+    now = now or timezone.now()
+    attempt, _ = TestAttempt.objects.get_or_create(
+        student_id=student_id, test=test, defaults={'deadline': test.attempt_deadline(now)},
+    )
+    return attempt
+
+
+def finalize_attempt(attempt, answer_key):
+    """Urinishni saqlangan qoralamadan baholab yakunlaydi (muddat tugaganda)."""
+    return submit_answers(attempt.student, attempt.test, answer_key, attempt.selected_answers(), attempt=attempt)
+
+
+# ---------------- Avtosaqlash (qoralama) ----------------
+
+class AttemptClosed(Exception):
+    """Urinish allaqachon yakunlangan - qoralamani o'zgartirib bo'lmaydi."""
+
+
+def clean_draft_changes(answer_key, changes):
+    """
+    Avtosaqlashdan kelgan ``{"savol_id": variant_id | null}`` o'zgarishlarini tekshiradi.
+    Testga tegishli bo'lmagan savol yoki variantlar tashlab yuboriladi; ``None`` - javobni bekor qilish.
+    """
+    cleaned = {}
+    for raw_savol_id, raw_variant_id in changes.items():
+        try:
+            savol_id = int(raw_savol_id)
+            variant_id = None if raw_variant_id is None else int(raw_variant_id)
+        except (TypeError, ValueError):
+            continue
+        if savol_id not in answer_key.question_points:
+            continue
+        if variant_id is not None and answer_key.variant_owner.get(variant_id) != savol_id:
+            continue
+        cleaned[str(savol_id)] = variant_id
+    return cleaned
+
+
+def save_draft(student_id, test, answer_key, changes):
+    """
+    Qoralama javoblarni urinishning JSON ustuniga birlashtiradi (bitta qator, bitta UPDATE).
+    Saqlangan javoblar sonini qaytaradi.
+    """
+    cleaned = clean_draft_changes(answer_key, changes)
+    now = timezone.now()
+    with transaction.atomic():
+        attempt = TestAttempt.objects.select_for_update().filter(student_id=student_id, test=test).first()
+        if attempt is None:
+            # Test hali boshlanmagan: urinish (va uning muddati) ochilmaydi - test_solve dagi kabi
+            if not test.has_started(now):
+                raise AttemptClosed("Test hali boshlanmagan.")
+            attempt = open_attempt(student_id, test, now)
+        grace_now = now - DEADLINE_GRACE
+        if attempt.result_id or attempt.is_expired(grace_now) or test.has_ended(grace_now):
+            raise AttemptClosed()
+        if cleaned:
+            answers = attempt.answers
+            for savol_id, variant_id in cleaned.items():
+                if variant_id is None:
+                    answers.pop(savol_id, None)
+                else:
+                    answers[savol_id] = variant_id
+            attempt.save(update_fields=['answers', 'yangilangan_vaqt'])
+    return len(attempt.answers)
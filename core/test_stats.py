@@ -0,0 +1,106 @@
+# core/test_stats.py
+"""
+TestStats (test bo'yicha yig'ma ko'rsatkichlar) ni yangilab borish.
+
+* Savol saqlanganda/o'chirilganda (core.signals) va importda - savollar soni va
+  maksimal ball testning savollaridan bitta UPDATE ... (SELECT) bilan qayta hisoblanadi;
+* natija yaratilganda/o'chirilganda - F() bilan orttirish/kamaytirish (O(1)); topshiriqda
+  (submit_answers) bu tranzaksiyaning oxirgi so'rovi, boshqa yozuvlarda - signal;
+* qayta baholashda (regrade_results) - natijalar ko'rsatkichlari qayta hisoblanadi.
+
+Hammasi o'zgarish bilan bir tranzaksiyada bajariladi. Imtihon paytida bir testning
+qatori topshiriq tranzaksiyasining faqat oxirgi so'rovidan commit gacha qulflanadi -
+baholash, javoblarni yozish va boshqa yangilanishlar bu qulfdan oldin bajariladi.
+
+``bulk_create`` bilan yozadigan jarayonlar (seeding, restore) oxirida
+``rebuild_test_stats`` ni chaqiradi; ``rebuild_test_stats`` buyrug'i ham shu.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Savol, Test, TestResult, TestStats
+
+STATS_FIELDS = ('savollar_soni', 'max_ball', 'natijalar_soni', 'ballar_yigindisi')
+
+
+def _aggregate(queryset, ref, aggregate, output_field):
+    subquery = (
+        queryset.filter(test_id=OuterRef(ref)).order_by().values('test_id')
+        .annotate(value=aggregate).values('value')
+    )
+    return Coalesce(Subquery(subquery), Value(0), output_field=output_field)
+
+
+def _content_expressions(ref):
+    return {
+        'savollar_soni': _aggregate(Savol.objects, ref, Count('id'), IntegerField()),
+        'max_ball': _aggregate(Savol.objects, ref, Sum('ball'), DecimalField()),
+    }
+
+
+def _result_expressions(ref):
+    return {
+        'natijalar_soni': _aggregate(TestResult.objects, ref, Count('id'), IntegerField()),
+        'ballar_yigindisi': _aggregate(TestResult.objects, ref, Sum('jami_ball'), DecimalField()),
+    }
+
+
+def rebuild_test_stats(test_ids=None):
+    """
+    Ko'rsatkichlarni savollar va natijalardan to'liq qayta hisoblaydi (bitta SELECT va upsert).
+    ``test_ids`` berilmasa barcha testlar. Yozilgan qatorlar sonini qaytaradi.
+    """
+    tests = Test.objects.order_by()
+    if test_ids is not None:
+        tests = tests.filter(pk__in=test_ids)
+    rows = tests.annotate(**_content_expressions('pk'), **_result_expressions('pk')).values_list('pk', *STATS_FIELDS)
+    stats = [TestStats(test_id, *values) for test_id, *values in rows]
+    TestStats.objects.bulk_create(
+        stats, batch_size=500, update_conflicts=True, unique_fields=['test'], update_fields=STATS_FIELDS,
+    )
+    return len(stats)
+
+
+def expected_test_stats():
+    """``{test_id: (savollar_soni, max_ball, natijalar_soni, ballar_yigindisi)}`` - tekshirish uchun."""
+    rows = (
+        Test.objects.order_by()
+        .annotate(**_content_expressions('pk'), **_result_expressions('pk'))
+        .values_list('pk', *STATS_FIELDS)
+    )
+    return {test_id: tuple(values) for test_id, *values in rows}
+
+
+def refresh_content_stats(test_id, create=False):
+    """
+    Savollar soni va maksimal ballni qayta hisoblaydi. Qator yo'q bo'lsa ``create=True`` da
+    to'liq yaratiladi; o'chirishda (``create=False``) yaratilmaydi - kaskad o'chirilayotgan
+    test uchun qator qayta paydo bo'lmasligi kerak.
+    """
+    updated = TestStats.objects.filter(test_id=test_id).update(**_content_expressions('test_id'))
+    if not updated and create:
+        rebuild_test_stats([test_id])
+
+
+def refresh_result_stats(test_ids):
+    """Natijalar soni va ballar yig'indisini qayta hisoblaydi (natijalar ommaviy o'zgarganda)."""
+    return TestStats.objects.filter(test_id__in=test_ids).update(**_result_expressions('test_id'))
+
+
+def record_result(test_id, score):
+    """Yangi natija: natijalar soni va ballar yig'indisini atomar orttiradi."""
+    updated = TestStats.objects.filter(test_id=test_id).update(
+        natijalar_soni=F('natijalar_soni') + 1, ballar_yigindisi=F('ballar_yigindisi') + Decimal(score),
+    )
+    if not updated:
+        # Ommaviy yaratilgan (signalsiz) test: yangi natija ham hisobga olinadi
+        rebuild_test_stats([test_id])
+
+
+def discard_result(test_id, score):
+    """O'chirilgan natija. Qator yo'q bo'lsa (test ham o'chirilmoqda) hech narsa qilinmaydi."""
+    TestStats.objects.filter(test_id=test_id).update(
+        natijalar_soni=F('natijalar_soni') - 1, ballar_yigindisi=F('ballar_yigindisi') - Decimal(score),
+    )
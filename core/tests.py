@@ -1,3 +1,1158 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .export import stream_export
+from .answer_cache import get_answer_key, get_test_content, local_cache
+from .backup import BACKUP_MODELS, backup, restore
+from .gradebook import Gradebook
+from .grading import AnswerKey, grade, regrade_results
+from .item_analysis import analyze_test, load_statistics
+from .instrumentation import load_metrics, registry
+from .importer import QuestionImporter, QuestionImportError, apply_plan, diff_questions, parse_questions
+from .ordering import ordered_content
+from .query_plans import PlanCheck, check_plans
+from .provisioning import RosterError, hash_passwords, parse_roster, provision_students
+from .seeding import SeedingError, generate_school, seed_school
+from .submission import finalize_attempt, new_submission_token, submit_answers
+from .models import (
+    CustomUser, Sinf, StudentProfile, Test, Savol, Variant, TestAttempt, TestResult, StudentAnswer, TestStats,
+)
+
+
+def make_test(sinf, questions=3, nom="Matematika"):
+    """Har bir savolda 4 ta variant (birinchisi to'g'ri) bo'lgan test yaratadi."""
+    test = Test.objects.create(nom=nom, sinf=sinf)
+    for i in range(questions):
+        savol = Savol.objects.create(test=test, matn=f"Savol {i}", ball=2)
+        for j in range(4):
+            Variant.objects.create(savol=savol, matn=f"V{j}", is_correct=(j == 0))
+    return test
+
+
+def make_student(sinf, username="oquvchi"):
+    user = CustomUser.objects.create_user(username=username, is_student=True)
+    return StudentProfile.objects.create(user=user, sinf=sinf)
+
+
+class GradingTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+
+    def post_answers(self, test, pick_correct=True):
+        data = {}
+        for savol in test.savollar.prefetch_related('variantlar'):
+            variants = list(savol.variantlar.all())
+            data[f'savol_{savol.id}'] = variants[0 if pick_correct else 1].id
+        return self.client.post(reverse('test_solve', args=[test.id]), data)
+
+    def test_answer_key_is_loaded_with_one_query(self):
+        test = make_test(self.sinf, questions=10)
+        with self.assertNumQueries(1):
+            key = AnswerKey.load(test)
+        self.assertEqual(key.total_questions, 10)
+
+    def test_foreign_variant_is_ignored(self):
+        test = make_test(self.sinf, questions=2)
+        other = make_test(self.sinf, questions=1, nom="Boshqa")
+        key = AnswerKey.load(test)
+        savol_id = next(iter(key.question_points))
+        foreign_variant = other.savollar.get().variantlar.get(is_correct=True)
+        grading = grade(key, {savol_id: foreign_variant.id})
+        self.assertEqual(grading.answers, [])
+        self.assertEqual(grading.total_score, 0)
+
+    def test_submission_query_count_does_not_grow_with_questions(self):
+        small = make_test(self.sinf, questions=2, nom="Kichik")
+        large = make_test(self.sinf, questions=40, nom="Katta")
+
+        with CaptureQueriesContext(connection) as small_ctx:
+            self.post_answers(small)
+        with CaptureQueriesContext(connection) as large_ctx:
+            self.post_answers(large)
+
+        self.assertEqual(len(small_ctx.captured_queries), len(large_ctx.captured_queries))
+        result = TestResult.objects.get(student=self.profile, test=large)
+        self.assertEqual(result.jami_ball, 80)
+        self.assertEqual(result.togri_javoblar_soni, 40)
+        self.assertEqual(result.javoblar.count(), 40)
+
+        response = self.client.get(reverse('test_review', args=[large.id, result.id]))
+        self.assertContains(response, "Durıs juwap")
+
+    def test_regrade_after_key_change(self):
+        test = make_test(self.sinf, questions=2)
+        self.post_answers(test, pick_correct=False)
+        result = TestResult.objects.get(student=self.profile, test=test)
+        self.assertEqual(result.jami_ball, 0)
+
+        for savol in test.savollar.all():
+            savol.variantlar.update(is_correct=False)
+            chosen = StudentAnswer.objects.get(result=result, savol=savol).tanlangan_variant
+            Variant.objects.filter(pk=chosen.pk).update(is_correct=True)
+
+        regrade_results(TestResult.objects.filter(pk=result.pk))
+        result.refresh_from_db()
+        self.profile.refresh_from_db()
+        self.assertEqual(result.jami_ball, 4)
+        self.assertEqual(result.togri_javoblar_soni, 2)
+        self.assertEqual(self.profile.total_points, 4)
+
+
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.test = make_test(self.sinf, questions=3)
+
+    def test_hot_test_is_served_without_queries(self):
+        test = Test.objects.get(pk=self.test.pk)
+        get_answer_key(test)
+        get_test_content(test)
+        with self.assertNumQueries(0):
+            get_answer_key(test)
+            get_test_content(test)
+
+    def test_variant_edit_invalidates_answer_key(self):
+        test = Test.objects.get(pk=self.test.pk)
+        old_key = get_answer_key(test)
+
+        variant = Variant.objects.filter(savol__test=test, is_correct=False).first()
+        variant.is_correct = True
+        variant.save()
+
+        test = Test.objects.get(pk=self.test.pk)
+        new_key = get_answer_key(test)
+        self.assertNotIn(variant.id, old_key.correct_variants)
+        self.assertIn(variant.id, new_key.correct_variants)
+
+    def test_stale_test_save_cannot_restore_old_version(self):
+        stale = Test.objects.get(pk=self.test.pk)
+        old_version = stale.content_version
+        Savol.objects.filter(test=stale).first().save()
+        stale.save()
+        self.assertNotEqual(Test.objects.get(pk=self.test.pk).content_version, old_version)
+
+
+class TotalPointsTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+
+    def test_rebuild_command_fixes_drift(self):
+        test = make_test(self.sinf, questions=1)
+        TestResult.objects.create(student=self.profile, test=test, jami_ball=7)
+        StudentProfile.objects.filter(pk=self.profile.pk).update(total_points=3)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_total_points', '--check', stdout=StringIO())
+        call_command('rebuild_total_points', stdout=StringIO())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_points, 7)
+        call_command('rebuild_total_points', '--check', stdout=StringIO())
+
+    def test_deleted_result_is_subtracted_before_retake(self):
+        test = make_test(self.sinf, questions=2)
+        key = AnswerKey.load(test)
+        selected = {savol_id: next(v for v in key.correct_variants if key.variant_owner[v] == savol_id)
+                    for savol_id in key.question_points}
+        result, _ = submit_answers(self.profile, test, key, selected)
+        result.delete()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_points, 0)
+
+        submit_answers(self.profile, test, key, selected)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_points, 4)
+        call_command('rebuild_total_points', '--check', stdout=StringIO())
+
+        test.delete()  # kaskad
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_points, 0)
+
+
+class DashboardRatingTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+
+    def add_students(self, count, start=0):
+        for i in range(start, start + count):
+            profile = make_student(self.sinf, username=f"o{i}")
+            StudentProfile.objects.filter(pk=profile.pk).update(total_points=1000 - i)
+
+    def dashboard_queries(self, profile):
+        self.client.force_login(profile.user)
+        self.client.get(reverse('student_dashboard'))  # sessiyaga sinf yoziladi
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_dashboard'))
+        return response, len(ctx.captured_queries)
+
+    def test_rank_and_neighbourhood_with_constant_queries(self):
+        self.add_students(5)
+        me = make_student(self.sinf, username="men")
+        _, small_queries = self.dashboard_queries(me)
+
+        self.add_students(60, start=5)
+        StudentProfile.objects.filter(pk=me.pk).update(total_points=1000 - 30)  # o30 bilan teng, lekin pk kichik
+        response, large_queries = self.dashboard_queries(me)
+
+        self.assertEqual(large_queries, small_queries + 1)  # faqat atrofdagilar uchun qo'shimcha so'rov
+        self.assertEqual(response.context['my_rank'], 31)
+        ranks = [row['rank'] for row in response.context['rating_list']]
+        self.assertEqual(ranks, list(range(1, 11)) + [29, 30, 31, 32, 33])
+
+
+class StudentTestListTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+
+    def add_tests(self, count, solved_every=2):
+        for i in range(count):
+            test = make_test(self.sinf, questions=2, nom=f"T{Test.objects.count()}")
+            if i % solved_every == 0:
+                TestResult.objects.create(student=self.profile, test=test, jami_ball=4)
+
+    def list_queries(self):
+        self.client.get(reverse('student_test_list'))  # sessiyaga sinf yoziladi
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_test_list'))
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_constant_in_number_of_tests(self):
+        self.add_tests(2)
+        _, few_queries = self.list_queries()
+        self.add_tests(20)
+        response, many_queries = self.list_queries()
+
+        self.assertEqual(few_queries, many_queries)
+        items = response.context['tests_with_status']
+        self.assertEqual(len(items), 22)
+        solved = [item for item in items if item['solved']]
+        self.assertEqual(len(solved), 11)
+        for item in solved:
+            result = TestResult.objects.get(student=self.profile, test=item['test'])
+            self.assertEqual(item['result_id'], result.id)
+            self.assertEqual(item['status'], "Sheshilgen (4 ball)")
+        self.assertTrue(all(item['total_questions'] == 2 for item in items))
+
+
+class TestReviewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+
+    def submit(self, test):
+        data = {}
+        for savol in test.savollar.prefetch_related('variantlar'):
+            data[f'savol_{savol.id}'] = list(savol.variantlar.all())[1].id
+        self.client.post(reverse('test_solve', args=[test.id]), data)
+        return TestResult.objects.get(student=self.profile, test=test)
+
+    def review_queries(self, test, result):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('test_review', args=[test.id, result.id]))
+        return response, len(ctx.captured_queries)
+
+    def test_review_queries_are_bounded_and_body_is_cached(self):
+        small = make_test(self.sinf, questions=2, nom="Kichik")
+        large = make_test(self.sinf, questions=30, nom="Katta")
+        small_result, large_result = self.submit(small), self.submit(large)
+        cache.clear()
+        local_cache.clear()
+
+        _, small_queries = self.review_queries(small, small_result)
+        response, large_queries = self.review_queries(large, large_result)
+        self.assertEqual(small_queries, large_queries)
+        self.assertContains(response, "list-group-item-danger", count=30)
+
+        _, cached_queries = self.review_queries(large, large_result)
+        self.assertLess(cached_queries, large_queries)
+
+    def test_other_students_result_is_not_visible(self):
+        test = make_test(self.sinf, questions=1)
+        result = self.submit(test)
+        self.client.force_login(make_student(self.sinf, username="boshqa").user)
+        response = self.client.get(reverse('test_review', args=[test.id, result.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+def make_import_text(count, start=1):
+    blocks = []
+    for i in range(start, start + count):
+        blocks.append(f"#{i}. Savol {i} matni\n#ball: 2\n+A) To'g'ri {i}\nB) Xato\nC) Xato\nD) Xato\n")
+    return "".join(blocks)
+
+
+class QuestionImporterTests(TestCase):
+    def setUp(self):
+        self.test = Test.objects.create(nom="Import", sinf=Sinf.objects.create(nom="5-A"))
+
+    def test_bulk_import_uses_constant_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            count = QuestionImporter(self.test).process_text(make_import_text(1000))
+        self.assertEqual(count, 1000)
+        self.assertLess(len(ctx.captured_queries), 40)  # faqat batch INSERTlar
+        self.assertEqual(Variant.objects.filter(savol__test=self.test).count(), 4000)
+        self.assertEqual(Variant.objects.filter(savol__test=self.test, is_correct=True).count(), 1000)
+
+    def test_invalid_block_reports_line_and_writes_nothing(self):
+        text = make_import_text(2) + "#3. Variantsiz savol\n#ball: 1\n" + make_import_text(1, start=4)
+        with self.assertRaises(QuestionImportError) as ctx:
+            QuestionImporter(self.test).process_text(text)
+        self.assertEqual(ctx.exception.errors[0][0], 13)
+        self.assertFalse(Savol.objects.filter(test=self.test).exists())
+
+    def test_docx_and_txt_files_are_streamed(self):
+        paragraphs = "".join(
+            f'<w:p><w:r><w:t>{line}</w:t></w:r></w:p>' for line in make_import_text(3).splitlines()
+        )
+        document = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        )
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/document.xml', document)
+        docx = SimpleUploadedFile('savollar.docx', buffer.getvalue())
+        self.assertEqual(QuestionImporter(self.test).process_file(docx), 3)
+
+        txt = SimpleUploadedFile('savollar.txt', make_import_text(5, start=4).encode('utf-8'))
+        txt.DEFAULT_CHUNK_SIZE = 7  # satrlar bo'laklar chegarasida uzilishi uchun
+        self.assertEqual(QuestionImporter(self.test).process_file(txt), 5)
+        self.assertEqual(
+            list(Savol.objects.filter(test=self.test).order_by('id').values_list('matn', flat=True))[-1],
+            "Savol 8 matni",
+        )
+
+    def test_broken_docx_is_reported_as_import_error(self):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('boshqa.xml', '<a/>')
+        for content in (b"docx emas", buffer.getvalue()):
+            with self.assertRaises(QuestionImportError) as ctx:
+                QuestionImporter(self.test).process_file(SimpleUploadedFile('savollar.docx', content))
+            self.assertEqual(ctx.exception.errors[0][0], None)
+
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        response = self.client.post(
+            reverse('admin:core_test_import_questions', args=[self.test.pk]),
+            {'import_file': SimpleUploadedFile('savollar.docx', b"docx emas")}, follow=True,
+        )
+        self.assertContains(response, "haqiqiy .docx hujjat emas")
+
+    def test_tokenizer_handles_inline_markers_many_variants_and_fractions(self):
+        text = (
+            "Kirish matni e'tiborga olinmaydi\n"
+            "#1. Qaysi javob to'g'ri?\n"
+            "Ikkinchi satr\n"
+            "#ball: 2,5\n"
+            "A) Javob A) va B) ni o'z ichiga oladi\n"
+            "davomi\n"
+            "B) ikki\nC) uch\nD) to'rt\n+E) besh\nF) olti\n"
+        )
+        questions, errors = parse_questions(text)
+        self.assertEqual(errors, [])
+        question = questions[0]
+        self.assertEqual(question.matn, "Qaysi javob to'g'ri?\nIkkinchi satr")
+        self.assertEqual(question.ball, Decimal('2.5'))
+        self.assertEqual(len(question.variants), 6)
+        self.assertEqual(question.variants[0], ("Javob A) va B) ni o'z ichiga oladi\ndavomi", False))
+        self.assertEqual(question.variants[4], ("besh", True))
+
+        QuestionImporter(self.test).process_text(text)
+        self.assertEqual(Savol.objects.get(test=self.test).ball, Decimal('2.50'))
+
+    def test_tokenizer_reports_bad_score_and_variant_order(self):
+        _, errors = parse_questions("#1. S\n#ball: 1.255\n+A) a\nB) b\n#2. S\n+A) a\nC) c\n")
+        self.assertEqual([line for line, _ in errors], [2, 7])
+
+    def test_preview_and_confirm_write_only_the_delta(self):
+        QuestionImporter(self.test).process_text(make_import_text(3))
+        changed_savol = Savol.objects.get(test=self.test, matn="Savol 2 matni")
+        variant_ids = list(changed_savol.variantlar.order_by('id').values_list('id', flat=True))
+
+        edited = make_import_text(3).replace("+A) To'g'ri 2\nB) Xato", "A) To'g'ri 2\n+B) Endi to'g'ri")
+        edited += make_import_text(1, start=4)
+
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        url = reverse('admin:core_test_import_questions', args=[self.test.pk])
+        response = self.client.post(url, {'import_data': edited, '_preview': '1'})
+        self.assertEqual(response.context['counts'], {'new': 1, 'changed': 1, 'unchanged': 2})
+        self.assertEqual(Savol.objects.filter(test=self.test).count(), 3)
+        # Sessiyada savollar emas, faqat qat'iy uzunlikdagi token
+        self.assertEqual(len(self.client.session[f'question_import_{self.test.pk}']), 32)
+
+        self.client.post(reverse('admin:core_test_import_questions_confirm', args=[self.test.pk]))
+        self.assertEqual(Savol.objects.filter(test=self.test).count(), 4)
+        changed_variants = list(changed_savol.variantlar.order_by('id'))
+        self.assertEqual([v.id for v in changed_variants], variant_ids)
+        self.assertEqual([v.is_correct for v in changed_variants], [False, True, False, False])
+
+    def test_changed_key_regrades_stored_results(self):
+        QuestionImporter(self.test).process_text(make_import_text(2))
+        profile = make_student(self.test.sinf)
+        selected = {savol.id: savol.variantlar.get(is_correct=True).id for savol in self.test.savollar.all()}
+        result, _ = submit_answers(profile, self.test, AnswerKey.load(self.test), selected)
+        self.assertEqual(result.togri_javoblar_soni, 2)
+
+        edited = make_import_text(2).replace("+A) To'g'ri 2\nB) Xato", "A) To'g'ri 2\n+B) Endi to'g'ri")
+        questions, _ = parse_questions(edited)
+        counts = apply_plan(self.test, diff_questions(self.test, questions))
+        self.assertEqual((counts['changed'], counts['regraded']), (1, 1))
+
+        result.refresh_from_db()
+        profile.refresh_from_db()
+        self.assertEqual(result.togri_javoblar_soni, 1)
+        self.assertEqual(profile.total_points, result.jami_ball)
+        self.assertEqual(TestStats.objects.get(test=self.test).ballar_yigindisi, result.jami_ball)
+
+
+class SubmissionPipelineTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+        self.test = make_test(self.sinf, questions=3)
+
+    def answers(self, **extra):
+        data = dict(extra)
+        for savol in self.test.savollar.prefetch_related('variantlar'):
+            data[f'savol_{savol.id}'] = list(savol.variantlar.all())[0].id
+        return data
+
+    def test_duplicate_post_resolves_to_existing_result_without_writes(self):
+        response = self.client.get(reverse('test_solve', args=[self.test.id]))
+        token = response.context['submission_token']
+        url = reverse('test_solve', args=[self.test.id])
+
+        first = self.client.post(url, self.answers(submission_token=token))
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.post(url, self.answers(submission_token=token))
+
+        self.assertEqual(first['Location'], second['Location'])
+        self.assertFalse(any(q['sql'].startswith(('INSERT', 'UPDATE')) and 'core_' in q['sql']
+                             for q in ctx.captured_queries))
+        self.assertEqual(TestResult.objects.filter(student=self.profile, test=self.test).count(), 1)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.total_points, 6)
+
+    def test_pipeline_returns_existing_result_for_new_token(self):
+        key = AnswerKey.load(self.test)
+        result, created = submit_answers(self.profile, self.test, key, {}, new_submission_token())
+        again, created_again = submit_answers(self.profile, self.test, key, {}, new_submission_token())
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(result.pk, again.pk)
+
+
+class AutosaveTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+        self.test = make_test(self.sinf, questions=3)
+        self.savollar = list(self.test.savollar.prefetch_related('variantlar').order_by('id'))
+
+    def autosave(self, answers):
+        return self.client.post(reverse('test_autosave', args=[self.test.id]),
+                                json.dumps({'answers': answers}), content_type='application/json')
+
+    def test_batched_draft_is_stored_in_one_row_and_graded_on_submit(self):
+        first, second, third = self.savollar
+        correct = {s.id: list(s.variantlar.all())[0].id for s in self.savollar}
+        foreign = make_test(self.sinf, questions=1, nom="Boshqa").savollar.get().variantlar.first().id
+
+        response = self.autosave({str(first.id): correct[first.id], str(second.id): foreign, 'x': 1})
+        self.assertEqual(response.json(), {'saved': 1})
+        self.autosave({str(second.id): correct[second.id]})
+        attempt = TestAttempt.objects.get(student=self.profile, test=self.test)
+        self.assertEqual(attempt.selected_answers(), {first.id: correct[first.id], second.id: correct[second.id]})
+
+        page = self.client.get(reverse('test_solve', args=[self.test.id]))
+        self.assertEqual(page.context['selected_variant_ids'], {correct[first.id], correct[second.id]})
+
+        # Yakuniy POSTda faqat uchinchi savol bor - qolganlari qoralamadan olinadi
+        self.client.post(reverse('test_solve', args=[self.test.id]), {f'savol_{third.id}': correct[third.id]})
+        result = TestResult.objects.get(student=self.profile, test=self.test)
+        self.assertEqual(result.togri_javoblar_soni, 3)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.result_id, result.id)
+        self.assertEqual(self.autosave({str(first.id): None}).status_code, 409)
+
+    def test_autosave_before_start_does_not_open_an_attempt(self):
+        Test.objects.filter(pk=self.test.pk).update(boshlanish_vaqti=timezone.now() + timedelta(hours=1),
+                                                    davomiylik_daqiqa=10)
+        first = self.savollar[0]
+        response = self.autosave({str(first.id): first.variantlar.all()[0].id})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(TestAttempt.objects.exists())
+
+
+class TimedExamTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+        self.client.force_login(self.profile.user)
+        self.test = make_test(self.sinf, questions=2)
+        Test.objects.filter(pk=self.test.pk).update(davomiylik_daqiqa=10)
+        self.test.refresh_from_db()
+        self.correct = {s.id: s.variantlar.get(is_correct=True).id for s in self.test.savollar.all()}
+
+    def start(self):
+        self.client.get(reverse('test_solve', args=[self.test.id]))
+        return TestAttempt.objects.get(student=self.profile, test=self.test)
+
+    def test_attempt_gets_deadline_and_late_post_only_counts_draft(self):
+        attempt = self.start()
+        self.assertAlmostEqual((attempt.deadline - attempt.boshlangan_vaqt).total_seconds(), 600, delta=5)
+
+        first_id, second_id = sorted(self.correct)
+        self.client.post(reverse('test_autosave', args=[self.test.id]),
+                         json.dumps({'answers': {str(first_id): self.correct[first_id]}}),
+                         content_type='application/json')
+        TestAttempt.objects.filter(pk=attempt.pk).update(deadline=timezone.now() - timedelta(minutes=5))
+
+        self.client.post(reverse('test_solve', args=[self.test.id]),
+                         {f'savol_{savol_id}': variant_id for savol_id, variant_id in self.correct.items()})
+        result = TestResult.objects.get(student=self.profile, test=self.test)
+        self.assertEqual(result.togri_javoblar_soni, 1)
+
+    def test_sweep_finalizes_expired_attempts_from_draft(self):
+        attempt = self.start()
+        TestAttempt.objects.filter(pk=attempt.pk).update(
+            answers={str(savol_id): variant_id for savol_id, variant_id in self.correct.items()},
+            deadline=timezone.now() - timedelta(minutes=1),
+        )
+        other = make_student(self.sinf, username="vaqtli")
+        TestAttempt.objects.create(student=other, test=self.test, deadline=timezone.now() + timedelta(minutes=5))
+
+        call_command('sweep_expired_attempts', batch_size=1, stdout=StringIO())
+        result = TestResult.objects.get(student=self.profile, test=self.test)
+        self.assertEqual(result.togri_javoblar_soni, 2)
+        self.assertFalse(TestResult.objects.filter(student=other).exists())
+
+    def test_sweep_uses_test_end_for_attempts_without_deadline(self):
+        open_ended = make_student(self.sinf, username="cheksiz")
+        attempt = TestAttempt.objects.create(student=open_ended, test=self.test, deadline=None)
+        Test.objects.filter(pk=self.test.pk).update(tugash_vaqti=timezone.now() - timedelta(minutes=5))
+
+        call_command('sweep_expired_attempts', stdout=StringIO())
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.result, TestResult.objects.get(student=open_ended, test=self.test))
+
+    def test_test_window_is_enforced(self):
+        Test.objects.filter(pk=self.test.pk).update(boshlanish_vaqti=timezone.now() + timedelta(hours=1))
+        response = self.client.get(reverse('test_solve', args=[self.test.id]))
+        self.assertRedirects(response, reverse('student_test_list'), fetch_redirect_response=False)
+        self.assertFalse(TestAttempt.objects.exists())
+
+
+class ShuffleOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.test = make_test(self.sinf, questions=12)
+        self.test.savollarni_aralashtirish = True
+        self.test.variantlarni_aralashtirish = True
+        self.test.save()
+
+    def order(self, student_id):
+        return [(savol.id, [v.id for v in variantlar])
+                for savol, variantlar in ordered_content(self.test, student_id, get_test_content(self.test))]
+
+    def test_order_is_deterministic_per_student_and_cache_is_untouched(self):
+        content = get_test_content(self.test)
+        original = [(savol.id, [v.id for v in savol.variantlar.all()]) for savol in content]
+
+        self.assertEqual(self.order(1), self.order(1))
+        self.assertNotEqual(self.order(1), self.order(2))
+        self.assertEqual(sorted((s, sorted(v)) for s, v in self.order(1)), sorted(original))
+        self.assertEqual([(savol.id, [v.id for v in savol.variantlar.all()]) for savol in content], original)
+
+    def test_disabled_flags_keep_original_order(self):
+        self.test.savollarni_aralashtirish = False
+        self.test.variantlarni_aralashtirish = False
+        original = [(savol.id, [v.id for v in savol.variantlar.all()]) for savol in get_test_content(self.test)]
+        self.assertEqual(self.order(1), original)
+
+    def test_solve_and_review_show_the_same_order(self):
+        profile = make_student(self.sinf)
+        self.client.force_login(profile.user)
+        expected = self.order(profile.pk)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('test_solve', args=[self.test.id]))
+        solve_ids = [(savol.id, [v.id for v in variantlar]) for savol, variantlar in response.context['savollar']]
+        self.assertEqual(solve_ids, expected)
+        self.assertFalse(any('core_variant' in q['sql'] for q in ctx.captured_queries))
+
+        result = TestResult.objects.create(student=profile, test=self.test, jami_ball=0,
+                                           umumiy_savollar_soni=12, togri_javoblar_soni=0)
+        review = self.client.get(reverse('test_review', args=[self.test.id, result.id]))
+        self.assertEqual([item['savol'].id for item in review.context['savollar_data']()],
+                         [savol_id for savol_id, _ in expected])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.test = make_test(self.sinf, questions=3)
+        key = AnswerKey.load(self.test)
+        for index in range(3):
+            profile = make_student(self.sinf, username=f"oquvchi{index}")
+            selected = {savol_id: next(v for v, s in key.variant_owner.items() if s == savol_id)
+                        for savol_id in key.question_points}
+            submit_answers(profile, self.test, key, selected)
+
+    def test_csv_streams_one_row_per_result_and_answer(self):
+        chunks, _ = stream_export('results', 'csv', TestResult.objects.all())
+        lines = ''.join(chunks).lstrip('\ufeff').splitlines()
+        self.assertEqual(len(lines), 1 + 3)
+        self.assertIn('oquvchi0', lines[1])
+
+        chunks, _ = stream_export('answers', 'csv', TestResult.objects.all())
+        self.assertEqual(len(''.join(chunks).splitlines()), 1 + 3 * 3)
+
+    def test_csv_cells_cannot_start_a_formula(self):
+        CustomUser.objects.filter(username="oquvchi0").update(first_name='=HYPERLINK("http://x")', last_name="-1")
+        chunks, _ = stream_export('results', 'csv', TestResult.objects.all())
+        row = next(csv.reader(''.join(chunks).lstrip('\ufeff').splitlines()[1:2]))
+        self.assertEqual(row[2:4], ['\'=HYPERLINK("http://x")', "'-1"])
+        self.assertEqual(row[6], '6.00')
+
+    def test_xlsx_is_a_valid_zip_with_all_rows(self):
+        chunks, _ = stream_export('answers', 'xlsx', TestResult.objects.all())
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 1 + 3 * 3)
+
+    def test_admin_action_returns_streaming_response(self):
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:core_testresult_changelist'), {
+            'action': 'export_results_xlsx',
+            '_selected_action': list(TestResult.objects.values_list('pk', flat=True)),
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('xl/workbook.xml', archive.namelist())
+
+
+class ItemAnalysisTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.test = make_test(self.sinf, questions=3)
+        self.key = AnswerKey.load(self.test)
+        self.variants = {
+            savol.id: [v.id for v in savol.variantlar.all()] for savol in get_test_content(self.test)
+        }
+        self.count = 0
+
+    def submit(self, picks):
+        """``picks`` - har bir savol uchun tanlangan variant tartib raqami (0 - to'g'ri) yoki None."""
+        self.count += 1
+        profile = make_student(self.sinf, username=f"oquvchi{self.count}")
+        selected = {
+            savol_id: variant_ids[pick]
+            for (savol_id, variant_ids), pick in zip(self.variants.items(), picks) if pick is not None
+        }
+        submit_answers(profile, self.test, self.key, selected)
+
+    def test_statistics_match_direct_computation(self):
+        for picks in [(0, 0, 0), (0, 0, 1), (0, 1, None), (2, 1, 3)]:
+            self.submit(picks)
+        report = analyze_test(self.test)
+        self.assertEqual(report.participants, 4)
+
+        first, second, third = report.items
+        self.assertEqual(first.p_value, 0.75)
+        self.assertEqual(third.answered, 3)
+        self.assertEqual([s.chosen for s in third.variants], [1, 1, 0, 1])
+
+        totals = [6.0, 4.0, 2.0, 0.0]
+        correct = [1, 1, 0, 0]  # ikkinchi savol
+        mean = sum(totals) / 4
+        std = (sum((t - mean) ** 2 for t in totals) / 4) ** 0.5
+        expected = ((5.0 - 1.0) / std) * (0.5 * 0.5) ** 0.5
+        self.assertAlmostEqual(second.point_biserial, expected)
+        self.assertEqual(sum(correct), second.correct)
+
+    def test_new_results_are_added_incrementally(self):
+        self.submit((0, 0, 0))
+        self.submit((1, 1, 1))
+        analyze_test(self.test)
+
+        self.submit((0, 1, 0))
+        with CaptureQueriesContext(connection) as ctx:
+            incremental = load_statistics(self.test)
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertIn('"core_testresult"."id" >', sql)
+
+        cache.clear()
+        self.assertEqual(load_statistics(self.test), incremental)
+
+        with CaptureQueriesContext(connection) as ctx:
+            load_statistics(self.test)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_deleted_result_triggers_full_recompute(self):
+        self.submit((0, 0, 0))
+        self.submit((1, 1, 1))
+        analyze_test(self.test)
+        TestResult.objects.filter(student__user__username="oquvchi1").delete()
+        self.assertEqual(analyze_test(self.test).items[0].p_value, 0.0)
+
+    def test_admin_view_renders(self):
+        self.submit((0, 1, 2))
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:core_test_item_analysis', args=[self.test.id]))
+        self.assertContains(response, "Ishtirokchilar")
+
+
+class GradebookTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+
+    def test_matrix_totals_and_averages(self):
+        students = [make_student(self.sinf, username=f"oquvchi{i}") for i in range(3)]
+        tests = [Test.objects.create(nom=f"Test {i}", sinf=self.sinf) for i in range(2)]
+        for student, test, ball in [(students[0], tests[0], 4), (students[0], tests[1], 2), (students[1], tests[0], 3)]:
+            TestResult.objects.create(student=student, test=test, jami_ball=ball,
+                                      umumiy_savollar_soni=5, togri_javoblar_soni=1)
+
+        gradebook = Gradebook.for_sinf(self.sinf)
+        rows = {row.student_id: row for row in gradebook.rows()}
+        self.assertEqual(rows[students[0].pk].scores, [4.0, 2.0])
+        self.assertEqual(rows[students[0].pk].average, 3.0)
+        self.assertEqual(rows[students[1].pk].scores, [3.0, None])
+        self.assertIsNone(rows[students[2].pk].average)
+        self.assertEqual(gradebook.column_stats(), [(2, 7.0, 3.5), (1, 2.0, 2.0)])
+        self.assertAlmostEqual(gradebook.class_average(), 3.0)
+
+    def test_large_class_renders_with_constant_queries(self):
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f"oquvchi{i}", is_student=True) for i in range(40)]
+        )
+        profiles = StudentProfile.objects.bulk_create([StudentProfile(user=user, sinf=self.sinf) for user in users])
+        tests = Test.objects.bulk_create([Test(nom=f"Test {i}", sinf=self.sinf) for i in range(100)])
+        TestResult.objects.bulk_create([
+            TestResult(student=profile, test=test, jami_ball=(i + j) % 7,
+                       umumiy_savollar_soni=7, togri_javoblar_soni=0)
+            for i, profile in enumerate(profiles) for j, test in enumerate(tests) if (i + j) % 3
+        ])
+
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:core_sinf_gradebook', args=[self.sinf.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(ctx.captured_queries), 12)
+        self.assertContains(response, "5-A sinfi jurnali")
+
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ProvisioningTests(TestCase):
+    ROSTER = (
+        "familiya,ism,sinf,login,parol\n"
+        "Aliyev,Ali,5-A,,\n"
+        "Aliyev,Anvar,5-A,,\n"
+        "Qádirova,Gúlnara,6-B,gulnara,sir12345\n"
+    )
+
+    def test_creates_users_profiles_and_missing_classes(self):
+        Sinf.objects.create(nom="5-A")
+        CustomUser.objects.create_user(username="a.aliyev")
+        entries = provision_students(parse_roster(StringIO(self.ROSTER)), workers=1)
+
+        self.assertEqual([e.login for e in entries], ["a.aliyev2", "a.aliyev3", "gulnara"])
+        self.assertEqual(Sinf.objects.count(), 2)
+        profile = StudentProfile.objects.select_related('user', 'sinf').get(user__username="gulnara")
+        self.assertEqual(profile.sinf.nom, "6-B")
+        self.assertTrue(profile.user.is_student)
+        self.assertTrue(profile.user.check_password("sir12345"))
+        self.assertTrue(CustomUser.objects.get(username="a.aliyev2").check_password(entries[0].parol))
+
+    def test_errors_create_nothing(self):
+        CustomUser.objects.create_user(username="gulnara")
+        with self.assertRaises(RosterError) as ctx:
+            provision_students(parse_roster(StringIO(self.ROSTER)), workers=1)
+        self.assertEqual(ctx.exception.errors[0][0], 4)
+        self.assertFalse(StudentProfile.objects.exists())
+
+        with self.assertRaises(RosterError):
+            parse_roster(StringIO("ism,sinf\nAli,5-A\n"))
+
+    def test_admin_import_is_capped_and_points_to_the_command(self):
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        roster = "familiya,ism,sinf\n" + "".join(f"Aliyev,Ali{i},5-A\n" for i in range(31))
+        response = self.client.post(reverse('admin:core_customuser_import_students'),
+                                    {'roster_file': SimpleUploadedFile("royxat.csv", roster.encode('utf-8'))})
+        self.assertContains(response, "30 tadan")
+        self.assertContains(response, "provision_students")
+        self.assertFalse(StudentProfile.objects.exists())
+
+    def test_explicit_logins_are_validated(self):
+        roster = "familiya,ism,sinf,login\nAliyev,Ali,5-A,ali aliyev\nVali,Vali,5-A,{}\n".format("v" * 151)
+        with self.assertRaises(RosterError) as ctx:
+            parse_roster(StringIO(roster))
+        self.assertEqual([line for line, _ in ctx.exception.errors], [2, 3])
+
+    def test_parallel_hashing_matches_input_order(self):
+        passwords = [f"parol{i}" for i in range(20)]
+        encoded = hash_passwords(passwords, workers=2)
+        user = CustomUser(username="x")
+        for password, value in zip(passwords, encoded):
+            user.password = value
+            self.assertTrue(user.check_password(password))
+
+    @override_settings(PASSWORD_HASHERS=['core.hashers.TunablePBKDF2PasswordHasher'], PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_workers_get_iterations_from_the_parent(self):
+        encoded = hash_passwords([f"parol{i}" for i in range(20)], workers=2)
+        self.assertTrue(all(value.startswith('pbkdf2_sha256$1000$') for value in encoded))
+
+    def test_admin_import_shows_credentials_sheet(self):
+        admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+        self.client.force_login(admin_user)
+        upload = SimpleUploadedFile("royxat.csv", ("\ufeff" + self.ROSTER).encode('utf-8'))
+        response = self.client.post(reverse('admin:core_customuser_import_students'), {'roster_file': upload})
+        self.assertContains(response, "sir12345")
+        self.assertEqual(StudentProfile.objects.count(), 3)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoginFastPathTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        user = CustomUser.objects.create_user(username="oquvchi", password="parol123", is_student=True)
+        self.profile = StudentProfile.objects.create(user=user, sinf=self.sinf)
+        make_test(self.sinf, questions=1)
+
+    def test_pages_after_login_skip_profile_lookup(self):
+        self.client.post(reverse('login'), {'username': "oquvchi", 'password': "parol123"})
+        for name in ('student_test_list', 'student_dashboard'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "5-A")
+            profile_lookups = [q['sql'] for q in ctx.captured_queries
+                               if q['sql'].startswith('SELECT "core_studentprofile"."sinf_id"')]
+            self.assertEqual(profile_lookups, [])
+        self.assertEqual(response.context['student_profile'].pk, self.profile.pk)
+
+    def test_stale_class_in_session_is_refreshed(self):
+        self.client.post(reverse('login'), {'username': "oquvchi", 'password': "parol123"})
+        StudentProfile.objects.filter(pk=self.profile.pk).update(sinf=Sinf.objects.create(nom="6-B"))
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.context['sinf_nomi'], "6-B")
+        self.assertEqual(response.context['my_rank'], 1)
+
+    def test_class_change_is_checked_when_starting_a_test(self):
+        self.client.post(reverse('login'), {'username': "oquvchi", 'password': "parol123"})
+        old_test = Test.objects.get(sinf=self.sinf)
+        new_sinf = Sinf.objects.create(nom="6-B")
+        new_test = make_test(new_sinf, questions=1, nom="Fizika")
+        StudentProfile.objects.filter(pk=self.profile.pk).update(sinf=new_sinf)
+
+        self.assertEqual(self.client.get(reverse('test_start', args=[old_test.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('test_start', args=[new_test.id])).status_code, 200)
+        self.assertEqual(self.client.session['_student_profile']['sinf_nom'], "6-B")
+
+    @override_settings(PASSWORD_HASHERS=['core.hashers.TunablePBKDF2PasswordHasher'], PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_pbkdf2_iterations_are_configurable(self):
+        from django.contrib.auth.hashers import check_password, make_password
+        encoded = make_password("parol123")
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(check_password("parol123", encoded))
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, True)
+        registry.clear()
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.profile = make_student(self.sinf)
+
+    def test_disabled_by_default(self):
+        self.client.force_login(self.profile.user)
+        response = self.client.get(reverse('student_test_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_records_core_views_and_dumps_per_process_file(self):
+        with self.settings(PERF_INSTRUMENTATION=True, PERF_METRICS_DIR=self.metrics_dir):
+            self.client.force_login(self.profile.user)
+            for _ in range(3):
+                response = self.client.get(reverse('student_test_list'))
+            self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=')
+
+            # Admin standart sahifalari o'lchanmaydi
+            admin_user = CustomUser.objects.create_superuser(username="admin", password=None)
+            self.client.force_login(admin_user)
+            self.assertNotIn('Server-Timing', self.client.get(reverse('admin:core_sinf_changelist')))
+
+            registry.flush()
+            metrics = load_metrics(self.metrics_dir)
+        self.assertEqual(list(metrics), ['student_test_list'])
+        stats = metrics['student_test_list']
+        self.assertEqual(stats.count, 3)
+        self.assertGreater(stats.queries, 0)
+        self.assertGreater(stats.template_ms, 0)
+
+        out = StringIO()
+        call_command('perf_report', dir=self.metrics_dir, stdout=out)
+        self.assertIn('student_test_list', out.getvalue())
+
+    def test_report_skips_dead_workers_and_emits_valid_json(self):
+        with self.settings(PERF_METRICS_DIR=self.metrics_dir):
+            registry.record('student_test_list', 20000.0, 1.0, 1.0, 3)  # oxirgi katakdan katta
+            registry.flush()
+        finished = subprocess.Popen([sys.executable, '-c', ''])
+        finished.wait()
+        with open(os.path.join(self.metrics_dir, f"{finished.pid}.json"), 'w', encoding='utf-8') as output:
+            json.dump({'pid': finished.pid, 'views': {'student_result': registry.snapshot()['student_test_list']}}, output)
+
+        out = StringIO()
+        call_command('perf_report', dir=self.metrics_dir, json=True, stdout=out)
+        rows = json.loads(out.getvalue(), parse_constant=self.fail)
+        self.assertEqual([row['view'] for row in rows], ['student_test_list'])
+        self.assertIsNone(rows[0]['p99_ms'])
+
+        out = StringIO()
+        call_command('perf_report', dir=self.metrics_dir, stdout=out)
+        self.assertIn('>10000', out.getvalue())
+
+        call_command('perf_report', dir=self.metrics_dir, all=True, prune=True, stdout=StringIO())
+        self.assertEqual(os.listdir(self.metrics_dir), [f"{os.getpid()}.json"])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SeedingTests(TestCase):
+    def test_seed_school_creates_everything_in_bulk(self):
+        with CaptureQueriesContext(connection) as ctx:
+            school = seed_school(classes=2, students_per_class=5, tests_per_class=2, questions_per_test=3)
+        self.assertLess(len(ctx.captured_queries), 15)
+        self.assertEqual(len(school.students), 10)
+        self.assertEqual(StudentProfile.objects.filter(sinf_id=school.sinf_ids[1]).count(), 5)
+        self.assertEqual(Variant.objects.filter(is_correct=True).count(), 2 * 2 * 3)
+        username = school.students[0][1]
+        self.assertTrue(self.client.login(username=username, password=school.password))
+
+    def test_refuses_existing_or_overlong_names(self):
+        seed_school(classes=2, students_per_class=1, tests_per_class=1, questions_per_test=1, prefix='run')
+        with self.assertRaises(SeedingError):
+            seed_school(classes=2, students_per_class=1, tests_per_class=1, questions_per_test=1, prefix='run')
+        # Nom kesilmaydi (kesish bir ishga tushirishda ham takroriy nom berardi): "longprefi10" - 11 belgi
+        with self.assertRaises(SeedingError):
+            seed_school(classes=11, students_per_class=1, tests_per_class=1, questions_per_test=1, prefix='longprefi')
+        with self.assertRaises(CommandError):
+            call_command('generate_school_data', classes=1, students=5, tests=1, questions=5, prefix='run',
+                         interactive=False, stdout=StringIO())
+        self.assertEqual(Sinf.objects.count(), 2)
+
+    def test_generate_school_results_are_consistent(self):
+        school, counts = generate_school(classes=2, mean_class_size=6, tests_per_class=2, mean_questions=5, seed=3)
+        self.assertEqual(TestResult.objects.count(), counts['results'])
+        self.assertEqual(StudentAnswer.objects.count(), counts['answers'])
+        self.assertGreater(counts['answers'], 0)
+        for result in TestResult.objects.prefetch_related('javoblar'):
+            answers = list(result.javoblar.all())
+            self.assertEqual(result.togri_javoblar_soni, sum(a.is_correct for a in answers))
+            self.assertEqual(result.jami_ball, sum((a.ball for a in answers if a.is_correct), Decimal(0)))
+            self.assertTrue(all(a.tanlangan_variant.is_correct == a.is_correct for a in answers))
+        profile = StudentProfile.objects.get(pk=school.students[0][0])
+        self.assertEqual(profile.total_points, sum(
+            TestResult.objects.filter(student=profile).values_list('jami_ball', flat=True), Decimal(0)
+        ))
+
+
+def snapshot_core_tables():
+    return {
+        model: list(model.objects.order_by('pk').values_list(*[f.attname for f in model._meta.concrete_fields]))
+        for model in BACKUP_MODELS
+    }
+
+
+class BackupTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        sinf = Sinf.objects.create(nom="5-A")
+        test = make_test(sinf, questions=3)
+        key = AnswerKey.load(test)
+        for index in range(4):
+            profile = make_student(sinf, username=f"oquvchi{index}")
+            selected = {savol_id: next(v for v, s in key.variant_owner.items() if s == savol_id)
+                        for savol_id in key.question_points}
+            submit_answers(profile, test, key, selected)
+        TestAttempt.objects.create(student=profile, test=make_test(sinf, questions=1, nom="Qoralama"),
+                                   answers={'1': 2})
+        # auto_now_add qiymati tiklashda saqlanishi kerak
+        TestResult.objects.update(sinov_sanasi=timezone.now() - timedelta(days=30, microseconds=7))
+
+    def clear_core_tables(self):
+        for model in reversed(BACKUP_MODELS):
+            model.objects.all().delete()
+
+    def test_round_trip_preserves_every_value(self):
+        before = snapshot_core_tables()
+        manifest = backup(self.directory, chunk_size=2)
+        self.assertEqual(sum(entry['rows'] for entry in manifest['models']),
+                         sum(len(rows) for rows in before.values()))
+        self.clear_core_tables()
+        restore(self.directory, chunk_size=2)
+        self.assertEqual(snapshot_core_tables(), before)
+
+    def test_restore_refuses_non_empty_database_and_resumes(self):
+        before = snapshot_core_tables()
+        backup(self.directory, chunk_size=3)
+        with self.assertRaises(CommandError):
+            call_command('restore', self.directory, stdout=StringIO())
+
+        # To'xtab qolgan tiklash: javoblarning bir qismi va urinishlar yozilmagan
+        cut = StudentAnswer.objects.order_by('pk').values_list('pk', flat=True)[4]
+        StudentAnswer.objects.filter(pk__gt=cut).delete()
+        TestAttempt.objects.all().delete()
+        written = restore(self.directory, chunk_size=3, resume=True)
+        self.assertEqual(written['core.studentanswer'], len(before[StudentAnswer]) - 5)
+        self.assertEqual(written['core.testresult'], 0)
+        self.assertEqual(snapshot_core_tables(), before)
+
+    def test_submission_during_backup_does_not_break_restore(self):
+        attempt = TestAttempt.objects.get()
+
+        def submit_after_results(model, count):
+            # O'quvchi natijalar jadvali yozib bo'lingach, urinishlar yozilishidan oldin topshiradi
+            if model is TestResult and attempt.result_id is None:
+                finalize_attempt(attempt, AnswerKey.load(attempt.test_id))
+
+        backup(self.directory, chunk_size=100, progress=submit_after_results)
+        self.assertIsNotNone(attempt.result_id)
+        self.clear_core_tables()
+        restore(self.directory)
+        self.assertIsNone(TestAttempt.objects.get().result_id)
+        self.assertFalse(TestResult.objects.filter(pk=attempt.result_id).exists())
+        connection.check_constraints()
+
+    def test_incomplete_backup_is_rejected(self):
+        with self.assertRaises(CommandError):
+            call_command('restore', self.directory, stdout=StringIO())
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn('XATO', out.getvalue())
+
+    def test_unindexed_lookup_is_reported(self):
+        check = PlanCheck('matn', lambda: Savol.objects.filter(matn='x'), [('core_savol', ('matn',))])
+        [result] = check_plans([check])
+        self.assertFalse(result.ok)
+        self.assertEqual(result.missing, [('core_savol', ('matn',))])
+
+
+class TestStatsTests(TestCase):
+    def setUp(self):
+        self.sinf = Sinf.objects.create(nom="5-A")
+        self.test = make_test(self.sinf, questions=3)
+
+    def stats(self):
+        return TestStats.objects.get(test=self.test)
+
+    def submit(self, username, pick_correct):
+        profile = make_student(self.sinf, username=username)
+        key = AnswerKey.load(self.test)
+        selected = {
+            savol_id: next(v for v, s in key.variant_owner.items()
+                           if s == savol_id and (v in key.correct_variants) == pick_correct)
+            for savol_id in key.question_points
+        }
+        return submit_answers(profile, self.test, key, selected)[0]
+
+    def test_maintained_on_question_and_result_changes(self):
+        stats = self.stats()
+        self.assertEqual((stats.savollar_soni, stats.max_ball, stats.natijalar_soni), (3, 6, 0))
+        self.assertIsNone(stats.ortacha_ball)
+
+        savol = Savol.objects.create(test=self.test, matn="Yangi", ball=Decimal('2.5'))
+        self.assertEqual((self.stats().savollar_soni, self.stats().max_ball), (4, Decimal('8.5')))
+        savol.delete()
+        self.assertEqual(self.stats().savollar_soni, 3)
+
+        self.submit("a", pick_correct=True)
+        wrong = self.submit("b", pick_correct=False)
+        self.assertEqual((self.stats().natijalar_soni, self.stats().ortacha_ball), (2, 3))
+        wrong.delete()
+        self.assertEqual((self.stats().natijalar_soni, self.stats().ballar_yigindisi), (1, 6))
+
+        QuestionImporter(self.test).process_text(make_import_text(2))
+        first = Savol.objects.filter(test=self.test).first()
+        first.ball = 1
+        first.save()
+        regrade_results(TestResult.objects.filter(test=self.test))
+        call_command('rebuild_test_stats', '--check', stdout=StringIO())
+
+    def test_submission_locks_stats_row_last(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.submit("a", pick_correct=True)
+        writes = [query['sql'] for query in ctx.captured_queries if 'core_' in query['sql']]
+        self.assertIn('core_teststats', writes[-1])
+        self.assertEqual(sum('core_teststats' in sql for sql in writes), 1)
+        self.assertEqual((self.stats().natijalar_soni, self.stats().ballar_yigindisi), (1, 6))
+
+    def test_rebuild_fixes_drift_and_cascades_are_safe(self):
+        self.submit("a", pick_correct=True)
+        TestStats.objects.filter(test=self.test).update(savollar_soni=99, natijalar_soni=5)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_test_stats', '--check', stdout=StringIO())
+        call_command('rebuild_test_stats', stdout=StringIO())
+        call_command('rebuild_test_stats', '--check', stdout=StringIO())
+
+        # Test o'chirilganda savol/natija signallari statistika qatorini qayta yaratmasligi kerak
+        self.sinf.delete()
+        self.assertFalse(TestStats.objects.exists())
+
+    def test_test_list_reads_counts_without_touching_questions(self):
+        profile = make_student(self.sinf)
+        self.client.force_login(profile.user)
+        self.client.get(reverse('student_test_list'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('student_test_list'))
+        self.assertContains(response, "Sorawlar sanı: **3**")
+        self.assertFalse(any('core_savol' in query['sql'] for query in ctx.captured_queries))
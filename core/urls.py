@@ -13,6 +13,7 @@ urlpatterns = [
     path('student/tests/', views.student_test_list, name='student_test_list'),
     path('student/test/<int:test_id>/start/', views.test_start, name='test_start'),
     path('student/test/<int:test_id>/solve/', views.test_solve, name='test_solve'),
+    path('student/test/<int:test_id>/autosave/', views.test_autosave, name='test_autosave'),
     path('student/test/<int:test_id>/review/<int:result_id>/', views.test_review, name='test_review'),
 
     # Admin Qismlari
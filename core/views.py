@@ -1,20 +1,121 @@
+import json
+import time
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import authenticate, login, logout
+from django.template.defaultfilters import floatformat
+from django.utils import timezone
+from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Sum, Count  # Count va Sum kerak
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_POST
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from .forms import LoginForm
-from .models import CustomUser, Sinf, StudentProfile, Test, TestResult, Savol, StudentAnswer, \
-    Variant  # Kerakli modellar
+from .answer_cache import get_answer_key, get_test_content
+from .grading import selected_from_post
+from .ordering import ordered_content
+from .submission import (
+    DEADLINE_GRACE, AttemptClosed, clean_submission_token, finalize_attempt, new_submission_token,
+    open_attempt, save_draft, submit_answers,
+)
+from .models import CustomUser, Sinf, StudentProfile, Test, TestAttempt, TestResult, Savol, StudentAnswer  # Kerakli modellar
 
 
 # -------------------- Yordamchi Funksiyalar --------------------
 
+# Reyting jadvalida ko'rsatiladigan yetakchilar va o'quvchi atrofidagilar soni
+RATING_TOP_N = 10
+RATING_NEIGHBORS = 2
+
+# Natija sahifasidagi savollar qismining kesh muddati (soniya)
+REVIEW_CACHE_TIMEOUT = getattr(settings, 'REVIEW_CACHE_TIMEOUT', 60 * 60)
+
+# O'quvchining sinfi sessiyada saqlanadi; admin sinfni o'zgartirsa, shu muddatdan keyin yangilanadi (soniya).
+# Testga kirish (test_start, test_solve, test_autosave) sinfni har doim bazadan tekshiradi.
+STUDENT_SESSION_KEY = '_student_profile'
+STUDENT_SESSION_TTL = getattr(settings, 'STUDENT_SESSION_TTL', 5 * 60)
+
+
 def is_student(user):
     """O'quvchiligini tekshiradigan dekorator yordamchisi."""
     return user.is_authenticated and user.is_student
 
 
+def student_session_info(request, refresh=False):
+    """
+    O'quvchining ``(sinf_id, sinf_nomi)`` juftligi. StudentProfile ning kaliti user_id, shuning
+    uchun sinf sessiyada saqlanadi va har sahifada profil qayta o'qilmaydi; muddati o'tsa
+    yoki ``refresh`` bo'lsa bitta so'rov bilan yangilanadi. Profil bo'lmasa - 404.
+    """
+    cached = request.session.get(STUDENT_SESSION_KEY)
+    if cached and not refresh and time.time() - cached['at'] < STUDENT_SESSION_TTL:
+        return cached['sinf_id'], cached['sinf_nom']
+
+    row = StudentProfile.objects.filter(pk=request.user.pk).values_list('sinf_id', 'sinf__nom').first()
+    if row is None:
+        raise Http404("O'quvchi profili topilmadi.")
+    request.session[STUDENT_SESSION_KEY] = {'sinf_id': row[0], 'sinf_nom': row[1], 'at': time.time()}
+    return row
+
+
+def class_rating(student_id, sinf_id):
+    """
+    O'quvchining sinfdagi o'rni va qisqartirilgan reyting jadvalini qaytaradi.
+
+    O'rin bazada "undan oldin turganlar soni" so'rovi bilan hisoblanadi
+    ((sinf, -total_points) indeksi); o'quvchi bali shu so'rov ichida subquery bilan
+    olinadi. Jadvalda faqat TOP-N va o'quvchining atrofidagilar bo'ladi (o'quvchi
+    o'zi ham): ``[{'rank': .., 'profile': .., 'gap_before': ..}, ...]``.
+    """
+    class_profiles = StudentProfile.objects.filter(sinf_id=sinf_id)
+    points = Subquery(StudentProfile.objects.filter(pk=student_id).values('total_points')[:1])
+    position = class_profiles.filter(
+        Q(total_points__gt=points) | Q(total_points=points, pk__lt=student_id)
+    ).count()
+
+    ordered = class_profiles.select_related('user').order_by('-total_points', 'pk')
+    rows = [{'rank': i + 1, 'profile': p, 'gap_before': False}
+            for i, p in enumerate(ordered[:RATING_TOP_N])]
+
+    if position >= RATING_TOP_N:
+        start = max(position - RATING_NEIGHBORS, RATING_TOP_N)
+        neighbours = ordered[start:position + RATING_NEIGHBORS + 1]
+        rows.extend({'rank': start + i + 1, 'profile': p, 'gap_before': i == 0 and start > RATING_TOP_N}
+                    for i, p in enumerate(neighbours))
+
+    return position + 1, rows
+
+
+def student_tests(student_id, sinf_id):
+    """
+    Sinf testlari bitta so'rovda: savollar soni (TestStats dan, savollar jadvali ustida GROUP BY siz),
+    o'quvchi natijasi (id, ball) va yechilganlik belgisi.
+    (sinf, -yaratilgan_sana) va (student, test) indekslari bo'yicha; check_query_plans ham tekshiradi.
+    """
+    student_results = TestResult.objects.filter(
+        student_id=student_id, test=OuterRef('pk')
+    ).order_by('-sinov_sanasi')
+    return Test.objects.filter(sinf_id=sinf_id).annotate(
+        total_questions=Coalesce('stats__savollar_soni', 0),
+        result_id=Subquery(student_results.values('id')[:1]),
+        result_ball=Subquery(student_results.values('jami_ball')[:1]),
+        solved=Exists(student_results),
+    ).order_by('-yaratilgan_sana')
+
+
+def closed_test_redirect(request, test, now, has_attempt=False):
+    """Test oynasi yopiq bo'lsa xabar bilan ro'yxatga qaytaradi, aks holda None."""
+    if not test.has_started(now):
+        messages.warning(request, f"Test ele baslanbaǵan. Baslanıw waqtı: {timezone.localtime(test.boshlanish_vaqti):%d.%m.%Y %H:%M}")
+        return redirect('student_test_list')
+    if test.has_ended(now) and not has_attempt:
+        messages.warning(request, "Testtiń waqtı tamamlanǵan.")
+        return redirect('student_test_list')
+    return None
+
+
 # -------------------- Autentifikatsiya Views --------------------
 
 def user_login(request):
@@ -28,13 +129,18 @@ def user_login(request):
     if request.method == 'POST':
         form = LoginForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
+            # AuthenticationForm tekshiruvda authenticate() ni allaqachon chaqirgan:
+            # qayta chaqirish PBKDF2 hisobini ikki baravar qiladi
+            user = form.get_user()
 
             if user is not None:
                 login(request, user)
                 if user.is_student:
+                    # Keyingi sahifalar profilni qayta o'qimasligi uchun sinf sessiyaga yoziladi
+                    try:
+                        student_session_info(request, refresh=True)
+                    except Http404:
+                        pass
                     messages.success(request, f"Xosh keldińiz, {user.username}!")
                     return redirect('student_dashboard')
                 elif user.is_admin or user.is_superuser:
@@ -69,28 +175,28 @@ def home_view(request):
 @user_passes_test(is_student)
 def student_dashboard(request):
     """O'quvchi bosh sahifasi (Rating ko'rsatiladi)."""
-    student_profile = get_object_or_404(StudentProfile, user=request.user)
-    student_sinf = student_profile.sinf
-
-    if student_sinf:
-        # Ratingni hisoblash (Faqat o'z sinfidagi o'quvchilar)
-        rating_list = StudentProfile.objects.filter(sinf=student_sinf).order_by('-total_points')
-
-        rank = 0
-        for i, profile in enumerate(rating_list):
-            if profile.user.id == request.user.id:
-                rank = i + 1
-                break
-    else:
-        rating_list = None
-        rank = 0
-
-    all_tests = Test.objects.filter(sinf=student_sinf).count() if student_sinf else 0
-    solved_tests = TestResult.objects.filter(student=student_profile).count()
+    student_id = request.user.pk
+    sinf_id, sinf_nom = student_session_info(request)
+
+    rating_list, rank, student_profile = None, 0, None
+    if sinf_id:
+        rank, rating_list = class_rating(student_id, sinf_id)
+        # O'quvchining o'zi jadvalda doim bor (TOP-N yoki atrofidagilar) - profil alohida o'qilmaydi
+        student_profile = next((row['profile'] for row in rating_list if row['profile'].pk == student_id), None)
+    if student_profile is None:
+        # Sinfsiz o'quvchi yoki sessiyadagi sinf eskirgan
+        student_profile = get_object_or_404(StudentProfile, pk=student_id)
+        if student_profile.sinf_id != sinf_id:
+            sinf_id, sinf_nom = student_session_info(request, refresh=True)
+            if sinf_id:
+                rank, rating_list = class_rating(student_id, sinf_id)
+
+    all_tests = Test.objects.filter(sinf_id=sinf_id).count() if sinf_id else 0
+    solved_tests = TestResult.objects.filter(student_id=student_id).count()
 
     context = {
         'student_profile': student_profile,
-        'sinf_nomi': student_sinf.nom if student_sinf else "Klass belgilenbegen",
+        'sinf_nomi': sinf_nom if sinf_id else "Klass belgilenbegen",
         'rating_list': rating_list,
         'my_rank': rank,
         'all_tests_count': all_tests,
@@ -103,42 +209,28 @@ def student_dashboard(request):
 @user_passes_test(is_student)
 def student_test_list(request):
     """O'quvchining sinfiga tegishli testlar ro'yxatini ko'rsatadi."""
-    student_profile = get_object_or_404(StudentProfile, user=request.user)
-    student_sinf = student_profile.sinf
+    sinf_id, sinf_nom = student_session_info(request)
 
-    if not student_sinf:
+    if not sinf_id:
         messages.error(request, "Klasıńız belgilenbegen. Iltimas, administratorǵa xabarlasıń.")
         return redirect('student_dashboard')
 
-    all_tests = Test.objects.filter(sinf=student_sinf).annotate(
-        total_questions=Count('savollar')  # Agar Savol modelida Test uchun related_name='savollar' bo'lsa
-    ).order_by('-yaratilgan_sana')
-
-    solved_test_ids = TestResult.objects.filter(student=student_profile).values_list('test_id', flat=True)
-
-    tests_with_status = []
-    for test in all_tests:
-        status = 'Yechilmagan'
-        result_id = None
-
-        if test.id in solved_test_ids:
-            # TestResult allaqachon mavjud bo'lsa, uni olish
-            result = TestResult.objects.filter(student=student_profile, test=test).first()
-            if result:
-                status = f"Sheshilgen ({result.jami_ball} ball)"
-                result_id = result.id
+    all_tests = student_tests(request.user.pk, sinf_id)
 
-        tests_with_status.append({
+    tests_with_status = [
+        {
             'test': test,
-            'status': status,
-            'solved': test.id in solved_test_ids,
-            'result_id': result_id,
+            'status': f"Sheshilgen ({floatformat(test.result_ball, -2)} ball)" if test.solved else 'Yechilmagan',
+            'solved': test.solved,
+            'result_id': test.result_id,
             'total_questions': test.total_questions,
-        })
+        }
+        for test in all_tests
+    ]
 
     context = {
         'tests_with_status': tests_with_status,
-        'sinf_nomi': student_sinf.nom,
+        'sinf_nomi': sinf_nom,
     }
     return render(request, 'core/student_test_list.html', context)
 
@@ -147,15 +239,28 @@ def student_test_list(request):
 @user_passes_test(is_student)
 def test_start(request, test_id):
     """Testni boshlashdan oldingi tasdiqlash sahifasi."""
-    student_profile = get_object_or_404(StudentProfile, user=request.user)
-    test = get_object_or_404(Test, id=test_id, sinf=student_profile.sinf)  # Testni sinf orqali tekshirish
+    student_id = request.user.pk
+    # Sinf a'zoligi sessiyadan emas, JOIN orqali bazadan tekshiriladi: o'quvchi boshqa sinfga
+    # o'tkazilgan bo'lsa sessiyadagi sinf STUDENT_SESSION_TTL gacha eskirgan bo'lishi mumkin
+    test = Test.objects.filter(id=test_id, sinf__studentprofile__user_id=student_id).first()
+    sinf_id, _ = student_session_info(request)
+    if test is None or test.sinf_id != sinf_id:
+        student_session_info(request, refresh=True)  # ro'yxat va bosh sahifa ham yangi sinfni ko'rsatadi
+        if test is None:
+            raise Http404("Test topilmadi.")
 
     # 1. TESTNI AVVAL YECHILGANLIGINI TEKSHIRISH
-    if TestResult.objects.filter(student=student_profile, test=test).exists():
-        result = TestResult.objects.get(student=student_profile, test=test)
+    result = TestResult.objects.filter(student_id=student_id, test=test).only('id').first()
+    if result:
         messages.info(request, "Siz bul testti aldın sheshkensiz. Nátiyjeni kóriwińiz múmkin.")
         return redirect('test_review', test_id=test.id, result_id=result.id)
 
+    # Test oynasi (boshlanish/tugash vaqti) tekshiruvi
+    closed = closed_test_redirect(request, test, timezone.now(),
+                                  TestAttempt.objects.filter(student_id=student_id, test=test).exists())
+    if closed:
+        return closed
+
     # 2. GET so'rovi (Testni boshlashdan oldingi tasdiqlash sahifasi)
     if request.method == 'GET':
         context = {
@@ -183,101 +288,69 @@ def test_solve(request, test_id):
     test = get_object_or_404(Test, id=test_id, sinf=student_profile.sinf)
 
     # 1. Avval yechilganlikni tekshirish
-    if TestResult.objects.filter(student=student_profile, test=test).exists():
-        result = TestResult.objects.filter(student=student_profile,
-                                           test=test).last()  # Agar bir nechta bo'lsa oxirgisini olamiz
+    result = TestResult.objects.filter(student=student_profile, test=test).only('id').first()
+    if result:
         messages.info(request, "Siz bul testti aldın sheshkensiz.")
         return redirect('test_review', test_id=test.id, result_id=result.id)
 
+    # Vaqt chegaralari: test oynasi yopiq bo'lsa yangi urinish ochilmaydi
+    now = timezone.now()
+    attempt = TestAttempt.objects.filter(student=student_profile, test=test).first()
+    closed = closed_test_redirect(request, test, now, attempt is not None)
+    if closed:
+        return closed
+
     # GET so'rovida savollarni ko'rsatish
     if request.method == 'GET':
-        savollar_with_variants = test.savollar.all().prefetch_related('variantlar')
+        # Urinish (qoralama) - aloqa uzilsa ham avtosaqlangan javoblar tiklanadi
+        if attempt is None:
+            attempt = open_attempt(student_profile.pk, test, now)
+
+        if attempt.is_expired(now) or test.has_ended(now):
+            # Muddat tugagan: saqlangan qoralamadan avtomatik yakunlaymiz
+            test_result, _ = finalize_attempt(attempt, get_answer_key(test))
+            messages.warning(request, "Waqıt tamamlandı, saqlanǵan juwaplarıńız tekserildi.")
+            return redirect('test_review', test_id=test.id, result_id=test_result.id)
+
+        # Savollar va variantlar keshdan olinadi (mazmun versiyasi bo'yicha);
+        # aralashtirish yoqilgan bo'lsa, o'quvchiga xos tartib nusxada quriladi
+        savollar_with_variants = ordered_content(test, student_profile.pk, get_test_content(test))
         context = {
             'test': test,
             'savollar': savollar_with_variants,
+            'selected_variant_ids': set(attempt.selected_answers().values()),
+            'seconds_left': int((attempt.deadline - now).total_seconds()) if attempt.deadline else None,
+            # Takroriy yuborishni aniqlash uchun bir martalik belgi
+            'submission_token': new_submission_token(),
         }
         return render(request, 'core/test_solve.html', context)
 
     # POST so'rovida javoblarni tekshirish va saqlash
     elif request.method == 'POST':
-        # 1. Natijalarni hisoblash uchun boshlang'ich o'zgaruvchilar
-        total_score = 0
-        correct_answers_count = 0
-        total_questions = test.savollar.count()
-        student_answers_to_create = []
-
-        # ** TUZATISH 1: TestResult yaratishni javoblar saqlanishidan OLDIN qilamiz
-        # Lekin ballar hisoblangandan keyin uni yangilaymiz.
-        # SQLite'da bulk_create orqali bog'lanish uchun avval TestResult yozilishi kerak.
-        # Biz bu yerda to'g'ridan-to'g'ri hisob-kitobni qilib, keyin TestResultni yaratamiz,
-        # shunda bitta INSERT so'rovi ketadi (UPDATE kerak bo'lmaydi).
-
-        for savol in test.savollar.all():
-            input_name = f'savol_{savol.id}'
-            selected_variant_id = request.POST.get(input_name)
-
-            if not selected_variant_id:
-                continue
-
-            try:
-                # Variantni savolga tegishliligini tekshirib olamiz
-                selected_variant = Variant.objects.get(id=selected_variant_id, savol=savol)
-            except Variant.DoesNotExist:
-                continue
-
-            # To'g'ri javobni tekshirish
-            is_correct = selected_variant.is_correct
-
-            if is_correct:
-                # Agar to'g'ri bo'lsa, ballarni hisoblash
-                total_score += savol.ball  # Yoki savol.ball
-                correct_answers_count += 1
-
-            # StudentAnswer ob'ektini faqat yaratish uchun listga qo'shamiz
-            # Hozircha 'result' maydoni bo'sh.
-            answer = StudentAnswer(
-                # result=None (keyin TestResult obyektiga biriktiriladi)
-                savol=savol,
-                tanlangan_variant=selected_variant,
-                is_correct=is_correct
-            )
-            student_answers_to_create.append(answer)
-
-        # 2. TestResult (Umumiy Natija) ni YARATISH (hisoblangan ballar bilan)
-        # Endi bizda to'g'ri ballar mavjud
-        test_result = TestResult.objects.create(
-            student=student_profile,
-            test=test,
-            jami_ball=total_score,
-            umumiy_savollar_soni=total_questions,
-            togri_javoblar_soni=correct_answers_count,
+        # Javoblar kaliti keshdan (yoki bitta so'rov bilan) olinadi, topshiriq xotirada baholanadi;
+        # natija, javoblar va umumiy ball bitta tranzaksiyada, takroriy POSTga chidamli holda saqlanadi.
+        answer_key = get_answer_key(test)
+        # Avtosaqlangan qoralama asos bo'ladi, formadagi javoblar uning ustidan yoziladi.
+        # Muddatdan (va qisqa imkoniyatdan) keyin kelgan forma javoblari qabul qilinmaydi.
+        selected = attempt.selected_answers() if attempt else {}
+        late = test.has_ended(now - DEADLINE_GRACE) or (attempt is not None and attempt.is_expired(now - DEADLINE_GRACE))
+        if not late:
+            selected.update(selected_from_post(request.POST, answer_key))
+
+        test_result, created = submit_answers(
+            student_profile,
+            test,
+            answer_key,
+            selected,
+            clean_submission_token(request.POST.get('submission_token')),
+            attempt=attempt,
         )
 
-        # 3. StudentAnswer (Detalli Javoblar) ni saqlash uchun tayyorlash
-        # ** TUZATISH 2: StudentAnswer ob'ektlariga test_result'ni biriktirish
-        for answer in student_answers_to_create:
-            # Foreign Key maydonining nomi odatda 'result' deb nomlanadi (TestResult.result).
-            # Agar sizning modelingizda 'result' bo'lsa, 'answer.result = test_result' bo'ladi.
-            # Agar sizning modelingizda TestResultga bog'lanuvchi maydon 'result' bo'lsa, quyidagini ishlatamiz.
-            # Aks holda, modelingizga qarang va to'g'ri nomni toping.
-
-            # Tracebackda core_studentanswer.result_id ishlatilgan,
-            # shuning uchun modelda Foreign Key nomi 'result' deb taxmin qilamiz:
-            answer.result = test_result
-            # Eslatma: Agar modeliingizda nomi 'test_result' bo'lsa, 'answer.test_result = test_result' bo'ladi.
-
-        # bulk_create faqat ob'ektlarni saqlaydi, endi ularning 'result' maydoni to'liq
-        if student_answers_to_create:
-            StudentAnswer.objects.bulk_create(student_answers_to_create)
-
-        # 4. O'quvchi profili balini yangilash
-        total_points_sum = TestResult.objects.filter(student=student_profile).aggregate(Sum('jami_ball'))[
-            'jami_ball__sum']
-        student_profile.total_points = total_points_sum or 0
-        student_profile.save()
-
-        messages.success(request,
-                         f"Test tamamlandı. Siz {total_questions} dana sorawdan {correct_answers_count} danasına durıs juwap berdińiz! ({total_score} ball)")
+        if created:
+            messages.success(request,
+                             f"Test tamamlandı. Siz {test_result.umumiy_savollar_soni} dana sorawdan {test_result.togri_javoblar_soni} danasına durıs juwap berdińiz! ({floatformat(test_result.jami_ball, -2)} ball)")
+        else:
+            messages.info(request, "Siz bul testti aldın sheshkensiz.")
 
         # Natija sahifasiga yo'naltirish
         return redirect('test_review', test_id=test.id, result_id=test_result.id)
@@ -285,48 +358,62 @@ def test_solve(request, test_id):
     return redirect('student_test_list')
 
 
-# core/views.py
-
 @login_required
 @user_passes_test(is_student)
-def test_review(request, test_id, result_id):
-    """Yechilgan test natijasining batafsil ko'rinishini taqdim etadi."""
-
-    student_profile = get_object_or_404(StudentProfile, user=request.user)
-
-    # Faqat o'sha o'quvchining shu testdagi natijasi ekanligiga ishonch hosil qilish
-    test_result = get_object_or_404(
-        TestResult,
-        id=result_id,
-        test_id=test_id,
-        student=student_profile
-    )
-    test = test_result.test
-
-    # --- 1. Samarali Ma'lumotlarni Olish ---
-    student_answers = StudentAnswer.objects.filter(
-        result=test_result
-    ).select_related('savol', 'tanlangan_variant')
+@require_POST
+def test_autosave(request, test_id):
+    """
+    Test davomidagi javoblarni avtosaqlash (JSON).
+
+    So'rov tanasi: ``{"answers": {"<savol_id>": <variant_id yoki null>, ...}}`` - brauzer
+    bir nechta o'zgarishni yig'ib (debounce) bitta so'rovda yuboradi.
+    """
+    # StudentProfile ning kaliti user_id: sinf tekshiruvi JOIN orqali, profil alohida o'qilmaydi
+    test = get_object_or_404(Test, id=test_id, sinf__studentprofile__user_id=request.user.pk)
+    try:
+        payload = json.loads(request.body or b'{}')
+        changes = payload.get('answers') or {}
+        if not isinstance(changes, dict):
+            raise ValueError
+    except (ValueError, AttributeError):
+        return JsonResponse({'error': "Noto'g'ri ma'lumot."}, status=400)
+
+    try:
+        saved = save_draft(request.user.pk, test, get_answer_key(test), changes)
+    except AttemptClosed as e:
+        return JsonResponse({'error': str(e) or "Test allaqachon yakunlangan."}, status=409)
+    return JsonResponse({'saved': saved})
 
-    savollar_with_variants = test.savollar.all().prefetch_related('variantlar')
 
-    # O'quvchi javoblarini tezkor qidirish uchun savol IDsi orqali lug'atga solish
-    answers_map = {answer.savol_id: answer.tanlangan_variant for answer in student_answers}
+# core/views.py
 
-    # --- 2. Ma'lumotlarni Lug'atga Aylantirish va Birlashtirish (list_class ni hisoblash) ---
+def build_review_data(test, test_result):
+    """
+    Natija sahifasi uchun savollar ma'lumotini yig'adi.
+
+    Savol va variantlar keshdan (prefetch qilingan ro'yxat) olinadi, o'quvchi
+    javoblari bitta ``values_list`` so'rovi bilan o'qiladi; to'g'ri va tanlangan
+    variantlar shu ro'yxatlardan topiladi, savol boshiga so'rov yo'q.
+    Tartib test yechish sahifasidagi bilan bir xil (ordered_content).
+    """
+    answers_map = dict(
+        StudentAnswer.objects.filter(result=test_result).values_list('savol_id', 'tanlangan_variant_id')
+    )
 
     savollar_data = []
-
-    for savol in savollar_with_variants:
-        user_answer = answers_map.get(savol.id)  # Variant obyektini olamiz
-        is_savol_correct = user_answer.is_correct if user_answer else False
-
+    for savol, variantlar in ordered_content(test, test_result.student_id, get_test_content(test)):
+        selected_id = answers_map.get(savol.id)
+        user_answer = None
+        correct_variant = None
         updated_variants = []
 
-        for variant in savol.variantlar.all():
-
+        for variant in variantlar:
             # Variant tanlanganmi?
-            is_selected = user_answer and variant.id == user_answer.id
+            is_selected = selected_id is not None and variant.id == selected_id
+            if is_selected:
+                user_answer = variant
+            if variant.is_correct and correct_variant is None:
+                correct_variant = variant
 
             # list_class ni hisoblash
             list_class = ""
@@ -337,28 +424,49 @@ def test_review(request, test_id, result_id):
             elif variant.is_correct:
                 list_class = "list-group-item-info"
 
-            # Variant obyektiga yangi atributlarni dinamik qo'shamiz
-            # Bu yordamchi atributlar templateda to'g'ridan-to'g'ri ishlatiladi.
-            variant.is_selected = is_selected
-            variant.list_class = list_class
-
-            updated_variants.append(variant)
+            # Variant obyektlari keshda umumiy, shuning uchun ularni o'zgartirmasdan
+            # shablon uchun alohida lug'at yig'amiz.
+            updated_variants.append({
+                'matn': variant.matn,
+                'is_correct': variant.is_correct,
+                'is_selected': is_selected,
+                'list_class': list_class,
+            })
 
         # Ma'lumotlarni shablon uchun yig'ish
         savollar_data.append({
             'savol': savol,
-            'variantlar': updated_variants,  # Yangi atributlar qo'shilgan variantlar
+            'variantlar': updated_variants,
             'user_answer': user_answer,  # Tanlangan Variant obyekti (yoki None)
-            'is_correct': is_savol_correct,
-            # To'g'ri variantni alohida olish (lekin biz buni variant.is_correct bilan ham tekshirishimiz mumkin)
-            'correct_variant': savol.variantlar.filter(is_correct=True).first()
+            'is_correct': user_answer.is_correct if user_answer else False,
+            'correct_variant': correct_variant,
         })
 
-    # --- 3. Contextni Shablonga Uzatish ---
+    return savollar_data
+
+
+@login_required
+@user_passes_test(is_student)
+def test_review(request, test_id, result_id):
+    """Yechilgan test natijasining batafsil ko'rinishini taqdim etadi."""
+
+    # Faqat o'sha o'quvchining shu testdagi natijasi ekanligiga ishonch hosil qilish
+    # (StudentProfile ning kaliti user_id, shuning uchun profilni alohida o'qish shart emas)
+    test_result = get_object_or_404(
+        TestResult.objects.select_related('test'),
+        id=result_id,
+        test_id=test_id,
+        student_id=request.user.pk,
+    )
+    test = test_result.test
+
+    # Savollar qismi shablonda natija va test versiyasi bo'yicha keshlanadi;
+    # ma'lumotlar faqat kesh bo'sh bo'lganda (funksiya chaqirilganda) yig'iladi.
     context = {
         'test': test,
         'test_result': test_result,
-        'savollar_data': savollar_data,
+        'savollar_data': lambda: build_review_data(test, test_result),
+        'review_cache_timeout': REVIEW_CACHE_TIMEOUT,
     }
 
-    return render(request, 'core/test_review.html', context)
\ No newline at end of file
+    return render(request, 'core/test_review.html', context)
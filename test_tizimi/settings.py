@@ -63,6 +63,8 @@ TINYMCE_DEFAULT_CONFIG = {
 AUTH_USER_MODEL = 'core.CustomUser'
 
 MIDDLEWARE = [
+    # PERF_INSTRUMENTATION o'chiq bo'lsa o'zini zanjirdan olib tashlaydi
+    'core.instrumentation.PerfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,7 +81,8 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + render vaqtini o'lchash (core.instrumentation)
+        'BACKEND': 'core.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'test_tizimi', 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -166,3 +169,43 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Javoblar kaliti / test mazmuni keshi (core.answer_cache)
+# Jarayon ichidagi LRU hajmi (testlar soni x 2 yozuv)
+ANSWER_KEY_CACHE_SIZE = int(os.environ.get('ANSWER_KEY_CACHE_SIZE', 256))
+# Ixtiyoriy umumiy kesh (CACHES dagi alias, masalan Redis); None - faqat lokal LRU
+ANSWER_KEY_CACHE_ALIAS = os.environ.get('ANSWER_KEY_CACHE_ALIAS') or None
+
+# Natija (review) sahifasidagi savollar qismining fragment keshi muddati (soniya)
+REVIEW_CACHE_TIMEOUT = int(os.environ.get('REVIEW_CACHE_TIMEOUT', 60 * 60))
+
+# Savollar importini oldindan ko'rish natijalari (tasdiqlashgacha) saqlanadigan papka;
+# bo'sh - tizimning vaqtinchalik papkasi. Bir nechta server bo'lsa umumiy papka bo'lishi kerak
+IMPORT_PREVIEW_DIR = os.environ.get('IMPORT_PREVIEW_DIR') or None
+
+# Kirish (login) tezligi: imtihon boshida butun maktab bir vaqtda kiradi
+# Sessiya dvigateli: db (standart), cached_db yoki signed_cookies
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+# O'quvchi sinfi sessiyada saqlanadigan muddat (soniya), keyin profil qayta o'qiladi
+STUDENT_SESSION_TTL = int(os.environ.get('STUDENT_SESSION_TTL', 5 * 60))
+# PBKDF2 iteratsiyalari soni (bo'sh - Django standarti). Kamaytirish kirishni tezlashtiradi,
+# lekin parol xeshlarini buzishni osonlashtiradi - joylashtirish bo'yicha ongli tanlov.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 0)) or None
+# Admin sahifasidan bir martada yaratiladigan o'quvchilar soni: parollar so'rov ichida
+# ketma-ket xeshlanadi (1M iteratsiyada ~0.5 s), gunicorn vaqt chegarasiga sig'ishi kerak.
+# Katta ro'yxatlar - provision_students buyrug'i (jarayonlar puli bilan)
+ADMIN_ROSTER_MAX_ROWS = int(os.environ.get('ADMIN_ROSTER_MAX_ROWS', 30))
+PASSWORD_HASHERS = [
+    'core.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Sahifalar tezligini o'lchash (core.instrumentation): Server-Timing sarlavhasi va perf_report
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', '').lower() in ('1', 'true', 'yes')
+# Har bir ishchi jarayon gistogrammasi shu papkaga <pid>.json sifatida yoziladi
+PERF_METRICS_DIR = os.environ.get('PERF_METRICS_DIR') or None
+PERF_FLUSH_INTERVAL = int(os.environ.get('PERF_FLUSH_INTERVAL', 30))